@@ -1,51 +1,496 @@
 import argparse
+import json
+import multiprocessing
 import os
-from multiprocessing import Pool
-from progressbar import progressbar
+import shlex
+import shutil
+import signal
+import socket
+import sys
 import subprocess
+import tempfile
+import threading
 import time
 
+from src.pool.BlenderWorker import BlenderWorker
+from src.pool.ConcurrencyController import ConcurrencyController
+from src.pool.DeviceScheduler import DeviceScheduler
+from src.pool.JobCostEstimator import JobCostEstimator
+from src.pool.JobClaims import JobClaims, in_shard
+from src.pool.JobLedger import JobLedger, count_output_frames
+from src.utility.ConfigParser import ConfigParser
+from src.utility.JobSpecs import read_job_specs, apply_job_spec
+from src.pool.TimingReport import collect_timing_records, aggregate_timings, format_timing_report
+from src.pool.ProfileReport import collect_profiles, aggregate_profiles, format_profile_report
+from src.pool.JobValidator import validate_jobs, format_validation_report
+
 
 parser = argparse.ArgumentParser()
-parser.add_argument('-d', type=int, help='Device to be used')
-parser.add_argument('-N', type=int, help='Number of jobs', default=3)
+parser.add_argument('-d', help='Device(s) to be used, a comma separated list of CUDA device ids (e.g. 0,1,2,3)', default='0')
+parser.add_argument('-N', type=int, help='Number of parallel jobs per device', default=3)
 parser.add_argument('--models', help='Model path', default='../ShapeNet/ShapeNetCore.v2')
 parser.add_argument('--textures', help='Texture path', default='../Texture')
 parser.add_argument('--output', help='Output path', default='../output/render')
 parser.add_argument('--yaml', help='Path to a list of yaml files')
+parser.add_argument('--template', help='Yaml file used as template for all jobs of --job_specs (instead of --yaml)')
+parser.add_argument('--job_specs', help='JSONL file with one job per line: its "name" and the overrides merged into --template')
 parser.add_argument('--start', type=int, help='Position to start running', default=0)
+parser.add_argument('--warm', action='store_true', help='Keep one Blender process alive per job slot instead of starting Blender for every yaml')
+parser.add_argument('--recycle_after', type=int, help='Restart a warm Blender worker after this many jobs (0: never)', default=50)
+parser.add_argument('--scene_reset', choices=['cleanup', 'snapshot'], help='How a warm Blender worker removes the scene of the previous job: delete all objects and orphan data or remove every datablock created since its first job', default='snapshot')
+parser.add_argument('--max_rss', type=int, help='Restart a warm Blender worker once its memory usage passes this many MB (0: never)', default=0)
+parser.add_argument('--ledger', help='Path of the job ledger used to resume/retry jobs (default: <output>/job_ledger.jsonl)')
+parser.add_argument('--retries', type=int, help='How often a failed job is retried, also across restarts', default=2)
+parser.add_argument('--backoff', type=float, help='Seconds to wait before the first retry, doubled for every further retry', default=30)
+parser.add_argument('--max_backoff', type=float, help='Upper limit of the wait between retries in seconds', default=600)
+parser.add_argument('--reload', type=float, help='Seconds between two scans of the yaml path for newly added files', default=60)
+parser.add_argument('--shard', help='Only run the part i/N of the yaml files (e.g. 0/4), the files are split by a stable hash of their name')
+parser.add_argument('--claims', help='Shared directory (e.g. on NFS) used to hand out jobs dynamically between multiple machines via lock files')
+parser.add_argument('--node', help='Name of this machine in the claims directory and ledger file name', default=socket.gethostname())
+parser.add_argument('--claim_timeout', type=float, help='Seconds without heartbeat after which the jobs claimed by a machine are taken over by others', default=600)
+parser.add_argument('--adaptive', action='store_true', help='Adapt the number of parallel jobs (between --min_jobs and the number of slots) to the load, free RAM, free /dev/shm and GPU utilization')
+parser.add_argument('--min_jobs', type=int, help='Lower bound of parallel jobs in adaptive mode (default: one per device)')
+parser.add_argument('--adapt_interval', type=float, help='Seconds between two decisions of the adaptive mode', default=30)
+parser.add_argument('--gpu_probe', help='Shell command printing the GPU utilization in percent, used by the adaptive mode (e.g. "nvidia-smi --query-gpu=utilization.gpu --format=csv,noheader,nounits")')
+parser.add_argument('--min_free_ram', type=float, help='Adaptive mode lowers the number of jobs when less RAM (MB) is available', default=4096)
+parser.add_argument('--min_free_shm', type=float, help='Adaptive mode lowers the number of jobs when less space (MB) is left in /dev/shm', default=2048)
+parser.add_argument('--order', choices=['name', 'longest'], help='Run the jobs sorted by name or starting with the longest predicted render time', default='name')
+parser.add_argument('--model_stats', help='Cache of the face counts and texture sizes of the models, used by --order longest (default: <output>/model_stats.json)')
+parser.add_argument('--single_parse', action='store_true', help='Parse every yaml only once here and hand the result to Blender, the Blender path is resolved once for all jobs')
+parser.add_argument('--blender', help='Path of the Blender executable used by --single_parse (default: resolved by run.py from the first yaml)')
+parser.add_argument('--pipeline', action='store_true', help='Blender only renders, the CPU heavy post-processing (segmentation conversion, copying into the dataset) is done by a separate pool of processes while Blender renders the next job')
+parser.add_argument('--post_workers', type=int, help='Number of post-processing processes in pipeline mode', default=4)
+parser.add_argument('--staging', help='Directory for the intermediate files of the pipeline mode, one sub directory per job', default='/dev/shm/blender_vos_staging')
+parser.add_argument('--profile', help='Comma separated list of modules (e.g. SegMapPngRenderer,RGBSegWriter) or "all", which Blender runs under cProfile, the stats are written to <output of the job>/profiles')
+parser.add_argument('--profile_report', nargs='?', const='', help='Only print the hotspots of the profiles found in the output path (optionally only the ones of the given module) and exit')
+parser.add_argument('--top', type=int, help='Number of functions shown by --profile_report', default=30)
+parser.add_argument('--profile_sort', choices=['tottime', 'cumtime'], help='Sort the functions of --profile_report by their own time or including the functions they call', default='tottime')
+parser.add_argument('--validate', action='store_true', help='Check all yaml files (modules, required keys of the trajectory runners, referenced models and textures) before starting and skip the invalid ones')
+parser.add_argument('--validate_only', action='store_true', help='Only check all yaml files as with --validate, write the report and exit')
+parser.add_argument('--validate_workers', type=int, help='Number of processes used to check the yaml files (default: one per cpu)')
+parser.add_argument('--report', action='store_true', help='Only print the per-module timing report of the jobs found in the output path and exit')
 args = parser.parse_args()
 
+if args.report:
+    print(format_timing_report(aggregate_timings(collect_timing_records(args.output))))
+    exit(0)
+
+if args.profile_report is not None:
+    profiles = collect_profiles(args.output, args.profile_report if args.profile_report != '' else None)
+    print(format_profile_report(aggregate_profiles(profiles, args.top, args.profile_sort)))
+    exit(0)
+
 start = time.time()
 
-def work(func_arg):
-    yaml = func_arg[0]
-    i = func_arg[1]
+def ignore_sigint():
+    # Post-processing workers finish their current job when draining, the main process decides when to abort
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+post_pool = None
+if args.pipeline:
+    from src.utility.PostProcessingUtility import run_postprocessing
+    # Created before any thread is started, as the processes are forked
+    post_pool = multiprocessing.Pool(args.post_workers, initializer=ignore_sigint)
+    # Blocks the render slots when post-processing falls behind, s.t. the staging directory does not grow without limit
+    post_slots = threading.Semaphore(2 * args.post_workers)
+
+def format_duration(seconds):
+    """ Formats the given number of seconds as H:MM:SS (hours can go beyond 24). """
+    seconds = int(seconds)
+    return '%d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+# The warm Blender workers, one per (device, slot), created on their first job
+blender_workers = {}
+
+def run_warm(yaml_path, device, slot, staging_dir, config, job_name=None):
+    """ Runs the job in the warm Blender worker of the given slot and returns its exit code. """
+    if (device, slot) not in blender_workers:
+        # The first yaml is only used by run.py to find the blender installation, the jobs are sent over the socket
+        command = [sys.executable, 'run.py', '--fast', yaml_path]
+        if args.blender is not None:
+            command += ['--blender', args.blender]
+        env = dict(os.environ, CUDA_DEVICE_ORDER='PCI_BUS_ID', CUDA_VISIBLE_DEVICES=device)
+        blender_workers[(device, slot)] = BlenderWorker(command, env=env, max_jobs=args.recycle_after, max_rss_mb=args.max_rss)
+
+    options = {'scene_reset': args.scene_reset}
+    if args.profile is not None:
+        options['profile_modules'] = args.profile.split(',')
+    if staging_dir is not None:
+        options['postprocessing_dir'] = staging_dir
+    if config is not None:
+        options['parsed_config'] = config
+    if job_name is not None:
+        options['job_name'] = job_name
+    result = blender_workers[(device, slot)].run_job(yaml_path, job_args, options)
+    if not result['success']:
+        print('Failed %s: %s' % (yaml_path, result.get('error', '').strip().split('\n')[-1]))
+        return 1
+    return 0
+
+# The currently running Blender processes of the non-warm mode
+cold_processes = set()
+
+def run_cold(yaml_path, device, staging_dir, config, job_name=None):
+    """ Starts a new Blender process for the job and returns its exit code. """
+    # Job names come from the JSONL file and paths can contain spaces, so every value is quoted for the shell
+    command = 'CUDA_DEVICE_ORDER=PCI_BUS_ID CUDA_VISIBLE_DEVICES=%s python run.py --fast %s %s %s %s' % tuple(shlex.quote(value) for value in [device, yaml_path, args.models, args.textures, args.output])
+    if staging_dir is not None:
+        command += ' --postprocessing_dir %s' % shlex.quote(staging_dir)
+    if args.profile is not None:
+        command += ' --profile %s' % shlex.quote(args.profile)
+    if job_name is not None:
+        command += ' --job_name %s' % shlex.quote(job_name)
+    config_path = None
+    if config is not None:
+        # Blender gets the blender path and the parsed config, so neither run.py nor blender have to parse the yaml again
+        fd, config_path = tempfile.mkstemp(prefix='parsed_config_', suffix='.json', dir='/dev/shm' if os.path.exists('/dev/shm') else None)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(config, f)
+        command += ' --blender %s --parsed_config %s' % (shlex.quote(args.blender), shlex.quote(config_path))
+    # Use a new session, s.t. Ctrl-C does not reach Blender and the current video can be finished
+    this_subprocess = subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    cold_processes.add(this_subprocess)
+    exit_code = this_subprocess.wait()
+    cold_processes.discard(this_subprocess)
+    if config_path is not None:
+        os.remove(config_path)
+    return exit_code
+
+def release_claim(yaml, success):
+    if claims is not None:
+        # A job that was interrupted by draining is left to the other machines
+        claims.release(yaml, 'done' if success else (None if scheduler.draining else 'failed'))
+
+def check_frames(yaml_path, config=None):
+    """ Counts the written frames, a zero exit code is not enough as blender might have stopped before writing all of them. """
+    frames = count_output_frames(yaml_path, job_args, config)
+    complete = frames is None or frames['expected'] is None or min(frames['rgb'], frames['seg']) >= frames['expected']
+    return frames, complete
+
+def post_process(yaml, device, attempt, job_start, manifest_path, config):
+    """ Hands the rendered job to the post-processing pool, the ledger and claim are updated once it is done. """
+    yaml_path = job_path(yaml)
+
+    def on_done(num_tasks):
+        frames, complete = check_frames(yaml_path, config)
+        if complete:
+            ledger.record_finish(yaml, attempt, 0, time.time() - job_start, device=device, frames=frames, **cost_info(yaml))
+        else:
+            ledger.record_fail(yaml, attempt, 0, time.time() - job_start, device=device, frames=frames)
+        print('%s %s (%d tasks).' % ('Post-processed' if complete else 'Missing frames after post-processing', yaml, num_tasks))
+        release_claim(yaml, complete)
+        post_slots.release()
+
+    def on_error(error):
+        # The job is retried by the next run of pool_run.py
+        ledger.record_fail(yaml, attempt, 0, time.time() - job_start, device=device, error=str(error))
+        print('Post-processing %s failed: %s' % (yaml, error))
+        shutil.rmtree(os.path.dirname(manifest_path), ignore_errors=True)
+        release_claim(yaml, False)
+        post_slots.release()
+
+    post_slots.acquire()
+    post_pool.apply_async(run_postprocessing, (manifest_path,), callback=on_done, error_callback=on_error)
+
+# Held while the Blender path of --single_parse is resolved, s.t. blender is only installed once
+blender_lock = threading.Lock()
+
+def resolve_blender(yaml_path):
+    """ Resolves the Blender path used by --single_parse with the first job that is dispatched, all further jobs then skip this step.
+
+    This also covers pools which start without jobs and only get them from a later scan.
+
+    :param yaml_path: The config of the job, run.py installs the blender configured in it if necessary.
+    :return: True, if args.blender is set.
+    """
+    with blender_lock:
+        if args.blender is None:
+            try:
+                output = subprocess.check_output([sys.executable, 'run.py', '--fast', '--print_blender_path', yaml_path] + job_args)
+            except subprocess.CalledProcessError:
+                return False
+            args.blender = output.decode().strip().split('\n')[-1]
+            print('Using blender %s for all jobs.' % args.blender)
+    return True
+
+def work(yaml, device, slot):
+    """ Runs the given yaml on the given device (with retries) and returns True if it finished successfully.
 
-    yaml_path = os.path.join(args.yaml, yaml)
-    print('Started working on ', yaml_path, '...')
-    command = 'CUDA_DEVICE_ORDER=PCI_BUS_ID CUDA_VISIBLE_DEVICES=%d python run.py --fast %s %s %s %s' % (args.d, yaml_path, args.models, args.textures, args.output)
-    this_subprocess = subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    this_subprocess.wait()
+    In pipeline mode, True means the job was rendered and handed to the post-processing pool.
+    """
+    yaml_path = job_path(yaml)
+    staging_dir = os.path.join(os.path.abspath(args.staging), os.path.splitext(yaml)[0]) if args.pipeline else None
+    config = None
+    if args.single_parse:
+        if not resolve_blender(yaml_path):
+            print('Could not find blender with %s.' % yaml_path)
+            ledger.record_fail(yaml, ledger.failures(yaml), None, 0, device=device, error='Could not find blender')
+            return False
+        # If the yaml can not be parsed, run.py reports the problem
+        config = parsed_configs.pop(yaml, None) or job_config(yaml)
+        if config is None and job_specs is not None:
+            # Without its overrides, blender would render the template itself
+            print('Could not build the config of %s from the template.' % yaml)
+            ledger.record_fail(yaml, ledger.failures(yaml), None, 0, device=device, error='Could not build the config from the template')
+            return False
+    job_name = yaml if job_specs is not None else None
+    # Failures from previous runs count towards the retry limit
+    attempt = ledger.failures(yaml)
+    while True:
+        print('Started working on %s on device %s...' % (yaml_path, device))
+        ledger.record_start(yaml, attempt, device=device)
+        job_start = time.time()
+        if staging_dir is not None:
+            # Leftovers of an interrupted attempt
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        exit_code = run_warm(yaml_path, device, slot, staging_dir, config, job_name) if args.warm else run_cold(yaml_path, device, staging_dir, config, job_name)
+        duration = time.time() - job_start
 
-    time_ela = time.time() - start
-    time_ela = time.strftime("%H:%M:%S", time.gmtime(time_ela))
+        if staging_dir is not None and exit_code == 0:
+            manifest_path = os.path.join(staging_dir, 'manifest.jsonl')
+            if os.path.exists(manifest_path):
+                post_process(yaml, device, attempt, job_start, manifest_path, config)
+                return True
+            frames = None
+        else:
+            frames, complete = check_frames(yaml_path, config)
+            if exit_code == 0 and complete:
+                ledger.record_finish(yaml, attempt, exit_code, duration, device=device, frames=frames, **cost_info(yaml))
+                return True
 
-    print('Finished %s. %d/%d %s' % (yaml, i+1, len(yaml_files), time_ela))
+        ledger.record_fail(yaml, attempt, exit_code, duration, device=device, frames=frames)
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        attempt += 1
+        if attempt > args.retries:
+            print('Giving up on %s after %d attempts.' % (yaml, attempt))
+            return False
+        if scheduler.draining:
+            # The retry is left to the next run
+            return False
+        backoff = min(args.backoff * 2 ** (attempt - 1), args.max_backoff)
+        print('Retrying %s in %.0f seconds (attempt %d/%d).' % (yaml, backoff, attempt + 1, args.retries + 1))
+        time.sleep(backoff)
 
 
-yaml_files = os.listdir(args.yaml)
-yaml_files = sorted([f for f in yaml_files if '.yaml' in f])
+job_args = [args.models, args.textures, args.output]
+
+if args.shard is not None:
+    shard_index, num_shards = [int(x) for x in args.shard.split('/')]
+    if not 0 <= shard_index < num_shards:
+        raise Exception('Invalid shard %s, the index has to be in [0, N)' % args.shard)
+
+# The jobs of --job_specs by name, the file is read again if it changed
+job_specs = None
+job_specs_mtime = None
+template = None
+if args.job_specs is not None:
+    if args.template is None:
+        raise Exception('--job_specs needs a --template')
+    # The config of every job is built here from the template and handed to Blender
+    args.single_parse = True
+    template = ConfigParser(silent=True).compile(args.template)
+elif args.yaml is None:
+    raise Exception('Either --yaml or --template and --job_specs have to be given')
+
+def job_path(job):
+    """ Returns the config path of the given job, all jobs of --job_specs share the template. """
+    return args.template if job_specs is not None else os.path.join(args.yaml, job)
+
+def job_config(job):
+    """ Returns the parsed config of the given job or None, if it can not be parsed. """
+    try:
+        if job_specs is not None:
+            return apply_job_spec(template.fill(job_args), job_specs[job])
+        return ConfigParser(silent=True).compile(job_path(job)).fill(job_args)
+    except (Exception, SystemExit):
+        return None
+
+def list_yaml_files():
+    global job_specs, job_specs_mtime
+    if args.job_specs is not None:
+        mtime = os.path.getmtime(args.job_specs)
+        if mtime != job_specs_mtime:
+            job_specs = read_job_specs(args.job_specs)
+            job_specs_mtime = mtime
+        yaml_files = sorted(job_specs.keys())
+    else:
+        yaml_files = sorted([f for f in os.listdir(args.yaml) if '.yaml' in f])
+    if args.shard is not None:
+        yaml_files = [f for f in yaml_files if in_shard(f, shard_index, num_shards)]
+    return yaml_files
+
+yaml_files = list_yaml_files()
 
 print('Starting from %d out of %d files.' % (args.start, len(yaml_files)))
 yaml_files = yaml_files[args.start:]
 
-func_args = [(y,i) for i, y in enumerate(yaml_files)]
+# Skip everything that already finished or failed too often in previous runs
+os.makedirs(args.output, exist_ok=True)
+if args.ledger is None:
+    # Appending to one shared file is not safe on network file systems, so every machine gets its own ledger
+    args.ledger = os.path.join(args.output, 'job_ledger.jsonl' if args.shard is None and args.claims is None else 'job_ledger.%s.jsonl' % args.node)
+ledger = JobLedger(args.ledger)
+pending_files = ledger.pending_jobs(yaml_files, args.retries + 1)
+num_finished = len([f for f in yaml_files if ledger.is_finished(f)])
+num_partial = len([f for f in pending_files if ledger.state(f) == 'start'])
+print('%d already finished, %d given up after failures, %d interrupted and re-queued.' % (
+    num_finished, len(yaml_files) - len(pending_files) - num_finished, num_partial))
+yaml_files = pending_files
+
+if args.validate or args.validate_only:
+    validation_start = time.time()
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    invalid_jobs = validate_jobs([(f, job_path(f), job_specs[f] if job_specs is not None else None) for f in yaml_files], job_args, root_dir, args.validate_workers)
+    report_path = os.path.join(args.output, 'validation_report.json')
+    with open(report_path, 'w') as f:
+        json.dump({'jobs': len(yaml_files), 'invalid': invalid_jobs}, f, indent=2)
+    print(format_validation_report(invalid_jobs, len(yaml_files)))
+    print('Checked %d yaml files in %s, the report was written to %s.' % (len(yaml_files), format_duration(time.time() - validation_start), report_path))
+    if args.validate_only:
+        exit(1 if len(invalid_jobs) > 0 else 0)
+    yaml_files = [f for f in yaml_files if f not in invalid_jobs]
+
+# The features of the cost estimate by job, s.t. every config is only read once
+job_features = {}
+# Configs read for the cost estimate which --single_parse hands to Blender, removed once the job is started
+parsed_configs = {}
+
+def cost_features(job, keep_config=False):
+    """ Returns the features of the cost estimate of the given job or None, if its config can not be parsed.
+
+    :param job: The name of the job.
+    :param keep_config: Keep the parsed config for work(), s.t. --single_parse does not parse the yaml again.
+    """
+    if job not in job_features:
+        config = job_config(job)
+        job_features[job] = estimator.job_features(job_path(job), job_args, config) if config is not None else None
+        if keep_config and config is not None:
+            parsed_configs[job] = config
+    return job_features[job]
+
+def cost_info(job):
+    """ Returns the features of the given job to store in its ledger entry, s.t. later calibrations do not have to read its config. """
+    if estimator is None or job_features.get(job) is None:
+        return {}
+    return {'features': job_features[job]}
+
+estimator = None
+if args.order == 'longest':
+    estimator = JobCostEstimator(args.model_stats if args.model_stats is not None else os.path.join(args.output, 'model_stats.json'))
+    # Calibrate against all jobs that finished so far, on this and on other machines
+    samples = []
+    ledger_paths = set([args.ledger] + [os.path.join(args.output, f) for f in os.listdir(args.output) if f.startswith('job_ledger') and f.endswith('.jsonl')])
+    for path in sorted(ledger_paths):
+        for job, entry in JobLedger(path).jobs.items():
+            if entry['state'] != 'finish':
+                continue
+            features = entry['last'].get('features')
+            if features is None and (job in job_specs if job_specs is not None else os.path.exists(job_path(job))):
+                # Finished before the features were recorded in the ledger
+                features = cost_features(job)
+            if features is not None and len(features) == len(JobCostEstimator.FEATURES):
+                samples.append((features, entry['last']['duration']))
+    estimator.calibrate(samples)
+    print('Calibrated the cost estimate on %d finished jobs: %s' % (len(samples), ', '.join('%s %.3g' % (name, w) for name, w in zip(JobCostEstimator.FEATURES, estimator.coefficients))))
+
+def order_jobs(jobs):
+    """ Sorts the given jobs by their predicted duration (longest first), if requested. """
+    if estimator is None:
+        return jobs
+    estimates = {}
+    for job in jobs:
+        # The configs of --job_specs are built from the template, keeping them would only cost memory
+        features = cost_features(job, keep_config=args.single_parse and job_specs is None)
+        # Jobs whose config can not be read fail fast, so they go last
+        estimates[job] = estimator.estimate(features) if features is not None else 0
+    estimator.save()
+    return sorted(jobs, key=lambda job: -estimates[job])
+
+yaml_files = order_jobs(yaml_files)
+
+if estimator is not None and len(yaml_files) > 0:
+    print('Longest predicted job: %s' % yaml_files[0])
+# Everything listed so far, later scans only add files which were not there before
+known_files = set(list_yaml_files())
+num_jobs = len(yaml_files)
+
+def find_new_yaml_files():
+    """ Returns the yaml files that were added to the yaml path since the last scan. """
+    global num_jobs
+    new_files = [f for f in list_yaml_files() if f not in known_files]
+    known_files.update(new_files)
+    new_files = ledger.pending_jobs(new_files, args.retries + 1)
+    if args.validate and len(new_files) > 0:
+        invalid_jobs = validate_jobs([(f, job_path(f), job_specs[f] if job_specs is not None else None) for f in new_files], job_args, root_dir, args.validate_workers)
+        if len(invalid_jobs) > 0:
+            print(format_validation_report(invalid_jobs, len(new_files)))
+        new_files = [f for f in new_files if f not in invalid_jobs]
+    new_files = order_jobs(new_files)
+    if len(new_files) > 0:
+        print('Found %d new yaml files.' % len(new_files))
+    num_jobs += len(new_files)
+    return new_files
+
+def handle_sigint(signum, frame):
+    if not scheduler.draining:
+        print('Draining: running jobs are finished, no new ones are started. Press Ctrl-C again to abort immediately.')
+        scheduler.drain()
+    else:
+        print('Aborting running jobs.')
+        for worker in list(blender_workers.values()):
+            worker.kill()
+        if post_pool is not None:
+            post_pool.terminate()
+        for process in list(cold_processes):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        os._exit(1)
+
+claims = None
+if args.claims is not None:
+    claims = JobClaims(args.claims, args.node, timeout=args.claim_timeout)
+    claims.start_heartbeat()
+
+devices = [d.strip() for d in args.d.split(',') if d.strip() != '']
+scheduler = DeviceScheduler(devices, args.N, work)
+signal.signal(signal.SIGINT, handle_sigint)
+
+controller = None
+if args.adaptive:
+    min_jobs = args.min_jobs if args.min_jobs is not None else len(devices)
+    controller = ConcurrencyController(min_jobs, len(devices) * args.N, log_path=os.path.join(args.output, 'concurrency.%s.jsonl' % args.node),
+                                       gpu_probe=args.gpu_probe, min_free_ram_mb=args.min_free_ram, min_free_tmp_mb=args.min_free_shm)
+    # Start low and let the controller raise the number of jobs while there are free resources
+    scheduler.set_limit(min_jobs)
+    controller.start(scheduler, args.adapt_interval)
+
+for i, (yaml, device, success) in enumerate(scheduler.run(yaml_files, refill=find_new_yaml_files, refill_interval=args.reload,
+                                                         claim=claims.try_claim if claims is not None else None)):
+    if not (args.pipeline and success):
+        # Rendered jobs of the pipeline mode are released once their post-processing is done
+        release_claim(yaml, success)
+    time_ela = format_duration(time.time() - start)
+    eta = scheduler.eta()
+    eta = format_duration(eta) if eta is not None else '?'
 
-pool = Pool(args.N)
-chunksize = 1
-for _ in progressbar(pool.map(work, func_args, chunksize), redirect_stdout=True):
-    pass
+    print('%s %s on device %s. %d/%d %s, ETA %s' % (('Rendered' if args.pipeline else 'Finished') if success else 'Failed', yaml, device, i+1, num_jobs, time_ela, eta))
 
+for worker in blender_workers.values():
+    worker.stop()
+if post_pool is not None:
+    print('Waiting for the post-processing to finish...')
+    post_pool.close()
+    post_pool.join()
+if claims is not None:
+    claims.stop_heartbeat()
+if controller is not None:
+    controller.stop()
 
-print('All done.')
\ No newline at end of file
+print(scheduler.report())
+timing_records = collect_timing_records(args.output)
+if len(timing_records) > 0:
+    print(format_timing_report(aggregate_timings(timing_records)))
+print('All done.')
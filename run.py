@@ -1,4 +1,5 @@
 import argparse
+import json
 import os
 import shutil
 import subprocess
@@ -17,14 +18,21 @@
         raise e # from import lzma -> pip install --user pyliblzma
 
 
-from src.utility.ConfigParser import ConfigParser
-
 parser = argparse.ArgumentParser(add_help=False)
 parser.add_argument('config', default=None, nargs='?', help='The path to the configuration file which describes what the pipeline should do.')
 parser.add_argument('args', metavar='arguments', nargs='*', help='Additional arguments which are used to replace placeholders inside the configuration. <args:i> is hereby replaced by the i-th argument.')
 parser.add_argument('--reinstall-packages', dest='reinstall_packages', action='store_true', help='If given, all python packages configured inside the configuration file will be reinstalled.')
 parser.add_argument('--reinstall-blender', dest='reinstall_blender', action='store_true', help='If given, the blender installation is deleted and reinstalled. Is ignored, if a "custom_blender_path" is configured in the configuration file.')
 parser.add_argument('--batch_process',help='Renders a batch of house-cam combinations, by reading a file containing the combinations on each line, where each line is the standard placeholder arguments for rendering a single scene separated by spaces. The value of this option is the path to the index file, no need to add placeholder arguments.')
+parser.add_argument('--worker', help='Address (host:port) of a pool_run.py dispatcher. Blender is kept alive and runs every job it receives from there, placeholder arguments are then sent per job.')
+parser.add_argument('--postprocessing_dir', help='Leave CPU heavy post-processing to the workers of pool_run.py --pipeline: blender only renders and writes the intermediate files and a manifest into this directory. Not supported with --batch_process.')
+parser.add_argument('--scene_reset', choices=['cleanup', 'snapshot'], help='How blender removes the scene of the previous job in worker and batch mode: "cleanup" deletes all objects and orphan data, "snapshot" removes every datablock created since the first job (faster, nothing accumulates). Default: cleanup')
+parser.add_argument('--profile', help='Comma separated list of modules (e.g. SegMapPngRenderer,RGBSegWriter) or "all", which are run under cProfile. The stats are written to <output_dir>/profiles, see pool_run.py --profile_report. Overrides "profile_modules" of the config.')
+parser.add_argument('--blender', help='Path of the blender executable. If given, the config is not read at all and the installation is not checked, this is used by pool_run.py --single_parse which resolves the path once for all jobs.')
+parser.add_argument('--parsed_config', help='Path to a json file with the already parsed config (placeholders filled). It is read instead of the yaml and handed to blender, s.t. the yaml is not parsed again there.')
+parser.add_argument('--job_specs', help='JSONL file with one job per line (its "name" and the overrides merged into the config), all jobs are run with the config as template in one blender process.')
+parser.add_argument('--job_name', help='Name of the job used for its profiles and timing records, per default the name of the config file. Set by pool_run.py for jobs of a template.')
+parser.add_argument('--print_blender_path', action='store_true', help='Only print the path of the blender executable (after installing it, if necessary) and exit.')
 parser.add_argument('-h', '--help', dest='help', action='store_true', help='Show this help message and exit.')
 parser.add_argument('--fast', action='store_true', help='Run faster by skipping some steps in setup.')
 args = parser.parse_args()
@@ -33,8 +41,51 @@
     print(parser.format_help())
     exit(0)
 
-config_parser = ConfigParser()
-config = config_parser.parse(args.config, args.args, args.help, skip_arg_placeholders=(args.batch_process != None)) # Don't parse placeholder args in batch mode.
+def run_blender(blender_run_path):
+    """ Runs src/run.py inside blender and exits with blender's exit code. """
+    repo_root_directory = os.path.dirname(os.path.realpath(__file__))
+    path_src_run = os.path.join(repo_root_directory, "src/run.py")
+    postprocessing_args = ["--postprocessing-dir", os.path.abspath(args.postprocessing_dir)] if args.postprocessing_dir else []
+    parsed_config_args = ["--parsed-config", os.path.abspath(args.parsed_config)] if args.parsed_config else []
+    scene_reset_args = ["--scene-reset", args.scene_reset] if args.scene_reset else []
+    profile_args = ["--profile", args.profile] if args.profile else []
+    job_name_args = ["--job-name", args.job_name] if args.job_name else []
+
+    if args.worker:  # Blender receives the jobs (config and placeholder args) from the dispatcher at the given address
+        p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config, "--worker", args.worker] + scene_reset_args + profile_args,
+                             env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
+    elif args.job_specs:  # All jobs of the JSONL file are run with the config as template
+        p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config] + args.args + ["--job-specs", os.path.abspath(args.job_specs)] + scene_reset_args + profile_args,
+                             env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
+    elif not args.batch_process:
+        p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config] + args.args + postprocessing_args + parsed_config_args + profile_args + job_name_args,
+                             env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
+    else:  # Pass the index file path containing placeholder args for all input combinations (cam, house, output path)
+        p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--",  args.config, "--batch-process", args.batch_process] + scene_reset_args + profile_args,
+                             env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
+    try:
+        p.wait()
+    except KeyboardInterrupt:
+        try:
+            p.terminate()
+        except OSError:
+            pass
+        p.wait()
+
+    exit(p.returncode)
+
+if args.blender is not None and not args.print_blender_path:
+    # The caller already knows where blender is, so neither the config nor the installation have to be looked at
+    run_blender(args.blender)
+
+if args.parsed_config is not None:
+    with open(args.parsed_config, "r") as f:
+        config = json.load(f)
+else:
+    # Imported here, as the yaml parser is not needed when pool_run.py hands over blender path and parsed config
+    from src.utility.ConfigParser import ConfigParser
+    config_parser = ConfigParser()
+    config = config_parser.parse(args.config, args.args, args.help, skip_arg_placeholders=(args.batch_process != None or args.worker != None)) # Don't parse placeholder args in batch/worker mode.
 setup_config = config["setup"]
 
 # If blender should be downloaded automatically
@@ -206,22 +257,8 @@ def __call__(self, block_num, block_size, total_size):
 else:
     raise Exception("This system is not supported yet: {}".format(platform))
 
-repo_root_directory = os.path.dirname(os.path.realpath(__file__))
-path_src_run = os.path.join(repo_root_directory, "src/run.py")
-
-if not args.batch_process:
-    p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--", args.config] + args.args,
-                         env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
-else:  # Pass the index file path containing placeholder args for all input combinations (cam, house, output path)
-    p = subprocess.Popen([blender_run_path, "--background", "--python-exit-code", "2", "--python", path_src_run, "--",  args.config, "--batch-process", args.batch_process],
-                         env=dict(os.environ, PYTHONPATH=""), cwd=repo_root_directory)
-try:
-    p.wait()
-except KeyboardInterrupt:
-    try:
-        p.terminate()
-    except OSError:
-        pass
-    p.wait()
+if args.print_blender_path:
+    print(blender_run_path)
+    exit(0)
 
-exit(p.returncode)
+run_blender(blender_run_path)
@@ -0,0 +1,111 @@
+# Measures the throughput of the Config accessors, has to be run inside blender (mathutils):
+# blender --background --python scripts/benchmark_config.py
+import os
+import sys
+import time
+
+import mathutils
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
+
+from src.utility.Config import Config, NotFoundError
+from src.main.Provider import Provider
+
+number_of_calls = 200000
+
+
+def legacy_get_value(data, name):
+    """ The lookup used by Config before paths were cached: split per call, recursion, exceptions for missing keys.
+
+    The legacy getters below mirror the former Config methods, the provider of the benchmark is shared with the new Config.
+    """
+    if "/" in name:
+        delimiter_pos = name.find("/")
+        block_name = name[:delimiter_pos]
+        if block_name in data and type(data[block_name]) is dict:
+            return legacy_get_value(data[block_name], name[delimiter_pos + 1:])
+        raise NotFoundError("No such configuration block '" + block_name + "'!")
+    if name in data:
+        return data[name].run() if isinstance(data[name], Provider) else data[name]
+    raise NotFoundError("No such configuration '" + name + "'!")
+
+
+def legacy_get_with_fallback(data, name, fallback=None):
+    try:
+        return legacy_get_value(data, name)
+    except NotFoundError:
+        if fallback is not None:
+            return fallback
+        raise
+
+
+def legacy_get_float(data, name, fallback=None):
+    value = legacy_get_with_fallback(data, name, fallback)
+    try:
+        return float(value)
+    except ValueError:
+        raise TypeError("Cannot convert '" + str(value) + "' to float!")
+
+
+def legacy_get_int(data, name, fallback=None):
+    value = legacy_get_with_fallback(data, name, fallback)
+    try:
+        return int(value)
+    except ValueError:
+        raise TypeError("Cannot convert '" + str(value) + "' to int!")
+
+
+def legacy_get_vector3d(data, name, fallback=None):
+    value = legacy_get_with_fallback(data, name, fallback)
+    if isinstance(value, mathutils.Vector):
+        value = list(value)
+    if not isinstance(value, list):
+        raise TypeError("Cannot convert '" + str(value) + "' to list!")
+    if len(value) != 3:
+        raise TypeError(str(value) + "' must have exactly 3 dimensions!")
+    return mathutils.Vector(value)
+
+
+def calls_per_second(function):
+    start = time.time()
+    for _ in range(number_of_calls):
+        function()
+    return number_of_calls / (time.time() - start)
+
+
+data = {
+    "max_iterations": 1000,
+    "intrinsics": {"camera": {"fov": "0.6"}},
+    "pos": [1, 2, 3],
+    "pos_sampler": {"provider": "sampler.Uniform3d", "min": [0, 0, 0], "max": [1, 1, 1]}
+}
+config = Config(data)
+
+# Providers have to sample a new value on every call
+assert config.get_vector3d("pos_sampler") != config.get_vector3d("pos_sampler")
+
+benchmarks = [
+    ("get_int (static)",
+     lambda: legacy_get_int(data, "max_iterations"),
+     lambda: config.get_int("max_iterations")),
+    ("get_float (nested, static)",
+     lambda: legacy_get_float(data, "intrinsics/camera/fov"),
+     lambda: config.get_float("intrinsics/camera/fov")),
+    ("get_float (missing, fallback)",
+     lambda: legacy_get_float(data, "intrinsics/camera/clip_start", 0.1),
+     lambda: config.get_float("intrinsics/camera/clip_start", 0.1)),
+    ("get_vector3d (static)",
+     lambda: legacy_get_vector3d(data, "pos"),
+     lambda: config.get_vector3d("pos")),
+    ("get_vector3d (provider)",
+     lambda: legacy_get_vector3d(data, "pos_sampler"),
+     lambda: config.get_vector3d("pos_sampler")),
+]
+
+print("%-32s %14s %14s %8s" % ("accessor", "legacy calls/s", "calls/s", "speedup"))
+for name, legacy, current in benchmarks:
+    legacy_rate = calls_per_second(legacy)
+    current_rate = calls_per_second(current)
+    print("%-32s %14.0f %14.0f %7.2fx" % (name, legacy_rate, current_rate, current_rate / legacy_rate))
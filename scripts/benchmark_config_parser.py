@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(repo_root_directory)
+import src.utility.ConfigParser as ConfigParserModule
+from src.utility.ConfigParser import ConfigParser
+from src.utility.JobSpecs import read_job_specs, apply_job_spec
+
+parser = argparse.ArgumentParser("Measures the cost of parsing the job yamls: pure python yaml loader, C yaml loader and compiled templates")
+parser.add_argument('yaml', help='Path to a yaml file or a directory of yaml files (e.g. the yamls of a pool_run.py run)')
+parser.add_argument('args', nargs='*', help='Arguments used to fill the <args:i> placeholders')
+parser.add_argument('-n', type=int, help='Maximum number of yaml files to measure', default=200)
+parser.add_argument('--parses_per_job', type=int, help='How often every yaml is parsed per job (pool_run.py: cost estimate, launch, frame check)', default=3)
+parser.add_argument('--template', help='Also measure building the jobs from this yaml template and --job_specs')
+parser.add_argument('--job_specs', help='JSONL file with the overrides of every job, see pool_run.py --job_specs')
+parser.add_argument('--jobs', type=int, help='Number of jobs to extrapolate the total cost to', default=30000)
+args = parser.parse_args()
+
+if os.path.isdir(args.yaml):
+    yaml_files = [os.path.join(args.yaml, f) for f in sorted(os.listdir(args.yaml)) if f.endswith('.yaml')][:args.n]
+else:
+    yaml_files = [args.yaml]
+# Single files are repeated to get a stable measurement
+repeats = max(1, args.n // len(yaml_files))
+
+
+def ms_per_job(parse):
+    """ Returns the average time in ms to parse one yaml parses_per_job times. """
+    start = time.time()
+    for _ in range(repeats):
+        for yaml_file in yaml_files:
+            for _ in range(args.parses_per_job):
+                parse(yaml_file)
+    return (time.time() - start) / (repeats * len(yaml_files)) * 1000
+
+
+def parse_with_loader(loader):
+    def parse(yaml_file):
+        ConfigParserModule.SafeLoader = loader
+        ConfigParser(silent=True).parse(yaml_file, args.args)
+    return parse
+
+
+def parse_compiled(yaml_file):
+    ConfigParser(silent=True).compile(yaml_file).fill(args.args)
+
+
+results = [("ConfigParser.parse, python loader", ms_per_job(parse_with_loader(yaml.SafeLoader)))]
+if hasattr(yaml, "CSafeLoader"):
+    results.append(("ConfigParser.parse, C loader", ms_per_job(parse_with_loader(yaml.CSafeLoader))))
+else:
+    print("pyyaml was built without libyaml, the C loader is not available.")
+results.append(("compile + fill", ms_per_job(parse_compiled)))
+
+if args.template is not None and args.job_specs is not None:
+    # Reading the JSONL is part of the cost, it replaces listing and opening one yaml per job
+    start = time.time()
+    job_specs = list(read_job_specs(args.job_specs).values())[:args.n]
+    template = ConfigParser(silent=True).compile(args.template)
+    for _ in range(args.parses_per_job):
+        for spec in job_specs:
+            apply_job_spec(template.fill(args.args), spec)
+    results.append(("template + job specs", (time.time() - start) / len(job_specs) * 1000))
+
+print("%d yaml files, %d parses per job" % (len(yaml_files), args.parses_per_job))
+print("%-36s %12s %18s" % ("", "ms per job", "hours per %d jobs" % args.jobs))
+for name, ms in results:
+    print("%-36s %12.2f %18.2f" % (name, ms, ms * args.jobs / 1000 / 3600))
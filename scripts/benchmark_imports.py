@@ -0,0 +1,65 @@
+# Measures how much startup time per job the lazy imports of scipy, sklearn, skimage and h5py save, has to be run inside blender:
+# blender --background --python scripts/benchmark_imports.py [-- <number of runs>]
+#
+# Every measurement is done in a fresh blender process, as python caches imported modules.
+import json
+import os
+import subprocess
+import sys
+
+import bpy
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Dependencies which the modules imported at the top of the file (or through a module they import), before they were moved into the methods using them
+formerly_eager_imports = {
+    "src.object.ObjectTrajectoryRunner": ["scipy", "scipy.cluster", "sklearn.cluster", "scipy.spatial", "scipy.spatial.transform"],
+    "src.writer.CocoAnnotationsWriter": ["skimage.measure"],
+    "src.writer.Hdf5Writer": ["h5py"]
+}
+# Modules which are part of every VOSTrajRunner job
+modules_of_every_job = ["src.object.ObjectTrajectoryRunner"]
+
+number_of_runs = int(sys.argv[sys.argv.index("--") + 1]) if "--" in sys.argv else 5
+
+measure_code = """
+import importlib, json, sys, time
+sys.path.append(%r)
+import numpy, bpy, mathutils
+start = time.time()
+for name in %r:
+    importlib.import_module(name)
+print("IMPORT_TIME " + json.dumps(time.time() - start))
+"""
+
+
+def import_time(module_names):
+    """ Returns the median time in seconds a fresh blender needs to import the given modules (numpy, bpy and mathutils are already loaded).
+
+    Returns None, if the modules could not be imported.
+    """
+    times = []
+    for _ in range(number_of_runs):
+        output = subprocess.check_output([bpy.app.binary_path, "--background", "--factory-startup", "--python-expr", measure_code % (repo_root_directory, module_names)], stderr=subprocess.DEVNULL)
+        for line in output.decode("utf-8").splitlines():
+            if line.startswith("IMPORT_TIME "):
+                times.append(json.loads(line[len("IMPORT_TIME "):]))
+    # Blender exits normally, even if the python expression raised an exception
+    if len(times) == 0:
+        return None
+    return sorted(times)[len(times) // 2]
+
+
+print("%-36s %10s %10s %10s" % ("Module", "before [s]", "after [s]", "saved [s]"))
+saved_per_job = 0.0
+for module_name, dependencies in formerly_eager_imports.items():
+    before = import_time(dependencies + [module_name])
+    after = import_time([module_name])
+    if before is None or after is None:
+        print("%-36s could not import %s" % (module_name, ", ".join(dependencies)))
+        continue
+    print("%-36s %10.3f %10.3f %10.3f" % (module_name, before, after, before - after))
+    if module_name in modules_of_every_job:
+        saved_per_job += before - after
+
+print("Saved per job: %.3f s (%s, more if a job uses one of the other modules and does not need the lazily imported dependency)" % (saved_per_job, ", ".join(modules_of_every_job)))
@@ -0,0 +1,83 @@
+# Compares keyframing the trajectory of objects via one keyframe_insert() per frame and property (as the trajectory
+# runners did before) with BlenderUtility.insert_keyframes(), has to be run inside blender:
+# blender --background --python scripts/benchmark_keyframes.py
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+import numpy.polynomial.polynomial as polynomial
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
+
+from src.utility.BlenderUtility import insert_keyframes
+
+object_counts = [1, 10, 50]
+frame_counts = [25, 100, 400]
+data_paths = ["location", "rotation_euler", "scale"]
+
+
+def trajectories(num_objects, n_frames):
+    """ Returns random cubic trajectories: one array (n_frames x 3) per object and data path. """
+    pts = [i / (n_frames - 1) for i in range(n_frames)]
+    random = np.random.RandomState(0)
+    return [{data_path: polynomial.polyval(pts, random.uniform(-1, 1, (4, 3))).transpose(1, 0) for data_path in data_paths} for _ in range(num_objects)]
+
+
+def create_objects(num_objects):
+    objects = []
+    for i in range(num_objects):
+        obj = bpy.data.objects.new("object_%d" % i, None)
+        bpy.context.scene.collection.objects.link(obj)
+        objects.append(obj)
+    return objects
+
+
+def remove_objects(objects):
+    actions = [obj.animation_data.action for obj in objects if obj.animation_data is not None]
+    bpy.data.batch_remove(objects + actions)
+
+
+def key_per_frame(objects, poses):
+    for obj, pose in zip(objects, poses):
+        n_frames = len(pose["location"])
+        for i in range(n_frames):
+            for data_path in data_paths:
+                setattr(obj, data_path, pose[data_path][i].tolist())
+                obj.keyframe_insert(data_path=data_path, frame=i)
+
+
+def key_in_bulk(objects, poses):
+    for obj, pose in zip(objects, poses):
+        for data_path in data_paths:
+            insert_keyframes(obj, data_path, pose[data_path])
+
+
+def evaluate(objects, n_frames):
+    """ Returns the animated values of all objects in every frame, read from the F-curves. """
+    values = np.empty((len(objects), n_frames, len(data_paths), 3))
+    for o, obj in enumerate(objects):
+        for fcurve in obj.animation_data.action.fcurves:
+            p = data_paths.index(fcurve.data_path)
+            values[o, :, p, fcurve.array_index] = [fcurve.evaluate(frame) for frame in range(n_frames)]
+    return values
+
+
+print("%8s %8s %18s %14s %9s %16s" % ("Objects", "Frames", "keyframe_insert ms", "bulk ms", "Speedup", "Max difference"))
+for num_objects in object_counts:
+    for n_frames in frame_counts:
+        poses = trajectories(num_objects, n_frames)
+        results = []
+        for method in [key_per_frame, key_in_bulk]:
+            objects = create_objects(num_objects)
+            start = time.time()
+            method(objects, poses)
+            elapsed = time.time() - start
+            results.append((elapsed, evaluate(objects, n_frames)))
+            remove_objects(objects)
+        (per_frame_time, per_frame_values), (bulk_time, bulk_values) = results
+        print("%8d %8d %18.1f %14.1f %8.1fx %16.2g" % (num_objects, n_frames, per_frame_time * 1000, bulk_time * 1000,
+                                                      per_frame_time / max(bulk_time, 1e-9), np.abs(per_frame_values - bulk_values).max()))
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(repo_root_directory)
+from src.utility.ConfigParser import ConfigParser
+
+parser = argparse.ArgumentParser("Measures the per job overhead of run.py, with and without the single parse launcher mode used by pool_run.py --single_parse")
+parser.add_argument('config', help='Path to a yaml file')
+parser.add_argument('args', nargs='*', help='Arguments used to fill the <args:i> placeholders of the yaml')
+parser.add_argument('-n', type=int, help='Number of launches per mode', default=20)
+args = parser.parse_args()
+
+# A blender installation which exits right away, s.t. only the overhead of the launcher itself is measured
+fake_blender_dir = tempfile.mkdtemp()
+os.makedirs(os.path.join(fake_blender_dir, "2.82"))
+fake_blender = os.path.join(fake_blender_dir, "blender")
+with open(fake_blender, "w") as f:
+    f.write("#!/bin/sh\nexit 0\n")
+os.chmod(fake_blender, 0o755)
+
+# Same yaml, but using the fake blender
+with open(args.config, "r") as f:
+    config = yaml.safe_load(f)
+config["setup"] = {"custom_blender_path": fake_blender_dir}
+config_path = os.path.join(fake_blender_dir, "config.yaml")
+with open(config_path, "w") as f:
+    yaml.safe_dump(config, f)
+
+
+def time_launches(command):
+    """ Returns the average wall time of the given command in ms. """
+    start = time.time()
+    for _ in range(args.n):
+        subprocess.check_call(command, cwd=repo_root_directory, stdout=subprocess.DEVNULL)
+    return (time.time() - start) / args.n * 1000
+
+
+def time_in_process(function):
+    """ Returns the average wall time of the given function in ms. """
+    start = time.time()
+    for _ in range(args.n):
+        function()
+    return (time.time() - start) / args.n * 1000
+
+
+# Before: run.py parses the yaml to find blender, blender parses it again in Pipeline.__init__
+launcher_before = time_launches([sys.executable, "run.py", "--fast", config_path] + args.args)
+blender_parse_before = time_in_process(lambda: ConfigParser(silent=True).parse(config_path, args.args))
+
+# After: the dispatcher parses once and writes json, run.py only starts blender, which reads the json
+def parse_and_dump():
+    with open(json_path, "w") as f:
+        json.dump(ConfigParser(silent=True).parse(config_path, args.args), f)
+
+def load_json():
+    with open(json_path, "r") as f:
+        json.load(f)
+
+json_path = os.path.join(fake_blender_dir, "parsed_config.json")
+dispatcher_after = time_in_process(parse_and_dump)
+launcher_after = time_launches([sys.executable, "run.py", "--blender", fake_blender, "--parsed_config", json_path, config_path] + args.args)
+blender_parse_after = time_in_process(load_json)
+
+shutil.rmtree(fake_blender_dir)
+
+print("Launcher overhead per job (ms, average of %d runs, without blender's own startup):" % args.n)
+print("%-32s %10s %10s" % ("", "before", "after"))
+print("%-32s %10.1f %10.1f" % ("parse in dispatcher", 0.0, dispatcher_after))
+print("%-32s %10.1f %10.1f" % ("run.py until blender exits", launcher_before, launcher_after))
+print("%-32s %10.1f %10.1f" % ("config parse inside blender", blender_parse_before, blender_parse_after))
+print("%-32s %10.1f %10.1f" % ("total", launcher_before + blender_parse_before, dispatcher_after + launcher_after + blender_parse_after))
@@ -0,0 +1,123 @@
+# Compares the global undo (Utility.UndoAfterExecution) with the targeted restore (Utility.RestoreAfterExecution), which
+# the segmentation, flow and sim rgb renderers use, in time and peak memory, has to be run inside blender:
+# blender --background --python scripts/benchmark_renderer_restore.py [-- <number of objects>]
+#
+# Every strategy is measured in a fresh blender process, as the peak memory of a process can not be reset.
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import bpy
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
+# The yaml package used by the pipeline is installed there, see src/run.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(sys.executable), "custom-python-packages")))
+
+from src.utility.Utility import Utility
+
+arguments = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+number_of_objects = int(arguments[0]) if len(arguments) > 0 else 500
+strategy = arguments[1] if len(arguments) > 1 else None
+number_of_runs = 10
+
+
+def build_scene():
+    """ Creates objects with subdivided meshes and textured materials, similar to a loaded scene. """
+    image = bpy.data.images.new("texture", 1024, 1024)
+    for i in range(number_of_objects):
+        mesh = bpy.data.meshes.new("mesh_%d" % i)
+        vertices = [(x, y, 0) for x in range(20) for y in range(20)]
+        faces = [(x * 20 + y, (x + 1) * 20 + y, (x + 1) * 20 + y + 1, x * 20 + y + 1) for x in range(19) for y in range(19)]
+        mesh.from_pydata(vertices, [], faces)
+        material = bpy.data.materials.new("material_%d" % i)
+        material.use_nodes = True
+        material.node_tree.nodes.new("ShaderNodeTexImage").image = image
+        mesh.materials.append(material)
+        obj = bpy.data.objects.new("object_%d" % i, mesh)
+        bpy.context.scene.collection.objects.link(obj)
+    if bpy.context.scene.world is None:
+        bpy.context.scene.world = bpy.data.worlds.new("World")
+    bpy.context.scene.world.use_nodes = True
+    # Creates the compositor tree with its default nodes
+    bpy.context.scene.use_nodes = True
+    bpy.context.scene.use_nodes = False
+
+
+def change_like_a_seg_renderer(run):
+    """ Does the changes of SegMapRenderer and FlowRenderer without rendering: render settings, one emission material per object, background color and compositor nodes. """
+    scene = bpy.context.scene
+    scene.render.engine = "CYCLES"
+    scene.cycles.samples = 1
+    scene.cycles.filter_width = 0.0
+    scene.render.resolution_x = 512 + run
+    scene.render.image_settings.file_format = "OPEN_EXR"
+    scene.render.image_settings.color_depth = "16"
+    bpy.context.view_layer.cycles.use_denoising = False
+    scene.view_layers[0].use_pass_vector = True
+    scene.use_nodes = True
+    scene.node_tree.nodes.new("CompositorNodeOutputFile")
+
+    for i, obj in enumerate(scene.objects):
+        if not hasattr(obj.data, "materials"):
+            continue
+        new_mat = bpy.data.materials.new(name="segmentation")
+        new_mat.use_nodes = True
+        emission_node = new_mat.node_tree.nodes.new(type="ShaderNodeEmission")
+        emission_node.inputs["Color"].default_value[:3] = (i, i, i)
+        new_mat.node_tree.links.new(emission_node.outputs["Emission"], new_mat.node_tree.nodes["Material Output"].inputs["Surface"])
+        for slot_index in range(len(obj.material_slots)):
+            obj.data.materials[slot_index] = new_mat
+    scene.world.node_tree.nodes["Background"].inputs["Color"].default_value[:3] = (0, 0, 0)
+
+
+def scene_state():
+    """ Returns what the changes above touch, to check it is the same afterwards. """
+    scene = bpy.context.scene
+    return {
+        "materials": len(bpy.data.materials),
+        "slots": [slot.material.name for obj in scene.objects for slot in obj.material_slots],
+        "resolution_x": scene.render.resolution_x,
+        "file_format": scene.render.image_settings.file_format,
+        "compositor_nodes": len(scene.node_tree.nodes) if scene.node_tree is not None else 0,
+        "background": tuple(scene.world.node_tree.nodes["Background"].inputs["Color"].default_value)
+    }
+
+
+def measure():
+    """ Runs the changes number_of_runs times inside the with-block of the strategy and prints time, peak memory and whether the scene was restored. """
+    build_scene()
+    before = scene_state()
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    restored = True
+    start = time.time()
+    for run in range(number_of_runs):
+        block = Utility.UndoAfterExecution() if strategy == "undo" else Utility.RestoreAfterExecution()
+        with block:
+            change_like_a_seg_renderer(run)
+        restored = restored and scene_state() == before
+    elapsed = (time.time() - start) / number_of_runs
+    peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print("RESULT " + json.dumps({"time": elapsed, "peak_growth": peak_after - peak_before, "restored": restored}))
+
+
+if strategy is not None:
+    measure()
+else:
+    print("%d objects, %d runs per strategy" % (number_of_objects, number_of_runs))
+    print("%-10s %12s %22s  %s" % ("Strategy", "ms per run", "peak memory +MB", "restored"))
+    for strategy in ["undo", "restore"]:
+        output = subprocess.check_output([bpy.app.binary_path, "--background", "--factory-startup", "--python", os.path.abspath(__file__), "--", str(number_of_objects), strategy], stderr=subprocess.DEVNULL)
+        result = None
+        for line in output.decode("utf-8").splitlines():
+            if line.startswith("RESULT "):
+                result = json.loads(line[len("RESULT "):])
+        # Blender exits normally, even if the script raised an exception
+        if result is None:
+            print("%-10s failed" % strategy)
+            continue
+        print("%-10s %12.1f %22.1f  %s" % (strategy, result["time"] * 1000, result["peak_growth"], result["restored"]))
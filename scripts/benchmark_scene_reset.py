@@ -0,0 +1,103 @@
+# Compares the scene reset strategies of Pipeline ("cleanup" and "snapshot") over many consecutive jobs and checks
+# that no datablocks accumulate and that renamed datablocks of the snapshot are kept, has to be run inside blender:
+# blender --background --python scripts/benchmark_scene_reset.py [-- <number of jobs>]
+import os
+import sys
+import time
+
+import bpy
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
+# The yaml package used by the pipeline is installed there, see src/run.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(sys.executable), "custom-python-packages")))
+
+from src.main.Pipeline import Pipeline
+from src.utility.SceneSnapshot import SceneSnapshot
+
+number_of_jobs = int(sys.argv[sys.argv.index("--") + 1]) if "--" in sys.argv else 100
+objects_per_job = 50
+
+
+def run_fake_job(job_index):
+    """ Creates the kind of datablocks a rendering job leaves behind: objects with meshes, materials and images,
+    node groups, collections, a world, animation data, a camera, lights and custom scene properties. """
+    collection = bpy.data.collections.new("job_%d" % job_index)
+    bpy.context.scene.collection.children.link(collection)
+    node_group = bpy.data.node_groups.new("group_%d" % job_index, "ShaderNodeTree")
+    for i in range(objects_per_job):
+        mesh = bpy.data.meshes.new("mesh_%d" % i)
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], [], [(0, 1, 2), (0, 1, 3), (0, 2, 3), (1, 2, 3)])
+        material = bpy.data.materials.new("material_%d" % i)
+        material.use_nodes = True
+        material.node_tree.nodes.new("ShaderNodeGroup").node_tree = node_group
+        texture = material.node_tree.nodes.new("ShaderNodeTexImage")
+        texture.image = bpy.data.images.new("image_%d" % i, 16, 16)
+        mesh.materials.append(material)
+        obj = bpy.data.objects.new("object_%d" % i, mesh)
+        collection.objects.link(obj)
+        obj.keyframe_insert(data_path="location", frame=0)
+        obj.location = (i, 0, 0)
+        obj.keyframe_insert(data_path="location", frame=10)
+
+    camera = bpy.data.objects.new("camera", bpy.data.cameras.new("camera"))
+    bpy.context.scene.collection.objects.link(camera)
+    bpy.context.scene.camera = camera
+    for i in range(3):
+        light = bpy.data.objects.new("light_%d" % i, bpy.data.lights.new("light_%d" % i, "POINT"))
+        bpy.context.scene.collection.objects.link(light)
+    bpy.context.scene.world = bpy.data.worlds.new("world_%d" % job_index)
+    bpy.context.scene["job_property"] = job_index
+
+
+def benchmark(scene_reset):
+    """ Runs the fake jobs, each one after resetting the scene with the given strategy.
+
+    :return: The average reset time in ms and the datablocks added between the first and the last reset per collection.
+    """
+    Pipeline._base_snapshot = None
+    # Only the scene reset of the pipeline is used, which does not need a config
+    pipeline = Pipeline.__new__(Pipeline)
+    counter = SceneSnapshot()
+    reset_time = 0.0
+    for job_index in range(number_of_jobs):
+        start = time.time()
+        pipeline._reset_scene(scene_reset)
+        reset_time += time.time() - start
+        if job_index == 0:
+            first_counts = counter.count_datablocks()
+        run_fake_job(job_index)
+    pipeline._reset_scene(scene_reset)
+    last_counts = counter.count_datablocks()
+    growth = {name: last_counts[name] - first_counts[name] for name in first_counts if last_counts[name] != first_counts[name]}
+    return reset_time / number_of_jobs * 1000, growth
+
+
+def check_renamed_base_datablocks():
+    """ Renames the scene and the world of the snapshot like a job might and checks that the reset keeps them under their former names.
+
+    :return: True, if both still exist under their former names and the scene still uses the world.
+    """
+    Pipeline._base_snapshot = None
+    pipeline = Pipeline.__new__(Pipeline)
+    scene = bpy.context.scene
+    if scene.world is None:
+        scene.world = bpy.data.worlds.new("World")
+    pipeline._reset_scene("snapshot")
+    scene_name, world_name = scene.name, scene.world.name
+
+    scene.name = "renamed_scene"
+    scene.world.name = "renamed_world"
+    run_fake_job(0)
+    pipeline._reset_scene("snapshot")
+    return scene_name in bpy.data.scenes and world_name in bpy.data.worlds and bpy.data.scenes[scene_name].world == bpy.data.worlds[world_name]
+
+
+print("Renamed scene and world survive the snapshot reset: %s" % check_renamed_base_datablocks())
+print("%d jobs with %d objects each" % (number_of_jobs, objects_per_job))
+print("%-10s %16s  %s" % ("Strategy", "ms per reset", "Datablock growth over all jobs"))
+for scene_reset in ["cleanup", "snapshot"]:
+    ms_per_reset, growth = benchmark(scene_reset)
+    growth_text = ", ".join("%s: %+d" % item for item in sorted(growth.items())) if len(growth) > 0 else "none"
+    print("%-10s %16.1f  %s" % (scene_reset, ms_per_reset, growth_text))
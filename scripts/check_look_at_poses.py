@@ -0,0 +1,76 @@
+# Compares the camera poses computed with numpy for a whole trajectory (RotationUtility, as used by the
+# CameraTrajectoryRunner) with the former per frame computation via mathutils and measures both, has to be run inside blender:
+# blender --background --python scripts/check_look_at_poses.py
+import os
+import sys
+import time
+
+import numpy as np
+import numpy.polynomial.polynomial as polynomial
+from mathutils import Matrix, Vector, Euler
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
+# The yaml package used by the pipeline is installed there, see src/run.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(sys.executable), "custom-python-packages")))
+
+from src.utility.Utility import Utility
+from src.utility.RotationUtility import transform_points_to_blender_coord_frame, look_at_rotations
+
+source_frames = [["X", "Y", "Z"], ["X", "-Z", "Y"], ["-Y", "X", "-Z"]]
+n_frames = 10000
+
+
+def random_trajectory(random):
+    """ Returns the locations and look ats of a random cubic trajectory, like the ones of the job configs. """
+    pts = [i / (n_frames - 1) for i in range(n_frames)]
+    locations = polynomial.polyval(pts, random.uniform(-5, 5, (4, 3))).transpose(1, 0)
+    look_ats = polynomial.polyval(pts, random.uniform(-1, 1, (4, 3))).transpose(1, 0)
+    return locations, look_ats
+
+
+def special_directions():
+    """ Returns look ats from the origin which need the special cases: (almost) straight up or down and along the axes. """
+    directions = [[0, 0, 1], [0, 0, -1], [1e-5, 0, 1], [0, -1e-5, -1], [1e-3, 1e-3, -1], [1, 0, 0], [0, 1, 0], [-1, 0, 0], [0, -1, 0], [1, 1, 0]]
+    return np.zeros((len(directions), 3)), np.array(directions, dtype=np.float64)
+
+
+def poses_with_mathutils(locations, look_ats, source_frame):
+    """ The former per frame computation of the CameraTrajectoryRunner (CameraModule._cam2world_matrix_from_cam_extrinsics_look_at()). """
+    rotation_matrices = np.empty((len(locations), 3, 3))
+    rotation_eulers = np.empty((len(locations), 3))
+    for i, (location, look_at) in enumerate(zip(locations.tolist(), look_ats.tolist())):
+        position = Vector(Utility.transform_point_to_blender_coord_frame(location, source_frame))
+        forward_vec = Vector(look_at) - position
+        forward_vec.normalize()
+        rotation_euler = forward_vec.to_track_quat('-Z', 'Y').to_euler()
+        cam2world_matrix = Matrix.Translation(position) @ Euler(rotation_euler, 'XYZ').to_matrix().to_4x4()
+        rotation_matrices[i] = cam2world_matrix.to_3x3().normalized()
+        rotation_eulers[i] = cam2world_matrix.to_3x3().normalized().to_euler('XYZ')
+    return rotation_matrices, rotation_eulers
+
+
+def poses_with_numpy(locations, look_ats, source_frame):
+    positions = transform_points_to_blender_coord_frame(locations, source_frame)
+    return look_at_rotations(positions, look_ats)
+
+
+def euler_difference(a, b):
+    """ The difference of euler angles, ignoring multiples of 2 pi. """
+    return np.abs((a - b + np.pi) % (2 * np.pi) - np.pi)
+
+
+random = np.random.RandomState(0)
+print("%-16s %10s %12s %12s %16s %16s" % ("Source frame", "Frames", "mathutils ms", "numpy ms", "Max matrix diff", "Max euler diff"))
+for source_frame in source_frames:
+    for name, (locations, look_ats) in [(str(n_frames), random_trajectory(random)), ("special", special_directions())]:
+        start = time.time()
+        expected_matrices, expected_eulers = poses_with_mathutils(locations, look_ats, source_frame)
+        mathutils_time = time.time() - start
+        start = time.time()
+        matrices, eulers = poses_with_numpy(locations, look_ats, source_frame)
+        numpy_time = time.time() - start
+        # mathutils works in single precision, so differences around 1e-6 are expected
+        print("%-16s %10s %12.1f %12.1f %16.2g %16.2g" % (",".join(source_frame), name, mathutils_time * 1000, numpy_time * 1000,
+                                                          np.abs(matrices - expected_matrices).max(), euler_difference(eulers, expected_eulers).max()))
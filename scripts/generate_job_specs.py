@@ -0,0 +1,63 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(repo_root_directory)
+from src.pool.TrajectoryGenerator import ModelExtents, TrajectoryGenerator
+
+parser = argparse.ArgumentParser("Generates the trajectories of videos as JSONL job specs for pool_run.py --template <yaml> --job_specs <jsonl>")
+parser.add_argument('--models', help='Path to ShapeNetCore.v2 (or any directory of .obj files, see --model_pattern)', required=True)
+parser.add_argument('--textures', help='Path to a directory of texture images', default=None)
+parser.add_argument('--output', help='The output directory of pool_run.py, the output_dir of every video is <output>/<name>', required=True)
+parser.add_argument('--job_specs', help='The JSONL file to write', required=True)
+parser.add_argument('-n', type=int, help='Number of videos', default=1000)
+parser.add_argument('--start', type=int, help='Index of the first video, the videos are named by their index', default=0)
+parser.add_argument('--append', action='store_true', help='Append to --job_specs instead of overwriting it (e.g. while pool_run.py is already rendering it)')
+parser.add_argument('--seed', type=int, help='Seed of the random generator', default=0)
+parser.add_argument('--frames', type=int, help='Number of frames per video', default=160)
+parser.add_argument('--objects', help='Smallest and largest number of objects per video', default='3,5')
+parser.add_argument('--lights', help='Smallest and largest number of lights per video', default='1,2')
+parser.add_argument('--candidates', type=int, help='Number of trajectories sampled per object, the one with the least overlap is accepted', default=64)
+parser.add_argument('--score_frames', type=int, help='Number of evenly spaced frames the overlap is scored in', default=32)
+parser.add_argument('--batch_size', type=int, help='Number of videos generated at once', default=64)
+parser.add_argument('--model_pattern', help='Glob pattern of the models below --models', default='*/*/models/model_normalized.obj')
+parser.add_argument('--extents', help='Json file caching the extents of the models, default: model_extents.json next to --job_specs')
+args = parser.parse_args()
+
+start_time = time.time()
+models = sorted(glob.glob(os.path.join(os.path.abspath(args.models), args.model_pattern)))
+textures = []
+if args.textures is not None:
+    textures = sorted(path for path in glob.glob(os.path.join(os.path.abspath(args.textures), '**', '*'), recursive=True)
+                      if path.lower().endswith(('.jpg', '.jpeg', '.png', '.tga', '.bmp', '.tif', '.tiff')))
+print('Found %d models and %d textures in %.1fs' % (len(models), len(textures), time.time() - start_time))
+
+extents_path = args.extents if args.extents is not None else os.path.join(os.path.dirname(os.path.abspath(args.job_specs)), 'model_extents.json')
+extents = ModelExtents(extents_path)
+generator = TrajectoryGenerator(models, textures, extents, seed=args.seed, n_frames=args.frames,
+                                num_objects=tuple(int(x) for x in args.objects.split(',')), num_lights=tuple(int(x) for x in args.lights.split(',')),
+                                num_candidates=args.candidates, score_frames=args.score_frames)
+
+start_time = time.time()
+costs = []
+with open(args.job_specs, 'a' if args.append else 'w') as f:
+    for batch_start in range(args.start, args.start + args.n, args.batch_size):
+        names = ['%05d' % i for i in range(batch_start, min(batch_start + args.batch_size, args.start + args.n))]
+        specs, batch_costs = generator.generate(names, os.path.abspath(args.output))
+        # Whole lines only, pool_run.py might read the file at the same time
+        f.write(''.join(json.dumps(spec) + '\n' for spec in specs))
+        f.flush()
+        costs.append(batch_costs)
+        # The radii of new models are kept even if the generation is interrupted
+        extents.save()
+
+elapsed = time.time() - start_time
+costs = np.concatenate(costs)
+print('Generated %d videos in %.1fs (%.0f videos per minute)' % (args.n, elapsed, args.n / max(elapsed, 1e-9) * 60))
+print('Cost of the accepted objects: mean %.3f, max %.3f (overlap relative to the sum of the radii plus the fraction of frames outside of the view)' % (np.nanmean(costs), np.nanmax(costs)))
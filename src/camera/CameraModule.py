@@ -1,6 +1,8 @@
 from src.main.Module import Module
 from src.utility.ItemCollection import ItemCollection
 from src.utility.Utility import Utility
+from src.utility.BlenderUtility import insert_keyframes
+from src.utility.RotationUtility import transform_points_to_blender_coord_frame, look_at_rotations
 
 from mathutils import Matrix, Vector, Euler
 import math
@@ -57,6 +59,21 @@ def _insert_key_frames(self, cam, cam_ob, frame_id):
         cam_ob.keyframe_insert(data_path='location', frame=frame_id)
         cam_ob.keyframe_insert(data_path='rotation_euler', frame=frame_id)
 
+    def _insert_key_frames_for_trajectory(self, cam, cam_ob, locations, rotation_eulers):
+        """ Inserts the key frames of _insert_key_frames() for the frames 0 to n-1 at once, see BlenderUtility.insert_keyframes().
+
+        :param cam: The camera which contains only camera specific attributes, its current attributes are keyed for every frame.
+        :param cam_ob: The object linked to the camera.
+        :param locations: An array with the location of the camera per frame (n x 3).
+        :param rotation_eulers: An array with the XYZ euler angles of the camera per frame (n x 3).
+        """
+        num_frames = len(locations)
+        for data_path in ['clip_start', 'clip_end', 'shift_x', 'shift_y']:
+            insert_keyframes(cam, data_path, np.full(num_frames, getattr(cam, data_path)))
+
+        insert_keyframes(cam_ob, 'location', locations)
+        insert_keyframes(cam_ob, 'rotation_euler', rotation_eulers)
+
     def _set_cam_intrinsics(self, cam, config):
         """ Sets camera intrinsics from a source with following priority
 
@@ -120,6 +137,22 @@ def _set_cam_intrinsics(self, cam, config):
         cam.stereo.interocular_distance = config.get_float("interocular_distance", 0.065)
 
 
+    def _get_cam_K(self, cam):
+        """ Returns the camera matrix K of the current intrinsics, the inverse of the conversion in _set_cam_intrinsics().
+
+        Square pixels and the default sensor fit are assumed, i.e. the FOV spans the larger image dimension.
+
+        :param cam: The camera which contains only camera specific attributes.
+        :return: The camera matrix K (3 x 3).
+        """
+        width, height = bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y
+        max_resolution = max(width, height)
+        focal_length = max_resolution / (2 * np.tan(cam.angle / 2))
+        # Blender's shift is given in proportion to the larger image dimension
+        cx = width / 2.0 - cam.shift_x * max_resolution
+        cy = height / 2.0 + cam.shift_y * max_resolution
+        return np.array([[focal_length, 0, cx], [0, focal_length, cy], [0, 0, 1]])
+
     def _set_cam_extrinsics(self, cam_ob, config):
         """ Sets camera extrinsics according to the config.
 
@@ -196,4 +229,15 @@ def _cam2world_matrix_from_cam_extrinsics_look_at(self, location, look_at):
 
         cam2world_matrix = Matrix.Translation(position) @ Euler(rotation_euler, 'XYZ').to_matrix().to_4x4()
 
-        return cam2world_matrix
\ No newline at end of file
+        return cam2world_matrix
+
+    def _cam_poses_from_look_at(self, locations, look_ats):
+        """ Determines the camera extrinsics of a whole trajectory at once, same as _cam2world_matrix_from_cam_extrinsics_look_at() per frame.
+
+        :param locations: An array with the location of the camera per frame (n x 3), in the source frame.
+        :param look_ats: An array with the point the camera looks at per frame (n x 3), as before it is not transformed.
+        :return: The locations (n x 3), the rotation matrices (n x 3 x 3) and the XYZ euler angles (n x 3) of the camera in the blender frame.
+        """
+        positions = transform_points_to_blender_coord_frame(locations, self.source_frame)
+        rotation_matrices, rotation_eulers = look_at_rotations(positions, look_ats)
+        return positions, rotation_matrices, rotation_eulers
@@ -6,6 +6,7 @@
 import bmesh
 import sys
 import numbers
+import numpy as np
 import numpy.polynomial.polynomial as poly
 from collections import defaultdict
 
@@ -30,14 +31,22 @@ def run(self, n_frames):
         locations_np = poly.polyval(pts, self.location_poly)
         look_ats_np = poly.polyval(pts, self.look_at_poly)
 
-        locations = locations_np.transpose(1, 0).astype(float).tolist()
-        look_ats = look_ats_np.transpose(1, 0).astype(float).tolist()
-
-        for i in range(n_frames):
-
-            # Resolve a new camera pose, sets the parameters of the given camera object accordingly.
-            location = locations[i]
-            look_at = look_ats[i]
-            cam_ob.matrix_world = self._cam2world_matrix_from_cam_extrinsics_look_at(location, look_at)
-
-            self._insert_key_frames(cam, cam_ob, i)
\ No newline at end of file
+        # Resolve the camera poses of all frames, split up in the same way as blender does when setting matrix_world
+        cam_locations, cam_rotation_matrices, cam_rotations = self._cam_poses_from_look_at(locations_np.transpose(1, 0), look_ats_np.transpose(1, 0))
+
+        cam2world_matrices = np.zeros((n_frames, 4, 4))
+        cam2world_matrices[:, :3, :3] = cam_rotation_matrices
+        cam2world_matrices[:, :3, 3] = cam_locations
+        cam2world_matrices[:, 3, 3] = 1
+
+        self._insert_key_frames_for_trajectory(cam, cam_ob, cam_locations, cam_rotations)
+        # As before, the camera is left at the pose of the last frame
+        cam_ob.matrix_world = mathutils.Matrix(cam2world_matrices[-1].tolist())
+
+        # Read by the VOSTrajRunner for its pose table
+        self.trajectory = {
+            "cam2world": cam2world_matrices,
+            "cam_K": self._get_cam_K(cam),
+            "resolution": [bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y],
+            "clip": [cam.clip_start, cam.clip_end]
+        }
\ No newline at end of file
@@ -1,8 +1,11 @@
 from src.main.Module import Module
 from src.utility.Utility import Utility
 from src.utility.BlenderUtility import get_all_mesh_objects
+from src.utility.PoseTable import write_pose_table, POSE_TABLE_VERSION
 
 import bpy
+import numpy as np
+import os
 
 class VOSTrajRunner(Module):
     """ Run an complete predefined trajectory
@@ -16,6 +19,7 @@ class VOSTrajRunner(Module):
        "object_runner", "object.ObjectTrajectoryRunner"
        "camera_runner", "camera.CameraTrajectoryRunner"
        "light_runner", "light.LightTrajectoryRunner"
+       "write_pose_table", "If true, the poses of all objects and lights and the camera intrinsics and extrinsics of every frame are written to <output_dir>/pose_table.npz and registered as output 'pose_table', see PoseTable.write_pose_table(). Default: True"
     """
 
     def __init__(self, config):
@@ -42,3 +46,33 @@ def run(self):
 
         bpy.context.scene.frame_end += n_frames
         bpy.context.view_layer.update()
+
+        if self.config.get_bool("write_pose_table", True):
+            self._write_pose_table(n_frames)
+
+    def _write_pose_table(self, n_frames):
+        """ Writes the trajectories the runners computed into one table and registers it, s.t. writers and post-processing can read the poses without evaluating the scene.
+
+        :param n_frames: The number of frames, the runners keyed the frames 0 to n_frames - 1.
+        """
+        entities = [(runner.trajectory, "object") for runner in self._object_runners] + [(runner.trajectory, "light") for runner in self._light_runners]
+        poses = {data_path: np.empty((n_frames, len(entities), 3)) for data_path in ["location", "rotation_euler", "scale"]}
+        for i, (trajectory, _) in enumerate(entities):
+            for data_path, values in poses.items():
+                values[:, i] = trajectory[data_path]
+        camera = self._camera_runner.trajectory
+
+        output_dir = self._determine_output_dir(False)
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "pose_table.npz")
+        write_pose_table(path, np.arange(n_frames), [trajectory["name"] for trajectory, _ in entities], [entity_type for _, entity_type in entities],
+                         poses["location"], poses["rotation_euler"], poses["scale"], camera["cam2world"], camera["cam_K"], camera["resolution"], camera["clip"])
+
+        self._add_output_entry({
+            "key": "pose_table",
+            "path": path,
+            "version": POSE_TABLE_VERSION,
+            "stereo": False,
+            # One file for all frames, see Hdf5Writer
+            "pose_table": True
+        })
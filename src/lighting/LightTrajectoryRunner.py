@@ -2,10 +2,11 @@
 import bpy
 import random
 
+import numpy as np
 import numpy.polynomial.polynomial as poly
 from src.main.Module import Module
 from src.utility.Utility import Utility
-from mathutils import Vector, Euler
+from src.utility.BlenderUtility import insert_keyframes
 
 
 class LightTrajectoryRunner(Module):
@@ -33,12 +34,14 @@ def run(self, n_frames):
         locations_np = poly.polyval(pts, self.location_poly)
         rotations_np = poly.polyval(pts, self.rotation_poly)
 
-        locations = locations_np.transpose(1, 0).astype(float).tolist()
-        rotations = rotations_np.transpose(1, 0).astype(float).tolist()
-
-        for i in range(n_frames):
-            light_obj.location = Vector(locations[i])
-            light_obj.rotation_euler = Euler(rotations[i])
-
-            light_obj.keyframe_insert(data_path='location', frame=i)
-            light_obj.keyframe_insert(data_path='rotation_euler', frame=i)
+        # One row per frame
+        insert_keyframes(light_obj, 'location', locations_np.transpose(1, 0))
+        insert_keyframes(light_obj, 'rotation_euler', rotations_np.transpose(1, 0))
+
+        # Read by the VOSTrajRunner for its pose table
+        self.trajectory = {
+            "name": light_obj.name,
+            "location": locations_np.transpose(1, 0),
+            "rotation_euler": rotations_np.transpose(1, 0),
+            "scale": np.tile(light_obj.scale, (n_frames, 1))
+        }
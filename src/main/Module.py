@@ -1,7 +1,6 @@
+import json
 import os
 
-import bpy
-
 from src.utility.Utility import Utility
 
 
@@ -15,8 +14,12 @@ class Module:
        "output_is_temp", "If True, all files created in this module will be written into the temp_dir. If False, the output_dir is used."
        "output_dir", "The path to a directory where all persistent output files should be stored. If it doesn't exist, it is created automatically."
        "temp_dir", "The path to a directory where all temporary output files should be stored. If it doesn't exist, it is created automatically."
+       "postprocessing_dir", "If set, CPU heavy post-processing (e.g. converting the rendered segmentation) is not done inside blender, but written as tasks into this directory and done by the workers of pool_run.py --pipeline."
     """
 
+    # Seconds spent on importing python modules while this module (and its sub modules) was initialized, set by Utility.initialize_modules()
+    import_time = 0.0
+
     def __init__(self, config, mk_dir=True):
         self.config = config
 
@@ -28,6 +31,8 @@ def __init__(self, config, mk_dir=True):
         self._temp_dir = Utility.get_temporary_directory(config)
         os.makedirs(self._temp_dir, exist_ok=True)
 
+        self._postprocessing_dir = self.config.get_string("postprocessing_dir", "")
+
     def _determine_output_dir(self, output_is_temp_default=True):
         """ Returns the directory where to store output file created by this module.
 
@@ -39,16 +44,29 @@ def _determine_output_dir(self, output_is_temp_default=True):
         else:
             return self._output_dir
 
+    def _postprocessing_is_deferred(self):
+        """ Returns whether post-processing should be handed to the post-processing workers instead of being done here.
+
+        :return: True, if a postprocessing_dir is configured.
+        """
+        return self._postprocessing_dir != ""
+
+    def _add_postprocessing_task(self, task):
+        """ Appends a task to the list of post-processing tasks of the current job.
+
+        The tasks are executed in the order they were added, see PostProcessingUtility.run_postprocessing().
+
+        :param task: A json serializable dict with at least "type", "source" and "target".
+        """
+        with open(os.path.join(self._postprocessing_dir, "tasks.jsonl"), "a") as f:
+            f.write(json.dumps(task) + "\n")
+
     def _add_output_entry(self, output):
-        """ Registers the given output in the scene's custom properties
+        """ Registers the given output in the output registry of the current job (see OutputRegistry)
 
         :param output: A dict containing key and path of the new output type.
         """
-        if "output" in bpy.context.scene:
-            if not self._output_already_registered(output, bpy.context.scene["output"]): # E.g. multiple camera samplers
-                bpy.context.scene["output"] += [output]
-        else:
-            bpy.context.scene["output"] = [output]
+        Utility.output_registry.add(output)
 
     def _register_output(self, default_prefix, default_key, suffix, version, stereo=False, unique_for_camposes=True, output_key_parameter_name="output_key", output_file_prefix_parameter_name="output_file_prefix"):
         """ Registers new output type using configured key and file prefix.
@@ -76,29 +94,4 @@ def _find_registered_output_by_key(self, key):
         :param key: The output key to look for.
         :return: The dict containing all information registered for that output. If no output with the given key exists, None is returned.
         """
-        if "output" in bpy.context.scene:
-            for output in bpy.context.scene["output"]:
-                if output["key"] == key:
-                    return output.to_dict()
-
-        return None
-
-    def _output_already_registered(self, output, output_list):
-        """ Checks if the given output entry already exists in the list of outputs, by checking on the key and path.
-        Also throws an error if it detects an entry having the same key but not the same path and vice versa since this
-        is ambiguous.
-
-        :param output: The output dict entry.
-        :param output_list: The list of output entries.
-        :return: bool indicating whether it already exists.
-        """
-        for _output in output_list:
-            if output["key"] == _output["key"] and output["path"] == _output["path"]:
-                print("Warning! Detected output entries with duplicate keys and paths")
-                return True
-            if output["key"] == _output["key"] or output["path"] == _output["path"]:
-                raise Exception("Can not have two output entries with the same key/path but not same path/key." +
-                                "Original entry's data: key:{} path:{}, Entry to be registered: key:{} path:{}"
-                                .format(_output["key"], _output["path"], output["key"], output["path"]))
-
-        return False
+        return Utility.output_registry.find(key)
@@ -1,22 +1,46 @@
 
 import shutil
 import os
+import json
+import cProfile
 import bpy
 
 from src.utility.ConfigParser import ConfigParser
+from src.utility.OutputRegistry import OutputRegistry
+from src.utility.SceneSnapshot import SceneSnapshot
 from src.utility.Utility import Utility, Config
 
 class Pipeline:
+    # The clean scene of this blender process, taken after the first clean up when scene_reset is "snapshot"
+    _base_snapshot = None
+    # The number of datablocks per bpy.data collection after the scene reset of the first job of this blender process
+    _datablocks_after_first_reset = None
 
-    def __init__(self, config_path, args, working_dir, should_perform_clean_up=True, avoid_rendering=False):
+    def __init__(self, config_path, args, working_dir, should_perform_clean_up=True, avoid_rendering=False, postprocessing_dir=None, parsed_config=None, scene_reset="cleanup", profile_modules=None, job_name=None):
         Utility.working_dir = working_dir
 
         # Clean up example scene or scene created by last run when debugging pipeline inside blender
         if should_perform_clean_up:
-            self._cleanup() 
+            self._reset_scene(scene_reset)
+            self._check_datablocks_after_reset()
+        # The outputs registered by the previous job are gone together with its scene
+        Utility.output_registry = OutputRegistry()
 
-        config_parser = ConfigParser(silent=True)
-        config = config_parser.parse(Utility.resolve_path(config_path), args)
+        if parsed_config is not None:
+            # Already parsed by the launcher (placeholders are filled)
+            config = parsed_config
+        else:
+            config_parser = ConfigParser(silent=True)
+            config = config_parser.parse(Utility.resolve_path(config_path), args)
+
+        self._postprocessing_dir = postprocessing_dir
+        if postprocessing_dir is not None:
+            # Intermediate files are kept in the post-processing dir, until the post-processing workers are done with them
+            os.makedirs(postprocessing_dir, exist_ok=True)
+            config["temp_dir"] = postprocessing_dir
+            config["global"].setdefault("all", {})
+            config["global"]["all"]["temp_dir"] = postprocessing_dir
+            config["global"]["all"]["postprocessing_dir"] = postprocessing_dir
 
         config_object = Config(config)
         if not config_object.get_bool("avoid_rendering", False) and avoid_rendering:
@@ -25,12 +49,152 @@ def __init__(self, config_path, args, working_dir, should_perform_clean_up=True,
                 config["global"]["all"] = {}
             config["global"]["all"]["avoid_rendering"] = True
 
-        self._do_clean_up_temp_dir = config_object.get_bool("delete_temporary_files_afterwards", True)
+        self._do_clean_up_temp_dir = config_object.get_bool("delete_temporary_files_afterwards", True) and postprocessing_dir is None
         self._temp_dir = Utility.get_temporary_directory(config_object)
         os.makedirs(self._temp_dir, exist_ok=True)
 
+        self._config_path = config_path
+        # Jobs of a template and JSONL job specs share the config path, so they are told apart by their name
+        self._job_name = job_name if job_name is not None else os.path.splitext(os.path.basename(config_path))[0]
+        self._job = job_name if job_name is not None else config_path
+        self._timing_log_path = self._determine_timing_log_path(config_object)
+        self._output_manifest_path = self._determine_output_manifest_path(config_object)
+        self._profile_modules = profile_modules if profile_modules is not None else config_object.get_list("profile_modules", [])
+        self._profile_dir = self._determine_profile_dir(config_object)
+
         self.modules = Utility.initialize_modules(config["modules"], config["global"])
+        # Imports happen only once per blender process, so warm workers report the imports of their first job
+        print("Import cost of the loaded modules:\n" + Utility.format_import_report())
+
+    def _determine_timing_log_path(self, config_object):
+        """ Returns the path of the file, the per-module timing records of this run are written to.
+
+        Per default, the records are stored in "timings.jsonl" inside the global output_dir.
+        Can be turned off by setting "write_timings" to False.
+
+        :param config_object: The config object of the whole configuration.
+        :return: The path or None, if no timings should be written.
+        """
+        if not config_object.get_bool("write_timings", True):
+            return None
+        output_dir = config_object.get_string("global/all/output_dir", "")
+        if output_dir == "":
+            return None
+        return os.path.join(Utility.resolve_path(output_dir), "timings.jsonl")
+
+    def _determine_output_manifest_path(self, config_object):
+        """ Returns the path of the file listing all outputs registered by the modules, see OutputRegistry.write_manifest().
+
+        Per default, this is "output_manifest.json" inside the global output_dir.
+
+        :param config_object: The config object of the whole configuration.
+        :return: The path or None, if there is no global output_dir.
+        """
+        output_dir = config_object.get_string("global/all/output_dir", "")
+        if output_dir == "":
+            return None
+        return os.path.join(Utility.resolve_path(output_dir), "output_manifest.json")
+
+    def _determine_profile_dir(self, config_object):
+        """ Returns the directory the profiles of the modules listed in "profile_modules" are written to.
+
+        Per default, this is "profiles" inside the global output_dir, it can be changed via "profile_dir".
+
+        :param config_object: The config object of the whole configuration.
+        :return: The path or None, if there is no place to write the profiles to.
+        """
+        profile_dir = config_object.get_string("profile_dir", "")
+        if profile_dir == "":
+            output_dir = config_object.get_string("global/all/output_dir", "")
+            if output_dir == "":
+                return None
+            profile_dir = os.path.join(output_dir, "profiles")
+        return Utility.resolve_path(profile_dir)
+
+    def _should_profile(self, module):
+        """ Returns True, if the given module is selected by "profile_modules", either by "all", its class name (e.g.
+        "SegMapPngRenderer") or its module name (e.g. "renderer.SegMapPngRenderer").
+
+        :param module: The module to check.
+        """
+        if self._profile_dir is None:
+            return False
+        names = ["all", module.__class__.__name__, module.__class__.__module__.replace("src.", "", 1)]
+        return any(name in self._profile_modules for name in names)
+
+    def _profile_path(self, index, module):
+        """ Returns the path of the profile of the given module: <profile_dir>/<job>.<index>.<module class>.prof
 
+        :param index: The position of the module in the pipeline.
+        :param module: The profiled module.
+        """
+        return os.path.join(self._profile_dir, "%s.%02d.%s.prof" % (self._job_name, index, module.__class__.__name__))
+
+    def _write_timing_records(self, records):
+        """ Writes one json line per module into the timing log, replacing records from previous runs of the same job.
+
+        :param records: A list of dicts, one per module.
+        """
+        if self._timing_log_path is None:
+            return
+        os.makedirs(os.path.dirname(self._timing_log_path), exist_ok=True)
+        with open(self._timing_log_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def _write_postprocessing_manifest(self):
+        """ Publishes the post-processing tasks collected by the modules as manifest.jsonl.
+
+        The manifest is only created once the whole pipeline finished, so its existence marks the job as ready for post-processing.
+        """
+        if self._postprocessing_dir is None:
+            return
+        tasks_path = os.path.join(self._postprocessing_dir, "tasks.jsonl")
+        if not os.path.exists(tasks_path):
+            open(tasks_path, "w").close()
+        os.rename(tasks_path, os.path.join(self._postprocessing_dir, "manifest.jsonl"))
+
+    def _reset_scene(self, scene_reset):
+        """ Brings the scene into a clean state before the modules are initialized.
+
+        :param scene_reset: "cleanup" removes all objects, orphan data and custom properties. "snapshot" does the same
+                            for the first job of this blender process and afterwards removes everything created since
+                            then (see SceneSnapshot), which is faster and does not leave node groups, collections or
+                            worlds behind.
+        """
+        if scene_reset not in ["cleanup", "snapshot"]:
+            raise Exception("Unknown scene reset strategy: " + scene_reset)
+
+        if scene_reset == "snapshot" and Pipeline._base_snapshot is not None:
+            Pipeline._base_snapshot.restore()
+        else:
+            self._cleanup()
+            if scene_reset == "snapshot":
+                Pipeline._base_snapshot = SceneSnapshot()
+
+    def _check_datablocks_after_reset(self):
+        """ Warns if datablocks accumulate across the jobs of this blender process, i.e. the reset left some behind. """
+        counts = Utility.count_datablocks()
+        if Pipeline._datablocks_after_first_reset is None:
+            Pipeline._datablocks_after_first_reset = counts
+            return
+        growth = Pipeline._diff_datablock_counts(Pipeline._datablocks_after_first_reset, counts)
+        if len(growth) > 0:
+            print("Warning: Datablocks accumulated since the first job of this blender process: " + Pipeline._format_datablock_growth(growth))
+
+    @staticmethod
+    def _diff_datablock_counts(before, after):
+        """ Returns the collections whose number of datablocks changed.
+
+        :param before: The result of Utility.count_datablocks() before.
+        :param after: The result of Utility.count_datablocks() after.
+        :return: A dict mapping the collection name to the change of its length.
+        """
+        return {name: count - before.get(name, 0) for name, count in after.items() if count != before.get(name, 0)}
+
+    @staticmethod
+    def _format_datablock_growth(growth):
+        return ", ".join("%s %+d" % (name, change) for name, change in sorted(growth.items()))
 
     def _cleanup(self):
         """ Cleanup the scene by removing objects, orphan data and custom properties """
@@ -76,9 +240,56 @@ def _clean_up_temp_dir(self):
             shutil.rmtree(self._temp_dir)
 
     def run(self):
-        """ Runs each module and measuring their execution time. """
+        """ Runs each module and measuring their execution time.
+
+        For every module, one record with the wall time, the cpu time, the time spent on importing python modules during its
+        initialization, the number of frames in the scene, the resident memory after the module and how the memory and the
+        number of datablocks per bpy.data collection changed while it ran is written to the timing log.
+        Modules which leave datablocks behind are listed at the end of the run.
+
+        The modules selected by "profile_modules" are run under cProfile, their stats are written to the profile dir
+        (see _profile_path()) and can be merged across jobs with pool_run.py --profile_report. The measured times of a
+        profiled module include the overhead of the profiler.
+        """
+        records = []
         with Utility.BlockStopWatch("Running blender pipeline"):
-            for module in self.modules:
-                with Utility.BlockStopWatch("Running module " + module.__class__.__name__):
-                    module.run()
+            for index, module in enumerate(self.modules):
+                profiler = cProfile.Profile() if self._should_profile(module) else None
+                rss_before = Utility.get_memory_usage()
+                datablocks_before = Utility.count_datablocks()
+                with Utility.BlockStopWatch("Running module " + module.__class__.__name__) as stop_watch:
+                    if profiler is not None:
+                        profiler.enable()
+                    try:
+                        module.run()
+                    finally:
+                        if profiler is not None:
+                            profiler.disable()
+                if profiler is not None:
+                    os.makedirs(self._profile_dir, exist_ok=True)
+                    profiler.dump_stats(self._profile_path(index, module))
+                # Keeps bpy.context.scene["output"] up to date for code which still reads the outputs from there
+                Utility.output_registry.persist_to_scene()
+                rss_after = Utility.get_memory_usage()
+                datablock_growth = Pipeline._diff_datablock_counts(datablocks_before, Utility.count_datablocks())
+                records.append({
+                    "job": self._job,
+                    "index": index,
+                    "module": module.__class__.__name__,
+                    "wall_time": stop_watch.wall_time,
+                    "cpu_time": stop_watch.cpu_time,
+                    "import_time": module.import_time,
+                    # frame_end points to the next free frame
+                    "frames": bpy.context.scene.frame_end - bpy.context.scene.frame_start,
+                    "rss_mb": rss_after,
+                    "rss_growth_mb": rss_after - rss_before,
+                    "datablock_growth": datablock_growth
+                })
             self._clean_up_temp_dir()
+        for record in records:
+            if len(record["datablock_growth"]) > 0:
+                print("Datablocks added by %s: %s (memory %+.1f MB)" % (record["module"], Pipeline._format_datablock_growth(record["datablock_growth"]), record["rss_growth_mb"]))
+        self._write_timing_records(records)
+        if self._output_manifest_path is not None and len(Utility.output_registry) > 0:
+            Utility.output_registry.write_manifest(self._output_manifest_path, bpy.context.scene.frame_start, bpy.context.scene.frame_end)
+        self._write_postprocessing_manifest()
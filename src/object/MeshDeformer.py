@@ -1,15 +1,10 @@
 import bpy, bmesh
 import numpy as np
-import scipy
-import scipy.cluster
 import random
 import math
 import mathutils
 import itertools
-from sklearn.cluster import KMeans, SpectralClustering
-from scipy.spatial import cKDTree
 from collections import defaultdict
-from scipy.spatial.transform import Rotation
 import numpy.polynomial.polynomial as poly
 
 
@@ -30,6 +25,8 @@ def _insert_symmetric(A, rowA, colA, i, j, val):
 
 class Node:
     def __init__(self, managed, Vs, Ws, r=None, t=None):
+        # scipy and sklearn take seconds to import, so they are only imported once a mesh is actually deformed
+        from scipy.spatial.transform import Rotation
 
         self.managed = managed
         self.Vs = Vs.copy()
@@ -114,6 +111,11 @@ def get_adj_faces(self):
                     self.adj_faces_map[edge] = [index]
 
     def segment_mesh(self):
+        from sklearn.cluster import KMeans
+        import scipy.sparse
+        import scipy.sparse.csgraph
+        from scipy.spatial import cKDTree
+
         # Cluster the faces
         print("mesh_segmentation: Assigning face positions...")
         self.face_loc = np.empty((self.n_faces, 3), dtype=np.float32)
@@ -202,6 +204,8 @@ def _find_joints(self):
         return connections
 
     def _build_tree(self, connection):
+        from scipy.spatial import cKDTree
+
         # Start with a forest
         tree = {}
         for k in self.centroid.keys():
@@ -361,6 +365,7 @@ def build_animation(self, n_frames):
 
 
     def update_animation(self, frame_i):
+        from scipy.spatial.transform import Rotation
         for i in range(len(self.nodes)):
             if i in self.locked:
                 continue
@@ -1,11 +1,9 @@
 import bpy
 
-from src.utility.BlenderUtility import get_mesh_objects_with_name
+from src.utility.BlenderUtility import insert_keyframes
 from src.main.Module import Module
 from src.utility.Utility import Utility
-from src.object.MeshDeformer import MeshModeler
 
-from mathutils import Vector, Euler
 import numpy as np
 import numpy.polynomial.polynomial as polynomial
 import bmesh
@@ -24,18 +22,6 @@ def __init__(self, config):
         self.rotation_poly = self.config.get_list("poses/rotation_poly")
         self.scale_poly = self.config.get_list("poses/scale_poly")
 
-    # I have no idea why it gives me 3 arguments
-    # Maybe it just wants to argue with me
-    def mesh_deform_handler(self, scene, sth):
-        frame = scene.frame_current
-
-        if frame == 0:
-            self.obj = get_mesh_objects_with_name([self.name])[0]
-            self.modeler.mesh = self.obj.data
-
-        self.modeler.update_animation(frame)
-        self.modeler.apply_transformation()
-
     def run(self, n_frames):
 
         file_path = Utility.resolve_path(self.config.get_string("path"))
@@ -76,7 +62,8 @@ def run(self, n_frames):
             mat.use_nodes = True
             bsdf = mat.node_tree.nodes['Principled BSDF']
             texImage = mat.node_tree.nodes.new('ShaderNodeTexImage')
-            texImage.image = bpy.data.images.load(texture_path)
+            # Objects sharing a texture also share the image, instead of loading it once per object
+            texImage.image = bpy.data.images.load(texture_path, check_existing=True)
             mat.node_tree.links.new(bsdf.inputs['Base Color'], texImage.outputs['Color'])
 
             # Bring in the new material
@@ -98,15 +85,15 @@ def run(self, n_frames):
         rotations_np = polynomial.polyval(pts, self.rotation_poly)
         scales_np = polynomial.polyval(pts, self.scale_poly)
 
-        locations = locations_np.transpose(1, 0).astype(float).tolist()
-        rotations = rotations_np.transpose(1, 0).astype(float).tolist()
-        scales = scales_np.transpose(1, 0).astype(float).tolist()
-
-        for i in range(n_frames):
-            self.obj.location = Vector(locations[i])
-            self.obj.rotation_euler = Euler(rotations[i])
-            self.obj.scale = Vector(scales[i])
-
-            self.obj.keyframe_insert(data_path='location', frame=i)
-            self.obj.keyframe_insert(data_path='rotation_euler', frame=i)
-            self.obj.keyframe_insert(data_path='scale', frame=i)
+        # One row per frame
+        insert_keyframes(self.obj, 'location', locations_np.transpose(1, 0))
+        insert_keyframes(self.obj, 'rotation_euler', rotations_np.transpose(1, 0))
+        insert_keyframes(self.obj, 'scale', scales_np.transpose(1, 0))
+
+        # Read by the VOSTrajRunner for its pose table
+        self.trajectory = {
+            "name": self.obj.name,
+            "location": locations_np.transpose(1, 0),
+            "rotation_euler": rotations_np.transpose(1, 0),
+            "scale": scales_np.transpose(1, 0)
+        }
@@ -0,0 +1,185 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import time
+import uuid
+
+
+class BlenderWorker:
+    """ Keeps one Blender process (src/run.py in worker mode) alive and feeds it jobs over a local socket.
+
+    Blender startup, addon initialization and Cycles setup are then only paid once per worker instead of once per job.
+    The worker is restarted after a fixed number of jobs, when its memory usage passes a limit or when a job failed,
+    as the scene might be in an undefined state afterwards.
+
+    Blender runs in its own session, s.t. a Ctrl-C in the terminal of the dispatcher does not interrupt the current job.
+
+    Usage:
+        worker = BlenderWorker(["python", "run.py", "--fast", "config.yaml"])
+        result = worker.run_job("config.yaml", ["arg0", "arg1"])
+        worker.stop()
+    """
+
+    # Name of the environment variable which carries the token the Blender process has to send back when connecting
+    TOKEN_ENV_NAME = "BLENDER_WORKER_TOKEN"
+
+    def __init__(self, launch_command, env=None, cwd=None, max_jobs=0, max_rss_mb=0, stdout=subprocess.DEVNULL, connect_timeout=600):
+        """
+        :param launch_command: The command (list of strings) which starts Blender, "--worker <address>" is appended to it.
+        :param env: The environment of the Blender process. If None, the current environment is used.
+        :param cwd: The working directory of the Blender process.
+        :param max_jobs: Restart Blender after this many jobs. 0 means never.
+        :param max_rss_mb: Restart Blender once its resident memory (in MB) passes this limit. 0 means never.
+        :param stdout: Where stdout/stderr of the Blender process should go.
+        :param connect_timeout: Seconds to wait for a freshly started Blender to connect back.
+        """
+        self.launch_command = launch_command
+        self.env = env
+        self.cwd = cwd
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.stdout = stdout
+        self.connect_timeout = connect_timeout
+
+        self._process = None
+        self._stream = None
+        self._jobs_done = 0
+
+    def start(self):
+        """ Starts a new Blender process and waits until it has connected back. """
+        token = uuid.uuid4().hex
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        # Poll with a short timeout, s.t. a Blender process that died during startup is noticed
+        server.settimeout(1)
+        address = "%s:%d" % server.getsockname()
+
+        env = dict(os.environ if self.env is None else self.env)
+        env[BlenderWorker.TOKEN_ENV_NAME] = token
+        self._process = subprocess.Popen(self.launch_command + ["--worker", address], env=env, cwd=self.cwd,
+                                         stdout=self.stdout, stderr=self.stdout, start_new_session=True)
+
+        start = time.time()
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+                    break
+                except socket.timeout:
+                    if self._process.poll() is not None:
+                        raise Exception("Blender worker exited with code %d before connecting" % self._process.returncode)
+                    if time.time() - start > self.connect_timeout:
+                        raise Exception("Blender worker did not connect within %d seconds" % self.connect_timeout)
+        except Exception:
+            self.kill()
+            raise
+        finally:
+            server.close()
+
+        connection.settimeout(None)
+        self._stream = connection.makefile("rw")
+        hello = self._receive()
+        if hello is None or hello.get("token") != token:
+            self.kill()
+            raise Exception("Blender worker sent an invalid handshake")
+        self._jobs_done = 0
+
+    def is_alive(self):
+        """ Returns True, if there is a connected Blender process. """
+        return self._process is not None and self._process.poll() is None and self._stream is not None
+
+    def run_job(self, config_path, args, options=None):
+        """ Runs one pipeline inside the Blender process, starting/restarting it if necessary.
+
+        :param config_path: The path to the config file of the job.
+        :param args: A list of arguments used to fill the <args:i> placeholders of the config.
+        :param options: A dict with further entries of the job sent to the worker, e.g. "postprocessing_dir".
+        :return: A dict describing the outcome: "success", "duration", "rss_mb" and "error" if it failed.
+        """
+        if not self.is_alive():
+            self.stop()
+            self.start()
+
+        start = time.time()
+        try:
+            job = {"config": config_path, "args": list(args)}
+            if options is not None:
+                job.update(options)
+            self._send(job)
+            result = self._receive()
+        except (OSError, ValueError):
+            result = None
+
+        if result is None:
+            # Blender crashed in the middle of the job (e.g. segfault or OOM kill)
+            self.kill()
+            return {"success": False, "duration": time.time() - start, "rss_mb": 0, "error": "Blender worker died"}
+
+        self._jobs_done += 1
+        if not result["success"] or self._should_recycle(result):
+            self.stop()
+        return result
+
+    def _should_recycle(self, result):
+        """ Checks whether the worker has done enough jobs or uses too much memory and should be restarted.
+
+        :param result: The result dict of the last job.
+        :return: True, if the Blender process should be replaced by a fresh one.
+        """
+        if self.max_jobs > 0 and self._jobs_done >= self.max_jobs:
+            return True
+        if self.max_rss_mb > 0 and result.get("rss_mb", 0) > self.max_rss_mb:
+            return True
+        return False
+
+    def stop(self):
+        """ Asks the Blender process to quit after closing the connection and waits for it. """
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except OSError:
+                pass
+            self._stream = None
+        if self._process is not None:
+            try:
+                # Blender quits by itself once it reads EOF from the socket
+                self._process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                self.kill()
+            self._process = None
+
+    def kill(self):
+        """ Terminates the Blender process (and the launcher in front of it) without waiting for it to finish its work. """
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except OSError:
+                pass
+            self._stream = None
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    # Blender is a child of the launcher, so the whole process group has to be killed
+                    os.killpg(self._process.pid, signal.SIGKILL)
+                except OSError:
+                    self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def _send(self, message):
+        """ Sends one json line to the Blender process. """
+        self._stream.write(json.dumps(message) + "\n")
+        self._stream.flush()
+
+    def _receive(self):
+        """ Reads one json line from the Blender process.
+
+        :return: The decoded dict or None, if the connection has been closed.
+        """
+        line = self._stream.readline()
+        if not line:
+            return None
+        return json.loads(line)
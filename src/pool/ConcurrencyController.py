@@ -0,0 +1,144 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+
+class ConcurrencyController:
+    """ Adjusts the number of parallel Blender jobs based on the current state of the machine.
+
+    In every step the following is sampled:
+
+     - the 1 minute load average
+     - the available RAM (MemAvailable in /proc/meminfo)
+     - the free space in the temporary directory (/dev/shm per default, where Blender writes its intermediate files)
+     - optionally the GPU utilization, read from the output of a probe command (e.g. nvidia-smi)
+
+    The limit is lowered by one, if RAM or /dev/shm run low or the CPUs are overloaded, and raised by one, if there is
+    headroom (GPU not fully utilized or, without a GPU probe, free CPUs). Every decision is appended as one json line to
+    the given log file, s.t. the thresholds can be tuned offline from recorded traces.
+    """
+
+    def __init__(self, min_jobs, max_jobs, log_path=None, gpu_probe=None, min_free_ram_mb=4096, min_free_tmp_mb=2048,
+                 tmp_dir="/dev/shm", max_load=None, target_gpu_utilization=90):
+        """
+        :param min_jobs: The lower bound of the number of parallel jobs.
+        :param max_jobs: The upper bound of the number of parallel jobs.
+        :param log_path: The path of the json lines file every decision is written to. If None, nothing is logged.
+        :param gpu_probe: A shell command, which prints the utilization (in percent) of each used GPU as a number. If None, the GPU is not sampled.
+        :param min_free_ram_mb: If less RAM (in MB) is available, the number of jobs is lowered.
+        :param min_free_tmp_mb: If less space (in MB) is left in tmp_dir, the number of jobs is lowered.
+        :param tmp_dir: The temporary directory used by the jobs.
+        :param max_load: If the load average is above this, the number of jobs is lowered. Per default, the number of CPUs.
+        :param target_gpu_utilization: Below this GPU utilization (in percent) the number of jobs is raised.
+        """
+        self.min_jobs = min_jobs
+        self.max_jobs = max_jobs
+        self.log_path = log_path
+        self.gpu_probe = gpu_probe
+        self.min_free_ram_mb = min_free_ram_mb
+        self.min_free_tmp_mb = min_free_tmp_mb
+        self.tmp_dir = tmp_dir if os.path.exists(tmp_dir) else "/tmp"
+        self.max_load = max_load if max_load is not None else float(os.cpu_count())
+        self.target_gpu_utilization = target_gpu_utilization
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        """ Collects the current machine state.
+
+        :return: A dict with "load", "free_ram_mb", "free_tmp_mb" and "gpu_utilization" (None if there is no probe or it failed).
+        """
+        metrics = {"load": os.getloadavg()[0], "free_ram_mb": None, "free_tmp_mb": None, "gpu_utilization": None}
+
+        if os.path.exists("/proc/meminfo"):
+            with open("/proc/meminfo", "r") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        metrics["free_ram_mb"] = int(line.split()[1]) / 1024.0
+                        break
+
+        stat = os.statvfs(self.tmp_dir)
+        metrics["free_tmp_mb"] = stat.f_bavail * stat.f_frsize / (1024.0 * 1024.0)
+
+        if self.gpu_probe is not None:
+            try:
+                output = subprocess.check_output(self.gpu_probe, shell=True, timeout=30).decode("utf-8")
+                values = [float(value) for value in output.replace(",", " ").split()]
+                if len(values) > 0:
+                    metrics["gpu_utilization"] = sum(values) / len(values)
+            except (subprocess.SubprocessError, OSError, ValueError):
+                pass
+
+        return metrics
+
+    def decide(self, limit, metrics):
+        """ Determines the new number of parallel jobs.
+
+        :param limit: The current number of parallel jobs.
+        :param metrics: The dict returned by sample().
+        :return: The new limit and a short reason for the decision.
+        """
+        if metrics["free_ram_mb"] is not None and metrics["free_ram_mb"] < self.min_free_ram_mb:
+            new_limit, reason = limit - 1, "low ram"
+        elif metrics["free_tmp_mb"] < self.min_free_tmp_mb:
+            new_limit, reason = limit - 1, "low tmp space"
+        elif metrics["load"] > self.max_load:
+            new_limit, reason = limit - 1, "cpu overloaded"
+        elif metrics["gpu_utilization"] is not None:
+            if metrics["gpu_utilization"] < self.target_gpu_utilization:
+                new_limit, reason = limit + 1, "gpu underutilized"
+            else:
+                new_limit, reason = limit, "gpu busy"
+        elif metrics["load"] < 0.8 * self.max_load:
+            new_limit, reason = limit + 1, "cpu headroom"
+        else:
+            new_limit, reason = limit, "steady"
+
+        new_limit = max(self.min_jobs, min(self.max_jobs, new_limit))
+        if new_limit == limit and reason not in ["gpu busy", "steady"]:
+            reason += " (at bound)"
+        return new_limit, reason
+
+    def step(self, scheduler):
+        """ Samples the machine, updates the limit of the given scheduler and logs the decision.
+
+        :param scheduler: The DeviceScheduler to control.
+        :return: The new limit.
+        """
+        metrics = self.sample()
+        limit = scheduler.limit
+        new_limit, reason = self.decide(limit, metrics)
+        if new_limit > limit and scheduler.running() < limit:
+            # There are not enough jobs to fill the current limit, so raising it would not change anything
+            new_limit, reason = limit, "limit not used"
+        if new_limit != limit:
+            print("Changing the number of parallel jobs from %d to %d (%s)" % (limit, new_limit, reason))
+        scheduler.set_limit(new_limit)
+
+        if self.log_path is not None:
+            entry = dict(metrics, time=time.time(), limit=limit, new_limit=new_limit, reason=reason, running=scheduler.running())
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        return new_limit
+
+    def start(self, scheduler, interval=30):
+        """ Starts a background thread which calls step() every interval seconds. """
+        scheduler.set_limit(max(self.min_jobs, min(self.max_jobs, scheduler.limit)))
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, args=(scheduler, interval))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the background thread. """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, scheduler, interval):
+        while not self._stop_event.wait(interval):
+            self.step(scheduler)
@@ -0,0 +1,193 @@
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class DeviceScheduler:
+    """ Distributes jobs over several devices (e.g. GPUs), each of them with a fixed number of job slots.
+
+    Jobs are taken from one shared queue. Whenever a slot becomes free, the next job is handed to the device with the
+    fewest running jobs, s.t. the load stays balanced even if jobs have very different durations.
+    Every job runs in its own thread, which is enough as the actual work is done in Blender subprocesses.
+
+    Results are yielded as soon as a job completes. The queue can be refilled while running (e.g. with newly generated
+    job files) and drain() stops handing out new jobs, while the running ones are allowed to finish.
+    An optional claim function is asked right before a job is started, which allows multiple machines to share one job
+    list. Jobs which are currently held by someone else are put aside and offered again at the next refill.
+    The total number of parallel jobs can be lowered below the number of slots with set_limit() at any time.
+
+    Usage:
+        scheduler = DeviceScheduler(["0", "1"], 3, run_job)
+        for job, device, success in scheduler.run(jobs):
+            ...
+        print(scheduler.report())
+
+    The job function gets the job, the device and the slot index (0 <= slot < slots_per_device) and returns True if
+    the job succeeded. Any callable works, which makes it easy to test the scheduling with fake devices and a stub job.
+    """
+
+    def __init__(self, devices, slots_per_device, run_job, eta_window=20):
+        """
+        :param devices: A list of device names (e.g. the CUDA device ids as strings).
+        :param slots_per_device: The number of jobs that run in parallel on each device.
+        :param run_job: A function (job, device, slot) -> bool, which runs the given job and returns whether it succeeded.
+        :param eta_window: The number of most recent job durations the ETA is based on.
+        """
+        if len(devices) == 0 or slots_per_device < 1:
+            raise Exception("The scheduler needs at least one device with at least one slot.")
+
+        self.devices = list(devices)
+        self.slots_per_device = slots_per_device
+        self.run_job = run_job
+
+        self.stats = {device: {"jobs": 0, "failed": 0, "busy_time": 0.0} for device in self.devices}
+        self._running = {device: 0 for device in self.devices}
+        self._free_slots = {device: list(range(slots_per_device - 1, -1, -1)) for device in self.devices}
+        self._start_time = None
+        self._end_time = None
+        self._pending = deque()
+        self._deferred = []
+        self._in_flight = 0
+        self._recent_durations = deque(maxlen=eta_window)
+        self.draining = False
+        self.limit = len(self.devices) * slots_per_device
+
+    def _least_loaded_device(self):
+        """ Returns the device with a free slot that currently runs the fewest jobs (ties go to the device that has done less work).
+
+        :return: The device or None, if all slots are occupied.
+        """
+        candidates = [device for device in self.devices if len(self._free_slots[device]) > 0]
+        if len(candidates) == 0:
+            return None
+        return min(candidates, key=lambda device: (self._running[device], self.stats[device]["busy_time"]))
+
+    def _run_in_slot(self, job, device, slot, done_queue):
+        """ Runs one job and reports the outcome to the dispatcher.
+
+        :param done_queue: The queue into which (job, device, slot, success, duration) is put when the job is done.
+        """
+        start = time.time()
+        try:
+            success = bool(self.run_job(job, device, slot))
+        except Exception:
+            traceback.print_exc()
+            success = False
+        done_queue.put((job, device, slot, success, time.time() - start))
+
+    def set_limit(self, limit):
+        """ Sets the maximum number of jobs running in parallel over all devices.
+
+        Lowering the limit does not stop running jobs, it only delays starting new ones.
+
+        :param limit: The new limit, clamped to [1, number of slots].
+        """
+        self.limit = max(1, min(len(self.devices) * self.slots_per_device, limit))
+
+    def running(self):
+        """ Returns the number of jobs which are currently running. """
+        return self._in_flight
+
+    def drain(self):
+        """ Stops handing out new jobs. Jobs which are already running are finished, afterwards run() returns. """
+        self.draining = True
+
+    def remaining(self):
+        """ Returns the number of jobs which are either waiting or running. """
+        return len(self._pending) + len(self._deferred) + self._in_flight
+
+    def eta(self):
+        """ Estimates the remaining time based on a rolling average of the most recent job durations.
+
+        The jobs are assumed to run with the current limit of parallel jobs, which can be lower than the number of slots.
+
+        :return: The estimated number of seconds until all jobs are done or None, if no job has finished yet.
+        """
+        if len(self._recent_durations) == 0:
+            return None
+        average = sum(self._recent_durations) / len(self._recent_durations)
+        return self.remaining() * average / self.limit
+
+    def run(self, jobs, refill=None, refill_interval=60, claim=None):
+        """ Runs all given jobs and yields them in the order in which they are completed.
+
+        :param jobs: An iterable of jobs.
+        :param refill: An optional function without arguments which returns a list of new jobs to append to the queue. It is called every refill_interval seconds and once more before finishing.
+        :param refill_interval: Seconds between two calls of refill (and between two attempts to claim a deferred job).
+        :param claim: An optional function job -> True/False/None, which is called before a job is started. True: run it, False: skip it, None: it is busy elsewhere, try again later.
+        :return: A generator of (job, device, success) tuples.
+        """
+        self._pending = deque(jobs)
+        self._deferred = []
+        done_queue = queue.Queue()
+        self._in_flight = 0
+        self._start_time = time.time()
+        last_refill = time.time()
+
+        while True:
+            if not self.draining and (time.time() - last_refill > refill_interval or self.remaining() == 0):
+                # Offer jobs that were busy elsewhere again, their owner might have died in the meantime
+                self._pending.extend(self._deferred)
+                self._deferred = []
+                if refill is not None:
+                    self._pending.extend(refill())
+                last_refill = time.time()
+
+            if self.draining:
+                self._pending.clear()
+                self._deferred = []
+            if self.remaining() == 0:
+                break
+
+            # Fill up all free slots
+            while len(self._pending) > 0 and self._in_flight < self.limit:
+                device = self._least_loaded_device()
+                if device is None:
+                    break
+                job = self._pending.popleft()
+                if claim is not None:
+                    claimed = claim(job)
+                    if claimed is None:
+                        self._deferred.append(job)
+                    if not claimed:
+                        continue
+                slot = self._free_slots[device].pop()
+                self._running[device] += 1
+                self._in_flight += 1
+                thread = threading.Thread(target=self._run_in_slot, args=(job, device, slot, done_queue))
+                thread.daemon = True
+                thread.start()
+
+            # Wait for the next job to complete, wake up regularly to refill the queue
+            try:
+                job, device, slot, success, duration = done_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            self._in_flight -= 1
+            self._running[device] -= 1
+            self._free_slots[device].append(slot)
+            self.stats[device]["jobs"] += 1
+            self.stats[device]["busy_time"] += duration
+            if not success:
+                self.stats[device]["failed"] += 1
+            self._recent_durations.append(duration)
+            self._end_time = time.time()
+            yield job, device, success
+
+    def report(self):
+        """ Summarizes the throughput of every device.
+
+        :return: A multi-line string with one line per device.
+        """
+        wall_time = (self._end_time - self._start_time) if self._start_time is not None and self._end_time is not None else 0
+        lines = []
+        for device in self.devices:
+            stats = self.stats[device]
+            jobs_per_hour = stats["jobs"] / wall_time * 3600 if wall_time > 0 else 0
+            average = stats["busy_time"] / stats["jobs"] if stats["jobs"] > 0 else 0
+            utilization = stats["busy_time"] / (wall_time * self.slots_per_device) if wall_time > 0 else 0
+            lines.append("Device %s: %d jobs (%d failed), %.1f jobs/h, %.1f s/job, %.0f%% slot utilization" % (
+                device, stats["jobs"], stats["failed"], jobs_per_hour, average, 100 * utilization))
+        return "\n".join(lines)
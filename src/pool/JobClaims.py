@@ -0,0 +1,191 @@
+import errno
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+
+def in_shard(job, shard_index, num_shards):
+    """ Checks whether the given job belongs to the given shard.
+
+    The job name is hashed with md5 (unlike hash(), this is stable across processes and machines).
+
+    :param job: The name of the job (e.g. the yaml file name).
+    :param shard_index: The index of the shard, 0 <= shard_index < num_shards.
+    :param num_shards: The total number of shards.
+    :return: True, if the job is part of the shard.
+    """
+    return int(hashlib.md5(job.encode("utf-8")).hexdigest(), 16) % num_shards == shard_index
+
+
+class JobClaims:
+    """ Coordinates multiple machines which work on the same job list via lock files in a shared directory (e.g. on NFS).
+
+    Only plain POSIX file operations are used, no additional services are necessary:
+
+     - A job is claimed by creating "<job>.claim" with O_CREAT | O_EXCL, which only succeeds for one node.
+     - While a job is running, its claim file is touched regularly by a heartbeat thread.
+     - A claim whose heartbeat is older than the timeout belongs to a node that died. It is stolen by renaming it to a
+       unique name and claiming the job again. The rename is atomic, but the file renamed is not necessarily the claim
+       which was found to be stale: another node might have stolen it and created a new claim in between. So every
+       claim contains a unique token, and the renamed file is only removed if it still has the token and the
+       modification time of the stale claim, otherwise it is put back.
+     - Finished jobs get a "<job>.done" and jobs that failed too often a "<job>.failed" marker, s.t. nobody runs them again.
+
+    To not depend on synchronized clocks, the age of claims is compared against the modification time of a file freshly
+    touched in the same directory, i.e. the clock of the file server.
+    """
+
+    # Result of try_claim(): the job is claimed by another node which is still alive, try again later
+    BUSY = None
+
+    def __init__(self, claim_dir, node_name, timeout=600, heartbeat_interval=None):
+        """
+        :param claim_dir: The shared directory which holds the claim and marker files. It is created if it does not exist.
+        :param node_name: A name which identifies this node (written into its claims for debugging).
+        :param timeout: Seconds after which a claim without heartbeat is considered stale and can be stolen.
+        :param heartbeat_interval: Seconds between two heartbeats. Per default, a fifth of the timeout.
+        """
+        self.claim_dir = claim_dir
+        self.node_name = node_name
+        self.timeout = timeout
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else timeout / 5.0
+        os.makedirs(claim_dir, exist_ok=True)
+
+        self._held = set()
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._stop_event = threading.Event()
+
+    def _path(self, job, suffix):
+        return os.path.join(self.claim_dir, job + suffix)
+
+    def _now(self):
+        """ Returns the current time of the file server by touching a file of this node. """
+        clock_path = os.path.join(self.claim_dir, ".clock." + self.node_name)
+        with open(clock_path, "a"):
+            os.utime(clock_path, None)
+        return os.stat(clock_path).st_mtime
+
+    def is_completed(self, job):
+        """ Returns True, if the given job has been finished or given up by any node. """
+        return os.path.exists(self._path(job, ".done")) or os.path.exists(self._path(job, ".failed"))
+
+    def try_claim(self, job):
+        """ Tries to claim the given job for this node.
+
+        :param job: The name of the job.
+        :return: True if the job has been claimed, False if it is already completed and JobClaims.BUSY if another live node holds it.
+        """
+        if self.is_completed(job):
+            return False
+
+        claim_path = self._path(job, ".claim")
+        for _ in range(2):
+            try:
+                fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+                if not self._steal_if_stale(claim_path):
+                    return JobClaims.BUSY
+                # The stale claim is gone, try to create our own one
+                continue
+
+            try:
+                os.write(fd, ("%s %d %s %f\n" % (self.node_name, os.getpid(), uuid.uuid4().hex, time.time())).encode("utf-8"))
+            finally:
+                os.close(fd)
+            # The job might have been completed between the check above and creating the claim
+            if self.is_completed(job):
+                os.remove(claim_path)
+                return False
+            with self._lock:
+                self._held.add(job)
+            return True
+        return JobClaims.BUSY
+
+    def _steal_if_stale(self, claim_path):
+        """ Removes the given claim, if its heartbeat is older than the timeout.
+
+        :param claim_path: The path of the claim file.
+        :return: True, if the claim is gone now (because it was stolen or released in the meantime).
+        """
+        try:
+            stale = self._read_claim(claim_path)
+        except FileNotFoundError:
+            return True
+        age = self._now() - stale[1]
+        if age < self.timeout:
+            return False
+
+        # Rename is atomic, so if multiple nodes try to steal the same file, only one of them succeeds
+        stolen_path = claim_path + ".stolen." + self.node_name + "." + uuid.uuid4().hex
+        try:
+            os.rename(claim_path, stolen_path)
+        except FileNotFoundError:
+            return True
+
+        # Between reading and renaming, the stale claim might have been stolen by another node which then created a
+        # new claim, or its owner might have sent a heartbeat. Then the renamed file is not the stale claim.
+        if self._read_claim(stolen_path) != stale:
+            try:
+                # Unlike rename, link does not replace a claim which has been created in the meantime
+                os.link(stolen_path, claim_path)
+            except FileExistsError:
+                print("Warning: could not put back the claim %s, it was replaced" % os.path.basename(claim_path))
+            os.remove(stolen_path)
+            return False
+
+        print("Stole stale claim %s (no heartbeat for %.0f seconds)" % (os.path.basename(claim_path), age))
+        os.remove(stolen_path)
+        return True
+
+    @staticmethod
+    def _read_claim(path):
+        """ Returns what identifies one claim: its content (incl. the unique token of the claim) and its modification time. """
+        with open(path, "r") as f:
+            content = f.read()
+        return content, os.stat(path).st_mtime
+
+    def release(self, job, state=None):
+        """ Gives up the claim of the given job.
+
+        :param job: The name of the job.
+        :param state: "done" or "failed" to mark the job as completed, None to make it available for other nodes again.
+        """
+        if state is not None:
+            with open(self._path(job, "." + state), "w") as f:
+                f.write(self.node_name + "\n")
+        with self._lock:
+            self._held.discard(job)
+        try:
+            os.remove(self._path(job, ".claim"))
+        except FileNotFoundError:
+            pass
+
+    def start_heartbeat(self):
+        """ Starts a background thread which regularly touches all claims held by this node. """
+        self._stop_event.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop)
+        self._heartbeat_thread.daemon = True
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        """ Stops the heartbeat thread. """
+        self._stop_event.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def _heartbeat_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            with self._lock:
+                held = list(self._held)
+            for job in held:
+                try:
+                    os.utime(self._path(job, ".claim"), None)
+                except FileNotFoundError:
+                    # Our claim was stolen, the job will most likely be done twice
+                    print("Warning: lost the claim of %s" % job)
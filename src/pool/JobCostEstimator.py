@@ -0,0 +1,180 @@
+import json
+import os
+
+import numpy as np
+
+from src.utility.ConfigParser import ConfigParser
+
+
+class JobCostEstimator:
+    """ Predicts how long a job will take, s.t. pool_run.py can start the most expensive jobs first.
+
+    Every job is described by a few features read from its yaml:
+
+     - frames: n_frames of the composite.VOSTrajRunner
+     - pixel_samples: frames * sum over all renderers of megapixels * samples / 64 (the samples of the SimRgbRenderer)
+     - mega_faces: frames * number of faces (in millions) of all objects loaded by the object runners/loaders
+     - texture_mb: frames * size of their textures in MB
+     - lights: frames * number of light runners
+
+    The predicted time is a linear function of these features. Its coefficients start at rough defaults and are
+    calibrated against the durations of past jobs, using a ridge regression which pulls the coefficients towards the
+    defaults as long as only a few jobs have been observed.
+
+    Face count and texture size of every model are cached in a json file, as counting the faces of a large .obj
+    takes a while.
+    """
+
+    FEATURES = ["constant", "frames", "pixel_samples", "mega_faces", "texture_mb", "lights"]
+    # Seconds per unit of each feature, only used as long as there is no calibration data
+    DEFAULT_COEFFICIENTS = [20.0, 1.0, 2.0, 1.0, 0.01, 0.5]
+    # The number of samples set by the renderers themselves, see the calls of Renderer._configure_renderer()
+    RENDERER_SAMPLES = {
+        "renderer.SimRgbRenderer": 64,
+        "renderer.RgbRenderer": 256,
+        "renderer.NormalRenderer": 256,
+        "renderer.FlowRenderer": 256,
+        "renderer.SegMapRenderer": 1,
+        "renderer.SegMapPngRenderer": 1
+    }
+    IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tga", ".bmp", ".tif", ".tiff", ".exr", ".hdr")
+
+    def __init__(self, stats_path=None, regularization=1.0):
+        """
+        :param stats_path: The json file used to cache the per-model stats. If None, the stats are not cached.
+        :param regularization: How strongly the coefficients are pulled towards the defaults, in number of jobs.
+        """
+        self.stats_path = stats_path
+        self.regularization = regularization
+        self.coefficients = list(self.DEFAULT_COEFFICIENTS)
+        self.num_samples = 0
+        self._model_stats = {}
+        self._stats_changed = False
+        if stats_path is not None and os.path.exists(stats_path):
+            with open(stats_path, "r") as f:
+                self._model_stats = json.load(f)
+
+    def save(self):
+        """ Writes the per-model stats cache, if new models were added. """
+        if self.stats_path is None or not self._stats_changed:
+            return
+        tmp_path = self.stats_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._model_stats, f)
+        os.replace(tmp_path, self.stats_path)
+        self._stats_changed = False
+
+    def model_stats(self, model_path, texture_path=""):
+        """ Returns the number of faces and the size of the textures of the given model.
+
+        For ShapeNet models (<id>/models/model_normalized.obj), all images inside <id> count as textures.
+
+        :param model_path: The path of the .obj file.
+        :param texture_path: The path of a texture set by the object runner, if any.
+        :return: A dict with "faces" and "texture_bytes".
+        """
+        key = model_path + "|" + texture_path
+        mtime = os.path.getmtime(model_path) if os.path.exists(model_path) else None
+        if key in self._model_stats and self._model_stats[key]["mtime"] == mtime:
+            return self._model_stats[key]
+
+        faces = 0
+        if mtime is not None:
+            with open(model_path, "rb") as f:
+                for line in f:
+                    if line.startswith(b"f "):
+                        faces += 1
+
+        model_dir = os.path.dirname(model_path)
+        if os.path.basename(model_dir) == "models":
+            model_dir = os.path.dirname(model_dir)
+        texture_bytes = 0
+        if mtime is not None:
+            for root, _, files in os.walk(model_dir):
+                texture_bytes += sum(os.path.getsize(os.path.join(root, name)) for name in files if name.lower().endswith(self.IMAGE_EXTENSIONS))
+        if texture_path != "" and os.path.exists(texture_path):
+            texture_bytes += os.path.getsize(texture_path)
+
+        self._model_stats[key] = {"mtime": mtime, "faces": faces, "texture_bytes": texture_bytes}
+        self._stats_changed = True
+        return self._model_stats[key]
+
+    def job_features(self, config_path, args, config=None):
+        """ Reads the features of the given job from its config.
+
+        :param config_path: The path to the config file of the job.
+        :param args: The arguments used to fill the <args:i> placeholders of the config.
+        :param config: The already parsed config of the job, if None, it is parsed here.
+        :return: A list with one value per entry of FEATURES, or None if the config could not be read.
+        """
+        if config is None:
+            try:
+                config = ConfigParser(silent=True).compile(config_path).fill(args)
+            except (Exception, SystemExit):
+                return None
+
+        frames = 0
+        resolution = None
+        object_configs = []
+        num_lights = 0
+        renderers = []
+        for module_config in config.get("modules", []):
+            if not isinstance(module_config, dict):
+                continue
+            module_name = module_config.get("module", "")
+            module_params = module_config.get("config", {})
+            if module_name == "composite.VOSTrajRunner":
+                frames += module_params.get("n_frames", 0)
+                intrinsics = module_params.get("camera_runner", {}).get("config", {}).get("intrinsics", {})
+                if "resolution_x" in intrinsics and "resolution_y" in intrinsics:
+                    # The resolution of the camera overrides the one of the renderers
+                    resolution = (intrinsics["resolution_x"], intrinsics["resolution_y"])
+                object_configs += [runner.get("config", {}) for runner in module_params.get("object_runners", [])]
+                num_lights += len(module_params.get("light_runners", []))
+            elif module_name.startswith("renderer."):
+                renderers.append((module_name, module_params))
+            elif "path" in module_params and str(module_params["path"]).endswith(".obj"):
+                object_configs.append(module_params)
+
+        pixel_samples = 0.0
+        for module_name, module_params in renderers:
+            width, height = resolution if resolution is not None else (module_params.get("resolution_x", 512), module_params.get("resolution_y", 512))
+            samples = module_params.get("samples", self.RENDERER_SAMPLES.get(module_name, 256))
+            pixel_samples += width * height / 1e6 * samples / 64.0
+
+        faces = 0
+        texture_bytes = 0
+        for object_config in object_configs:
+            if "path" not in object_config:
+                continue
+            stats = self.model_stats(str(object_config["path"]), str(object_config.get("texture", "")))
+            faces += stats["faces"]
+            texture_bytes += stats["texture_bytes"]
+
+        return [1.0, frames, frames * pixel_samples, frames * faces / 1e6, frames * texture_bytes / 1e6, frames * num_lights]
+
+    def calibrate(self, samples):
+        """ Fits the coefficients to the given observations.
+
+        Minimizes |X w - y|^2 + r |w - w_0|^2, i.e. a least squares fit which is pulled towards the default coefficients w_0.
+        This is solved as one least squares problem, with the rows sqrt(r) I w = sqrt(r) w_0 appended to X w = y.
+
+        :param samples: A list of (features, duration) tuples of past jobs.
+        """
+        n = len(self.FEATURES)
+        weight = np.sqrt(self.regularization)
+        features = np.array([sample[0] for sample in samples], dtype=np.float64).reshape(-1, n)
+        durations = np.array([sample[1] for sample in samples], dtype=np.float64)
+        matrix = np.concatenate([features, weight * np.eye(n)])
+        vector = np.concatenate([durations, weight * np.array(self.DEFAULT_COEFFICIENTS)])
+        self.coefficients = np.linalg.lstsq(matrix, vector, rcond=None)[0].tolist()
+        self.num_samples = len(samples)
+
+    def estimate(self, features):
+        """ Returns the predicted duration of a job in seconds.
+
+        :param features: The features of the job as returned by job_features().
+        :return: The predicted duration, at least one second.
+        """
+        return max(1.0, sum(w * x for w, x in zip(self.coefficients, features)))
+
@@ -0,0 +1,146 @@
+import fcntl
+import json
+import os
+import time
+
+from src.utility.ConfigParser import ConfigParser
+
+
+class JobLedger:
+    """ Append-only record of all jobs run by pool_run.py, stored as one json line per event.
+
+    Every job (identified by the name of its yaml file) gets a "start" line when it is launched and a "finish" or
+    "fail" line when it is done. The finish/fail lines also contain the exit code, the duration and the number of
+    frames found in the output directory. As the file is only appended to, it survives crashes of the dispatcher and
+    can be read in again to find out which jobs are still missing:
+
+     - finished: the last event is "finish" -> skipped
+     - partial: the last event is "start" (the dispatcher died while the job was running) -> run again
+     - failed: the last event is "fail" -> run again, as long as the number of failures is below the retry limit
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the ledger file. It is created if it does not exist yet.
+        """
+        self.path = path
+        self.jobs = {}
+        self.load()
+
+    def load(self):
+        """ Reads in the ledger file and updates the state of all jobs. """
+        self.jobs = {}
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line might have been cut off by a crash
+                    continue
+                self._apply(entry)
+
+    def _apply(self, entry):
+        """ Updates the job state using the given ledger entry.
+
+        :param entry: A dict read from the ledger.
+        """
+        job = self.jobs.setdefault(entry["job"], {"state": None, "failures": 0, "last": None})
+        job["state"] = entry["event"]
+        job["last"] = entry
+        if entry["event"] == "fail":
+            job["failures"] += 1
+        elif entry["event"] == "finish":
+            job["failures"] = 0
+
+    def state(self, job):
+        """ Returns the last recorded event of the given job ("start", "finish", "fail") or None if it never ran. """
+        return self.jobs[job]["state"] if job in self.jobs else None
+
+    def failures(self, job):
+        """ Returns how often the given job has failed since it last finished successfully. """
+        return self.jobs[job]["failures"] if job in self.jobs else 0
+
+    def is_finished(self, job):
+        """ Returns True, if the given job has finished successfully. """
+        return self.state(job) == "finish"
+
+    def pending_jobs(self, jobs, max_failures):
+        """ Filters the given jobs down to the ones which still have to be run.
+
+        :param jobs: A list of job names.
+        :param max_failures: Jobs which already failed this many times are not run again.
+        :return: The list of jobs that are not finished and have not used up their retries.
+        """
+        return [job for job in jobs if not self.is_finished(job) and self.failures(job) < max_failures]
+
+    def record_start(self, job, attempt, **info):
+        """ Records that the given job has been launched. """
+        self._append(dict(info, job=job, event="start", attempt=attempt))
+
+    def record_finish(self, job, attempt, exit_code, duration, **info):
+        """ Records that the given job has finished successfully. """
+        self._append(dict(info, job=job, event="finish", attempt=attempt, exit_code=exit_code, duration=duration))
+
+    def record_fail(self, job, attempt, exit_code, duration, **info):
+        """ Records that the given job has failed. """
+        self._append(dict(info, job=job, event="fail", attempt=attempt, exit_code=exit_code, duration=duration))
+
+    def _append(self, entry):
+        """ Appends one entry as a single line to the ledger file.
+
+        The file is locked while writing, s.t. multiple pool processes can share one ledger.
+
+        :param entry: The dict to write.
+        """
+        entry["time"] = time.time()
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._apply(entry)
+
+
+def count_output_frames(config_path, args, config=None):
+    """ Counts the frames written by the RGBSegWriter for the given job.
+
+    The output directory and the number of frames are read from the job's config, the JPEGImages/Annotations folders
+    are determined in the same way as in the RGBSegWriter.
+
+    :param config_path: The path to the config file of the job.
+    :param args: The arguments used to fill the <args:i> placeholders of the config.
+    :param config: The already parsed config of the job, if None, it is parsed here.
+    :return: A dict with the expected number of frames ("expected") and the number of written "rgb" and "seg" frames or None, if the config could not be read.
+    """
+    if config is None:
+        try:
+            config = ConfigParser(silent=True).compile(config_path).fill(args)
+        except (Exception, SystemExit):
+            return None
+
+    output_dir = config.get("global", {}).get("all", {}).get("output_dir", "")
+    if output_dir == "":
+        return None
+    base_folder = os.path.dirname(output_dir)
+    vid_name = os.path.basename(output_dir)
+
+    expected = None
+    for module_config in config.get("modules", []):
+        if isinstance(module_config, dict) and module_config.get("module") == "composite.VOSTrajRunner":
+            expected = module_config.get("config", {}).get("n_frames")
+
+    counts = {"expected": expected}
+    for key, folder in [("rgb", "JPEGImages"), ("seg", "Annotations")]:
+        frame_dir = os.path.join(base_folder, folder, vid_name)
+        counts[key] = len(os.listdir(frame_dir)) if os.path.isdir(frame_dir) else 0
+    return counts
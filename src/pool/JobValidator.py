@@ -0,0 +1,247 @@
+import copy
+import multiprocessing
+import numbers
+import os
+import re
+
+from src.utility.ConfigParser import ConfigParser
+from src.utility.JobSpecs import apply_job_spec
+
+
+# The config keys every trajectory runner needs, nested keys are separated by "/" as in Config
+REQUIRED_KEYS = {
+    "composite.VOSTrajRunner": ["n_frames", "camera_runner"],
+    "object.ObjectTrajectoryRunner": ["path", "seed", "poses/location_poly", "poses/rotation_poly", "poses/scale_poly"],
+    "lighting.LightTrajectoryRunner": ["name", "poses/location_poly", "poses/rotation_poly"],
+    "camera.CameraTrajectoryRunner": ["intrinsics", "cam_poses/location_poly", "cam_poses/look_at_poly"]
+}
+# Values of these keys and strings with these extensions are assets which have to exist before the job starts
+ASSET_KEYS = ["path", "texture"]
+ASSET_EXTENSIONS = (".obj", ".ply", ".blend", ".fbx", ".png", ".jpg", ".jpeg", ".hdr", ".exr", ".tga", ".bmp", ".tif", ".tiff")
+
+
+class DirectoryIndex:
+    """ Answers whether a path exists by listing its directory once, instead of one stat per path.
+
+    On network storage, listing a directory is about as expensive as a single stat, so checking all models and
+    textures of many jobs, which share the same directories, gets much cheaper.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def _list(self, directory):
+        if directory not in self._entries:
+            try:
+                self._entries[directory] = set(os.listdir(directory))
+            except OSError:
+                # Does not exist or is not a directory
+                self._entries[directory] = None
+        return self._entries[directory]
+
+    def exists(self, path):
+        """ Returns True, if the given absolute path exists. """
+        path = os.path.normpath(path)
+        directory, name = os.path.split(path)
+        if name == "":
+            return os.path.isdir(path)
+        entries = self._list(directory)
+        return entries is not None and name in entries
+
+
+# Every process of the pool keeps its own index and module cache across the jobs it validates
+_directory_index = DirectoryIndex()
+_module_classes = {}
+# The filled templates of job specs (or the error text, if they can not be parsed), by path, mtime and args
+_templates = {}
+
+
+def module_exists(module_name, root_dir):
+    """ Checks that the given module name (e.g. "renderer.SegMapRenderer") resolves to a class inside src without importing it, as the modules need bpy.
+
+    :param module_name: The module name used in the config.
+    :param root_dir: The repository root, which contains src.
+    :return: True, if src/<module path>.py defines the class.
+    """
+    if module_name not in _module_classes:
+        file_path = os.path.join(root_dir, "src", *module_name.split(".")) + ".py"
+        class_name = module_name.split(".")[-1]
+        found = False
+        if os.path.exists(file_path):
+            with open(file_path, "r") as f:
+                found = re.search(r"^class\s+" + re.escape(class_name) + r"\b", f.read(), re.MULTILINE) is not None
+        _module_classes[module_name] = found
+    return _module_classes[module_name]
+
+
+def _get_key(config, key):
+    for part in key.split("/"):
+        if not isinstance(config, dict) or part not in config:
+            return None
+        config = config[part]
+    return config
+
+
+def _check_poly(value):
+    """ Returns an error text, if the given value can not be evaluated by polynomial.polyval to one 3D vector per frame. """
+    if not isinstance(value, list) or len(value) == 0:
+        return "is not a non-empty list of coefficients"
+    for row in value:
+        if not isinstance(row, list) or len(row) != 3 or not all(isinstance(x, numbers.Number) for x in row):
+            return "has to contain one [x, y, z] coefficient per degree"
+    return None
+
+
+def _iter_module_configs(module_configs, context):
+    """ Yields (context, module name, config) of the given modules and of the runners nested in a VOSTrajRunner. """
+    for index, module_config in enumerate(module_configs):
+        if isinstance(module_config, str):
+            module_config = {"module": module_config}
+        if not isinstance(module_config, dict) or "module" not in module_config:
+            yield "%s/%d" % (context, index), None, None
+            continue
+        module_name = module_config["module"]
+        config = module_config.get("config", {})
+        module_context = "%s/%d (%s)" % (context, index, module_name)
+        yield module_context, module_name, config
+        if module_name == "composite.VOSTrajRunner" and isinstance(config, dict):
+            if isinstance(config.get("camera_runner"), dict):
+                yield from _iter_module_configs([config["camera_runner"]], module_context + "/camera_runner")
+            for key in ["object_runners", "light_runners"]:
+                if isinstance(config.get(key), list):
+                    yield from _iter_module_configs(config[key], module_context + "/" + key)
+
+
+def _find_assets(element, key=None):
+    """ Yields all strings of the given config block which reference an asset. """
+    if isinstance(element, dict):
+        for child_key, value in element.items():
+            # The configs of nested runners are checked separately
+            if child_key not in ["camera_runner", "object_runners", "light_runners"]:
+                yield from _find_assets(value, child_key)
+    elif isinstance(element, list):
+        for value in element:
+            yield from _find_assets(value, key)
+    elif isinstance(element, str) and element.strip() != "":
+        if key in ASSET_KEYS or element.lower().endswith(ASSET_EXTENSIONS):
+            yield element.strip()
+
+
+def _parse_config(config_path, args):
+    """ Parses and fills the given config.
+
+    :return: The config and None, or None and the error text, if it can not be parsed.
+    """
+    try:
+        return ConfigParser(silent=True).compile(config_path).fill(args), None
+    except SystemExit:
+        return None, "Not all placeholders of the config could be filled"
+    except Exception as e:
+        return None, "Could not parse the config: %s" % str(e).strip().split("\n")[-1]
+
+
+def _parse_template(config_path, args):
+    """ Same as _parse_config(), but every template is only parsed once per process, as all job specs share it.
+
+    :return: A copy of the config, which can be modified, and None, or None and the error text.
+    """
+    key = (config_path, os.path.getmtime(config_path) if os.path.exists(config_path) else None, tuple(args))
+    if key not in _templates:
+        _templates[key] = _parse_config(config_path, args)
+    config, error = _templates[key]
+    return copy.deepcopy(config), error
+
+
+def validate_job(config_path, args, root_dir, spec=None):
+    """ Checks the given job without starting blender.
+
+    The config is parsed and filled, every module has to resolve to a class in src, the trajectory runners need
+    their required keys and valid polynomials, and every referenced model and texture has to exist (relative paths
+    are resolved against root_dir, as done by Utility.resolve_path()).
+
+    :param config_path: The path to the config file of the job.
+    :param args: The arguments used to fill the <args:i> placeholders of the config.
+    :param root_dir: The repository root.
+    :param spec: If the config is a template, the overrides of the job, see JobSpecs.apply_job_spec().
+    :return: A list of error texts, empty if the job is valid.
+    """
+    config, error = _parse_config(config_path, args) if spec is None else _parse_template(config_path, args)
+    if error is not None:
+        return [error]
+    if spec is not None:
+        try:
+            apply_job_spec(config, spec)
+        except Exception as e:
+            return ["Could not apply the job spec: %s" % e]
+
+    if not isinstance(config.get("modules"), list):
+        return ["The config has no list of modules"]
+
+    errors = []
+    for context, module_name, module_config in _iter_module_configs(config["modules"], "modules"):
+        if module_name is None:
+            errors.append("%s: Missing module name" % context)
+            continue
+        if not module_exists(module_name, root_dir):
+            errors.append("%s: Module src.%s does not exist" % (context, module_name))
+        if not isinstance(module_config, dict):
+            errors.append("%s: The config is not a dict" % context)
+            continue
+
+        for key in REQUIRED_KEYS.get(module_name, []):
+            value = _get_key(module_config, key)
+            if value is None:
+                errors.append("%s: Missing %s" % (context, key))
+            elif key.endswith("_poly"):
+                error = _check_poly(value)
+                if error is not None:
+                    errors.append("%s: %s %s" % (context, key, error))
+        if module_name == "composite.VOSTrajRunner":
+            n_frames = module_config.get("n_frames")
+            if n_frames is not None and (not isinstance(n_frames, int) or n_frames < 2):
+                errors.append("%s: n_frames has to be an integer >= 2" % context)
+
+        for asset in _find_assets(module_config):
+            path = asset if os.path.isabs(asset) else os.path.join(root_dir, asset)
+            if not _directory_index.exists(path):
+                errors.append("%s: %s does not exist" % (context, asset))
+    return errors
+
+
+def _validate_job(job):
+    name, config_path, spec, args, root_dir = job
+    return name, validate_job(config_path, args, root_dir, spec)
+
+
+def validate_jobs(jobs, args, root_dir, workers=None):
+    """ Validates the given jobs in parallel, see validate_job().
+
+    :param jobs: A list of (job name, config path, job spec) tuples, the job spec is None unless the config is a template.
+    :param args: The arguments used to fill the <args:i> placeholders of the configs.
+    :param root_dir: The repository root.
+    :param workers: The number of processes, per default one per cpu.
+    :return: A dict mapping the name of every invalid job to its list of errors.
+    """
+    jobs = [(name, config_path, spec, args, root_dir) for name, config_path, spec in jobs]
+    if len(jobs) == 0:
+        return {}
+    workers = min(workers if workers is not None else multiprocessing.cpu_count(), len(jobs))
+    # Large chunks, s.t. jobs with neighbouring names (which often share directories) are validated by the same process
+    chunk_size = max(1, len(jobs) // (4 * workers))
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(_validate_job, jobs, chunksize=chunk_size)
+    return {name: errors for name, errors in results if len(errors) > 0}
+
+
+def format_validation_report(invalid_jobs, num_jobs):
+    """ Formats the result of validate_jobs() as text.
+
+    :param invalid_jobs: The dict returned by validate_jobs().
+    :param num_jobs: The number of validated jobs.
+    :return: The report as multi-line string.
+    """
+    lines = ["%d of %d jobs are invalid" % (len(invalid_jobs), num_jobs)]
+    for name in sorted(invalid_jobs):
+        lines.append(name)
+        lines.extend("  " + error for error in invalid_jobs[name])
+    return "\n".join(lines)
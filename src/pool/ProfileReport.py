@@ -0,0 +1,69 @@
+import os
+import pstats
+
+
+def collect_profiles(output_dir, module=None):
+    """ Finds the module profiles written by Pipeline.run below the given directory.
+
+    :param output_dir: The directory to search in (recursively).
+    :param module: If given, only the profiles of this module (class name) are returned.
+    :return: A dict mapping the module class name to the list of its profile paths.
+    """
+    profiles = {}
+    for root, _, files in os.walk(output_dir):
+        for file_name in files:
+            if not file_name.endswith(".prof"):
+                continue
+            # <job>.<index>.<module class>.prof, the job name itself may contain dots
+            parts = file_name[:-len(".prof")].rsplit(".", 2)
+            if len(parts) != 3 or (module is not None and parts[2] != module):
+                continue
+            profiles.setdefault(parts[2], []).append(os.path.join(root, file_name))
+    return profiles
+
+
+def aggregate_profiles(profiles, top=30, sort="tottime"):
+    """ Merges the given profiles and returns the most expensive functions.
+
+    :param profiles: A dict mapping the module class name to a list of profile paths, see collect_profiles().
+    :param top: The number of functions to return.
+    :param sort: "tottime" (time spent in the function itself) or "cumtime" (including the functions it calls).
+    :return: A dict with the hotspots ("functions"), the number of merged profiles ("profiles") and the total time.
+    """
+    paths = [path for module_paths in profiles.values() for path in module_paths]
+    functions = []
+    total_time = 0.0
+    if len(paths) > 0:
+        stats = pstats.Stats(paths[0])
+        for path in paths[1:]:
+            stats.add(path)
+        total_time = stats.total_tt
+        for (file_name, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            functions.append({
+                "function": "%s:%d(%s)" % (os.path.basename(file_name), line, function) if line > 0 else function,
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+                "share": tottime / total_time if total_time > 0 else 0
+            })
+        functions.sort(key=lambda entry: -entry[sort])
+
+    return {
+        "profiles": len(paths),
+        "modules": sorted(profiles.keys()),
+        "total_time": total_time,
+        "functions": functions[:top]
+    }
+
+
+def format_profile_report(summary):
+    """ Formats the result of aggregate_profiles() as a table.
+
+    :param summary: The dict returned by aggregate_profiles().
+    :return: The report as multi-line string.
+    """
+    lines = ["%d profiles of %s, %.2f s in total" % (summary["profiles"], ", ".join(summary["modules"]), summary["total_time"]),
+             "%12s %10s %10s %7s  %s" % ("Calls", "tottime", "cumtime", "Share", "Function")]
+    for entry in summary["functions"]:
+        lines.append("%12d %10.2f %10.2f %6.1f%%  %s" % (entry["calls"], entry["tottime"], entry["cumtime"], 100 * entry["share"], entry["function"]))
+    return "\n".join(lines)
@@ -0,0 +1,103 @@
+import json
+import os
+
+
+def percentile(values, q):
+    """ Returns the q-th percentile of the given values (nearest rank).
+
+    :param values: A non-empty list of numbers.
+    :param q: The percentile in [0, 100].
+    :return: The percentile.
+    """
+    values = sorted(values)
+    index = int(round(q / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+def collect_timing_records(output_dir, file_name="timings.jsonl"):
+    """ Reads all timing logs written by Pipeline.run below the given directory.
+
+    :param output_dir: The directory to search in (recursively).
+    :param file_name: The name of the timing log files.
+    :return: A list of jobs, where every job is the list of its module records.
+    """
+    jobs = []
+    for root, _, files in os.walk(output_dir):
+        if file_name in files:
+            with open(os.path.join(root, file_name), "r") as f:
+                records = [json.loads(line) for line in f if len(line.strip()) > 0]
+            if len(records) > 0:
+                jobs.append(records)
+    return jobs
+
+
+def aggregate_timings(jobs):
+    """ Aggregates the per-module timing records of many jobs.
+
+    :param jobs: A list of jobs, where every job is the list of its module records.
+    :return: A dict with per-module statistics ("modules"), the overall frames per second, the share of time spent outside of rendering and the average import time per job.
+    """
+    per_module = {}
+    total_time = 0.0
+    import_time = 0.0
+    render_time = 0.0
+    total_frames = 0
+    for records in jobs:
+        for record in records:
+            per_module.setdefault(record["module"], {"wall": [], "cpu": [], "import": [], "rss_growth": [], "datablock_growth": {}})
+            per_module[record["module"]]["wall"].append(record["wall_time"])
+            per_module[record["module"]]["cpu"].append(record["cpu_time"])
+            # Older timing logs do not contain the import time
+            per_module[record["module"]]["import"].append(record.get("import_time", 0.0))
+            per_module[record["module"]]["rss_growth"].append(record.get("rss_growth_mb", 0.0))
+            for collection, change in record.get("datablock_growth", {}).items():
+                datablock_growth = per_module[record["module"]]["datablock_growth"]
+                datablock_growth[collection] = datablock_growth.get(collection, 0) + change
+            total_time += record["wall_time"]
+            import_time += record.get("import_time", 0.0)
+            if record["module"].endswith("Renderer"):
+                render_time += record["wall_time"]
+        # Every module sees the same scene, so the frame count of the job is the largest one reported
+        total_frames += max(record["frames"] for record in records)
+
+    modules = {}
+    for module, times in per_module.items():
+        modules[module] = {
+            "count": len(times["wall"]),
+            "p50": percentile(times["wall"], 50),
+            "p95": percentile(times["wall"], 95),
+            "cpu_p50": percentile(times["cpu"], 50),
+            "import_p50": percentile(times["import"], 50),
+            "rss_growth_p50": percentile(times["rss_growth"], 50),
+            # Average change of the number of datablocks per run of the module
+            "datablock_growth": {collection: change / len(times["wall"]) for collection, change in times["datablock_growth"].items() if change != 0},
+            "total": sum(times["wall"]),
+            "share": sum(times["wall"]) / total_time if total_time > 0 else 0
+        }
+
+    return {
+        "jobs": len(jobs),
+        "modules": modules,
+        "frames": total_frames,
+        "frames_per_second": total_frames / total_time if total_time > 0 else 0,
+        "import_time_per_job": import_time / len(jobs) if jobs else 0,
+        "non_render_share": 1 - render_time / total_time if total_time > 0 else 0
+    }
+
+
+def format_timing_report(summary):
+    """ Formats the result of aggregate_timings() as a table.
+
+    :param summary: The dict returned by aggregate_timings().
+    :return: The report as multi-line string.
+    """
+    lines = ["%-28s %6s %10s %10s %10s %10s %10s %7s" % ("Module", "Runs", "p50 [s]", "p95 [s]", "cpu p50", "import p50", "RSS +MB", "Share")]
+    for module, stats in sorted(summary["modules"].items(), key=lambda item: -item[1]["total"]):
+        lines.append("%-28s %6d %10.2f %10.2f %10.2f %10.2f %10.1f %6.1f%%" % (module, stats["count"], stats["p50"], stats["p95"], stats["cpu_p50"], stats["import_p50"], stats["rss_growth_p50"], 100 * stats["share"]))
+    lines.append("%d jobs, %d frames, %.3f frames/s (per job slot), %.1f%% of the time spent outside of rendering" % (
+        summary["jobs"], summary["frames"], summary["frames_per_second"], 100 * summary["non_render_share"]))
+    lines.append("%.2f s per job spent on importing python modules (before the modules run)" % summary["import_time_per_job"])
+    for module, stats in sorted(summary["modules"].items()):
+        if len(stats["datablock_growth"]) > 0:
+            lines.append("Datablocks added per run of %s: %s" % (module, ", ".join("%s %+.1f" % item for item in sorted(stats["datablock_growth"].items()))))
+    return "\n".join(lines)
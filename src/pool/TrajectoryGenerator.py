@@ -0,0 +1,309 @@
+import json
+import os
+
+import numpy as np
+
+from src.utility.RotationUtility import look_at_rotations
+
+
+class ModelExtents:
+    """ Returns the radius of the bounding sphere of every model around its origin.
+
+    The bounding sphere does not depend on the rotation of the object and only grows with its scale, so the
+    extent of an object in every frame of a trajectory is given by one number per model. As reading the vertices of a
+    large .obj takes a while, the radii are cached in a json file, the same way as the model stats of the JobCostEstimator.
+    """
+
+    def __init__(self, cache_path=None):
+        """
+        :param cache_path: The json file used to cache the radii. If None, the radii are not cached.
+        """
+        self.cache_path = cache_path
+        self._radii = {}
+        self._changed = False
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                self._radii = json.load(f)
+
+    def save(self):
+        """ Writes the cache, if new models were added. """
+        if self.cache_path is None or not self._changed:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._radii, f)
+        os.replace(tmp_path, self.cache_path)
+        self._changed = False
+
+    def radius(self, model_path):
+        """ Returns the largest distance of a vertex of the given .obj file to its origin.
+
+        :param model_path: The path of the .obj file.
+        :return: The radius of the bounding sphere.
+        """
+        mtime = os.path.getmtime(model_path)
+        if model_path in self._radii and self._radii[model_path]["mtime"] == mtime:
+            return self._radii[model_path]["radius"]
+
+        with open(model_path, "rb") as f:
+            vertices = [line.split()[1:4] for line in f if line.startswith(b"v ")]
+        radius = float(np.sqrt((np.array(vertices, dtype=np.float64) ** 2).sum(axis=1).max())) if len(vertices) > 0 else 0.0
+
+        self._radii[model_path] = {"mtime": mtime, "radius": radius}
+        self._changed = True
+        return radius
+
+
+class TrajectoryGenerator:
+    """ Generates the job specs of videos for composite.VOSTrajRunner, see JobSpecs.apply_job_spec().
+
+    Every video gets a camera moving on a smooth trajectory around the origin while looking at it, a few lights and
+    a random number of objects. The objects are placed one after the other: for every object num_candidates random
+    trajectories (location_poly, rotation_poly and scale_poly) are sampled and the one which overlaps the least with
+    the objects placed before and stays the longest in the view of the camera is accepted.
+
+    Objects are approximated by their bounding spheres (see ModelExtents), s.t. the overlap of all candidates of all
+    videos of a batch with all placed objects in all scored frames is one numpy broadcast per placed object. The
+    camera is treated as a sphere of radius camera_clearance, so objects do not pass through it.
+
+    All trajectories are polynomials in t = frame / (n_frames - 1), as evaluated by the trajectory runners. The
+    camera is assumed to have no source_frame, i.e. its poses are given in the blender frame.
+    """
+
+    def __init__(self, models, textures, extents, seed=0, n_frames=160, num_objects=(3, 5), num_lights=(1, 2),
+                 num_candidates=64, score_frames=32, degree=3, fov=0.691111, resolution=(768, 512), texture_probability=0.5,
+                 object_region=((-1.5, -1.5, 0.0), (1.5, 1.5, 1.5)), object_motion=1.0, object_rotation=np.pi / 2,
+                 object_scale=(0.8, 1.6), scale_change=0.2, camera_distance=(5.0, 7.0), camera_height=(1.0, 3.0),
+                 camera_motion=1.0, camera_clearance=0.5, light_height=(3.0, 6.0), light_energy=(500.0, 1500.0),
+                 visibility_weight=1.0):
+        """
+        :param models: The paths of the .obj files to choose from.
+        :param textures: The paths of the textures to choose from, objects without texture keep their own.
+        :param extents: The ModelExtents providing the radius of every model.
+        :param seed: The seed of the random generator, the same seed and parameters give the same videos.
+        :param n_frames: The number of frames of every video.
+        :param num_objects: The smallest and the largest number of objects per video.
+        :param num_lights: The smallest and the largest number of lights per video.
+        :param num_candidates: The number of trajectories sampled per object, of which the best is accepted.
+        :param score_frames: The number of evenly spaced frames in which the overlap and visibility is scored.
+        :param degree: The degree of the polynomials.
+        :param fov: The FOV of the camera, as set in the intrinsics of the template.
+        :param resolution: The resolution of the camera, as set in the intrinsics of the template.
+        :param texture_probability: The probability of an object to get a random texture.
+        :param object_region: The corners of the box the objects start in.
+        :param object_motion: The largest value of the higher coefficients of the location polynomials.
+        :param object_rotation: The largest value of the higher coefficients of the rotation polynomials.
+        :param object_scale: The range of the initial uniform scale of the objects.
+        :param scale_change: The largest relative change of the scale of an object.
+        :param camera_distance: The range of the initial horizontal distance of the camera to the origin.
+        :param camera_height: The range of the initial height of the camera.
+        :param camera_motion: The largest value of the higher coefficients of the camera location polynomial.
+        :param camera_clearance: The distance objects should keep to the camera.
+        :param light_height: The range of the initial height of the lights.
+        :param light_energy: The range of the energy of the point lights.
+        :param visibility_weight: How much leaving the view of the camera costs compared to overlapping another object completely.
+        """
+        if len(models) == 0:
+            raise Exception("No models to choose from")
+        self.models = list(models)
+        self.textures = list(textures)
+        self.extents = extents
+        self.random = np.random.RandomState(seed)
+        self.n_frames = n_frames
+        self.num_objects = num_objects
+        self.num_lights = num_lights
+        self.num_candidates = num_candidates
+        self.degree = degree
+        self.texture_probability = texture_probability
+        self.object_region = np.array(object_region, dtype=np.float64)
+        self.object_motion = object_motion
+        self.object_rotation = object_rotation
+        self.object_scale = object_scale
+        self.scale_change = scale_change
+        self.camera_distance = camera_distance
+        self.camera_height = camera_height
+        self.camera_motion = camera_motion
+        self.camera_clearance = camera_clearance
+        self.light_height = light_height
+        self.light_energy = light_energy
+        self.visibility_weight = visibility_weight
+
+        # The FOV spans the larger image dimension, as in CameraModule._set_cam_intrinsics()
+        width, height = resolution
+        tan_half_fov = np.tan(fov / 2)
+        self._tan_half_fov = np.array([tan_half_fov * width / max(width, height), tan_half_fov * height / max(width, height)])
+
+        # t^d of the scored frames, s.t. evaluating all polynomials is one matrix product
+        t = np.linspace(0, 1, min(score_frames, n_frames))
+        self._powers = t[:, None] ** np.arange(degree + 1)[None, :]
+
+    def _higher_coefficients(self, shape, amplitude):
+        """ Samples the coefficients of degree 1 and higher, higher degrees get smaller values to keep the trajectories smooth. """
+        coefficients = self.random.uniform(-amplitude, amplitude, shape + (self.degree, 3))
+        return coefficients / np.arange(1, self.degree + 1)[:, None]
+
+    def _evaluate(self, coefficients):
+        """ Evaluates polynomials (... x degree + 1 x 3) at the scored frames (... x frames x 3). """
+        return np.matmul(self._powers, coefficients)
+
+    def _sample_cameras(self, batch_size):
+        """ Samples the location and look at polynomials of the cameras (batch x degree + 1 x 3). """
+        azimuth = self.random.uniform(0, 2 * np.pi, batch_size)
+        distance = self.random.uniform(*self.camera_distance, batch_size)
+        locations = np.empty((batch_size, self.degree + 1, 3))
+        locations[:, 0] = np.stack([distance * np.cos(azimuth), distance * np.sin(azimuth), self.random.uniform(*self.camera_height, batch_size)], axis=1)
+        locations[:, 1:] = self._higher_coefficients((batch_size,), self.camera_motion)
+
+        look_ats = np.empty((batch_size, self.degree + 1, 3))
+        look_ats[:, 0] = self.random.uniform(self.object_region[0], self.object_region[1], (batch_size, 3)) / 2
+        look_ats[:, 1:] = self._higher_coefficients((batch_size,), self.camera_motion / 4)
+        return locations, look_ats
+
+    def _sample_objects(self, batch_size):
+        """ Samples num_candidates location, rotation and scale polynomials per video (batch x candidates x degree + 1 x 3). """
+        shape = (batch_size, self.num_candidates)
+        locations = np.empty(shape + (self.degree + 1, 3))
+        locations[:, :, 0] = self.random.uniform(self.object_region[0], self.object_region[1], shape + (3,))
+        locations[:, :, 1:] = self._higher_coefficients(shape, self.object_motion)
+
+        rotations = np.empty(shape + (self.degree + 1, 3))
+        rotations[:, :, 0] = self.random.uniform(0, 2 * np.pi, shape + (3,))
+        rotations[:, :, 1:] = self._higher_coefficients(shape, self.object_rotation)
+
+        # The same scale along all axes, s.t. the bounding sphere only changes its radius
+        initial_scale = self.random.uniform(*self.object_scale, shape)
+        scale_coefficients = np.concatenate([np.ones(shape + (1,)), self.random.uniform(-self.scale_change, self.scale_change, shape + (self.degree,)) / np.arange(1, self.degree + 1)], axis=2)
+        scales = np.repeat((initial_scale[:, :, None] * scale_coefficients)[:, :, :, None], 3, axis=3)
+        return locations, rotations, scales
+
+    def _invisible_fraction(self, centers, camera_positions, camera_rotations):
+        """ Returns the fraction of the scored frames in which the center of a candidate is not in the view of the camera.
+
+        :param centers: The centers of the candidates (batch x candidates x frames x 3).
+        :param camera_positions: The camera positions (batch x frames x 3).
+        :param camera_rotations: The camera rotations (batch x frames x 3 x 3).
+        :return: The fractions (batch x candidates).
+        """
+        # Into the camera frame, which looks along -Z
+        points = np.matmul((centers - camera_positions[:, None])[:, :, :, None], camera_rotations[:, None])[:, :, :, 0]
+        depth = -points[..., 2]
+        inside = (depth > 0) & np.all(np.abs(points[..., :2]) <= depth[..., None] * self._tan_half_fov, axis=-1)
+        return 1.0 - inside.mean(axis=2)
+
+    @staticmethod
+    def _overlap(centers, radii, placed_centers, placed_radii):
+        """ Returns how much every candidate overlaps with the placed spheres, summed over them and averaged over the frames.
+
+        The overlap of two spheres is their penetration depth relative to the sum of their radii, i.e. 0 if they do
+        not touch and 1 if their centers coincide.
+
+        :param centers: The centers of the candidates (batch x candidates x frames x 3).
+        :param radii: The radii of the candidates (batch x candidates x frames).
+        :param placed_centers: The centers of the placed spheres (batch x placed x frames x 3).
+        :param placed_radii: The radii of the placed spheres (batch x placed x frames).
+        :return: The overlap (batch x candidates).
+        """
+        distances = np.sqrt(np.square(centers[:, :, None] - placed_centers[:, None]).sum(axis=-1))
+        radius_sums = radii[:, :, None] + placed_radii[:, None]
+        penetration = np.clip(radius_sums - distances, 0, None) / np.maximum(radius_sums, 1e-9)
+        return penetration.sum(axis=2).mean(axis=2)
+
+    def generate(self, names, output_root):
+        """ Generates the job specs of a batch of videos.
+
+        :param names: The names of the videos, one job spec is generated per name.
+        :param output_root: The directory the output directories of the videos are created in (as <output_root>/<name>).
+        :return: A list with the job spec of every video and an array with the accepted cost of every placed object (videos x max objects, nan for unused slots).
+        """
+        batch_size = len(names)
+        batch = np.arange(batch_size)
+        object_counts = self.random.randint(self.num_objects[0], self.num_objects[1] + 1, batch_size)
+        light_counts = self.random.randint(self.num_lights[0], self.num_lights[1] + 1, batch_size)
+
+        camera_locations, camera_look_ats = self._sample_cameras(batch_size)
+        camera_positions = self._evaluate(camera_locations)
+        camera_rotations, _ = look_at_rotations(camera_positions.reshape(-1, 3), self._evaluate(camera_look_ats).reshape(-1, 3))
+        camera_rotations = camera_rotations.reshape(camera_positions.shape + (3,))
+
+        # The camera is the first placed sphere
+        placed_centers = camera_positions[:, None]
+        placed_radii = np.full(placed_centers.shape[:3], self.camera_clearance)
+
+        objects = [[] for _ in range(batch_size)]
+        costs = np.full((batch_size, self.num_objects[1]), np.nan)
+        for slot in range(self.num_objects[1]):
+            model_indices = self.random.randint(len(self.models), size=batch_size)
+            model_radii = np.array([self.extents.radius(self.models[i]) for i in model_indices])
+
+            locations, rotations, scales = self._sample_objects(batch_size)
+            centers = self._evaluate(locations)
+            radii = model_radii[:, None, None] * np.abs(self._evaluate(scales)[..., 0])
+
+            cost = self._overlap(centers, radii, placed_centers, placed_radii) + self.visibility_weight * self._invisible_fraction(centers, camera_positions, camera_rotations)
+            best = np.argmin(cost, axis=1)
+
+            # Videos with fewer objects ignore the object of this slot, it is placed far away instead of being removed to keep the arrays rectangular
+            used = slot < object_counts
+            accepted_centers = centers[batch, best]
+            accepted_centers[~used] = np.inf
+            placed_centers = np.concatenate([placed_centers, accepted_centers[:, None]], axis=1)
+            placed_radii = np.concatenate([placed_radii, radii[batch, best][:, None]], axis=1)
+            costs[used, slot] = cost[batch, best][used]
+
+            for v in np.flatnonzero(used):
+                objects[v].append((self.models[model_indices[v]], locations[v, best[v]], rotations[v, best[v]], scales[v, best[v]]))
+
+        specs = []
+        for v, name in enumerate(names):
+            specs.append({
+                "name": name,
+                "global": {"all": {"output_dir": os.path.join(output_root, name)}},
+                "modules": {"composite.VOSTrajRunner": {
+                    "n_frames": self.n_frames,
+                    "camera_runner": {"config": {"cam_poses": {
+                        "location_poly": camera_locations[v].tolist(),
+                        "look_at_poly": camera_look_ats[v].tolist()
+                    }}},
+                    "object_runners": [self._object_runner(*obj) for obj in objects[v]],
+                    "light_runners": [self._light_runner(i) for i in range(light_counts[v])]
+                }}
+            })
+        return specs, costs
+
+    def _object_runner(self, model_path, locations, rotations, scales):
+        texture = ""
+        if len(self.textures) > 0 and self.random.uniform() < self.texture_probability:
+            texture = self.textures[self.random.randint(len(self.textures))]
+        return {
+            "module": "object.ObjectTrajectoryRunner",
+            "config": {
+                "path": model_path,
+                "texture": texture,
+                "seed": int(self.random.randint(2 ** 31)),
+                "poses": {
+                    "location_poly": locations.tolist(),
+                    "rotation_poly": rotations.tolist(),
+                    "scale_poly": scales.tolist()
+                }
+            }
+        }
+
+    def _light_runner(self, index):
+        locations = np.zeros((self.degree + 1, 3))
+        locations[0] = self.random.uniform(self.object_region[0][0] * 3, self.object_region[1][0] * 3), self.random.uniform(self.object_region[0][1] * 3, self.object_region[1][1] * 3), self.random.uniform(*self.light_height)
+        locations[1:] = self._higher_coefficients((), self.object_motion)
+        return {
+            "module": "lighting.LightTrajectoryRunner",
+            "config": {
+                "name": "light_%d" % index,
+                "light": {
+                    "type": "POINT",
+                    "energy": float(self.random.uniform(*self.light_energy))
+                },
+                "poses": {
+                    "location_poly": locations.tolist(),
+                    # Point lights shine in all directions
+                    "rotation_poly": np.zeros((self.degree + 1, 3)).tolist()
+                }
+            }
+        }
@@ -70,7 +70,7 @@ def run(self):
         if get_forward_flow is False and get_backward_flow is False:
             raise Exception("Take the FlowRenderer Module out of the config if both forward and backward flow are set to False!")
 
-        with Utility.UndoAfterExecution():
+        with Utility.RestoreAfterExecution():
             self._configure_renderer()
 
             self._output_vector_field()
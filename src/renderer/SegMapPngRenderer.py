@@ -3,33 +3,11 @@
 
 import bpy
 import numpy as np
-from PIL import Image
 
 from src.renderer.Renderer import Renderer
 from src.utility.Utility import Utility
 from src.utility.BlenderUtility import load_image
-
-def get_color_map(N=256):
-    def bitget(byteval, idx):
-        return ((byteval & (1 << idx)) != 0)
-
-    cmap = np.zeros((N, 3), dtype=np.uint8)
-    for i in range(N):
-        r = g = b = 0
-        c = i
-        for j in range(8):
-            r = r | (bitget(c, 0) << 7-j)
-            g = g | (bitget(c, 1) << 7-j)
-            b = b | (bitget(c, 2) << 7-j)
-            c = c >> 3
-
-        cmap[i] = np.array([r, g, b])
-
-    return cmap
-
-cache_color_map = get_color_map()
-def pal_color_map():
-    return cache_color_map
+from src.utility.PostProcessingUtility import save_segmap_png
 
 
 class SegMapPngRenderer(Renderer):
@@ -115,7 +93,7 @@ def _colorize_objects_for_instance_segmentation(self, objects):
         return colors, num_splits_per_dimension
 
     def run(self):
-        with Utility.UndoAfterExecution():
+        with Utility.RestoreAfterExecution():
             self._configure_renderer(default_samples=1)
 
             # get current method for color mapping, instance or class
@@ -151,16 +129,22 @@ def run(self):
             if not self._avoid_rendering:
                 for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):  # for each rendered frame
                     file_path = temporary_segmentation_file_path + "%04d" % frame + ".exr"
-                    segmentation = load_image(file_path)
+                    fname = final_segmentation_file_path + "%04d.png" % frame
 
-                    segmap = Utility.map_back_from_equally_spaced_equidistant_values(segmentation, num_splits_per_dimension, self.render_colorspace_size_per_dimension)
-                    segmap = segmap.astype(optimal_dtype)
+                    if self._postprocessing_is_deferred():
+                        # The .exr is converted later by a CPU worker, outside of blender
+                        self._add_postprocessing_task({
+                            "type": "segmap",
+                            "source": file_path,
+                            "target": fname,
+                            "num_splits_per_dimension": num_splits_per_dimension,
+                            "space_size_per_dimension": self.render_colorspace_size_per_dimension,
+                            "dtype": np.dtype(optimal_dtype).name
+                        })
+                        continue
 
-                    fname = final_segmentation_file_path + "%04d.png" % frame
-                    # np.save(fname, segmap)
-                    seg = Image.fromarray(segmap, mode='P')
-                    seg.putpalette(pal_color_map())
-                    seg.save(fname)
+                    segmentation = load_image(file_path)
+                    save_segmap_png(segmentation, num_splits_per_dimension, self.render_colorspace_size_per_dimension, optimal_dtype, fname)
 
 
         self._register_output("", "segmap_png", ".png", "1.0.0")
\ No newline at end of file
@@ -118,7 +118,7 @@ def _colorize_objects_for_instance_segmentation(self, objects):
         return colors, num_splits_per_dimension, color_map
 
     def run(self):
-        with Utility.UndoAfterExecution():
+        with Utility.RestoreAfterExecution():
             self._configure_renderer(default_samples=1)
 
             # get current method for color mapping, instance or class
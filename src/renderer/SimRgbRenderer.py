@@ -55,8 +55,9 @@ def change_to_texture_less_render(self):
 
     def run(self):
         # if the rendering is not performed -> it is probably the debug case.
-        do_undo = not self._avoid_rendering
-        with Utility.UndoAfterExecution(perform_undo_op=do_undo):
+        do_restore = not self._avoid_rendering
+        # The alpha channel is added to the original materials of the scene, unless they are replaced in texture less mode
+        with Utility.RestoreAfterExecution(material_node_trees=self.config.get_bool("use_alpha", False), perform_restore=do_restore):
             self._configure_renderer(default_denoiser="Intel", default_samples=64)
 
             # In case a previous renderer changed these settings
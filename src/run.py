@@ -2,6 +2,10 @@
 import bpy
 import sys
 import os
+import json
+import socket
+import time
+import traceback
 from sys import platform
 
 # Make sure the current script directory is in PATH, so we can load other python modules
@@ -21,24 +25,136 @@
 # Read args
 argv = sys.argv
 batch_index_file = None
+worker_address = None
+postprocessing_dir = None
+parsed_config = None
+scene_reset = "cleanup"
+profile_modules = None
+job_specs_file = None
+job_name = None
 
 if "--batch-process" in argv:
     batch_index_file = argv[argv.index("--batch-process") + 1]
+if "--worker" in argv:
+    worker_address = argv[argv.index("--worker") + 1]
 
 argv = argv[argv.index("--") + 1:]
+if "--postprocessing-dir" in argv:
+    index = argv.index("--postprocessing-dir")
+    postprocessing_dir = argv[index + 1]
+    del argv[index:index + 2]
+if "--scene-reset" in argv:
+    index = argv.index("--scene-reset")
+    scene_reset = argv[index + 1]
+    del argv[index:index + 2]
+if "--profile" in argv:
+    # Comma separated list of module names or "all"
+    index = argv.index("--profile")
+    profile_modules = argv[index + 1].split(",")
+    del argv[index:index + 2]
+if "--job-specs" in argv:
+    # JSONL file with the overrides of every job, which are merged into the config (the template)
+    index = argv.index("--job-specs")
+    job_specs_file = argv[index + 1]
+    del argv[index:index + 2]
+if "--job-name" in argv:
+    index = argv.index("--job-name")
+    job_name = argv[index + 1]
+    del argv[index:index + 2]
+if "--parsed-config" in argv:
+    # The launcher already parsed the yaml and stored the result as json
+    index = argv.index("--parsed-config")
+    with open(argv[index + 1], "r") as f:
+        parsed_config = json.load(f)
+    del argv[index:index + 2]
 working_dir = os.path.dirname(os.path.abspath(__file__))
 
 from src.main.Pipeline import Pipeline
+from src.utility.Utility import Utility
+
+
+def run_job(config_path, args, postprocessing_dir=None, parsed_config=None, scene_reset="cleanup", profile_modules=None, job_name=None):
+    """ Runs one pipeline on a fresh scene and reports how it went.
+
+    :param config_path: The path to the config file.
+    :param args: The arguments used to fill the <args:i> placeholders.
+    :param postprocessing_dir: If given, post-processing is left to the post-processing workers, see Pipeline.
+    :param parsed_config: The already parsed config, if given, the config file is not read again.
+    :param scene_reset: How the scene of the previous job is removed, see Pipeline._reset_scene().
+    :param profile_modules: The modules to run under the profiler, if None, "profile_modules" of the config is used.
+    :param job_name: The name of the job, per default the name of the config file.
+    :return: A dict with "success", "duration", "rss_mb" and "error" if the pipeline failed.
+    """
+    start = time.time()
+    result = {"success": True}
+    try:
+        pipeline = Pipeline(config_path, args, working_dir, postprocessing_dir=postprocessing_dir, parsed_config=parsed_config, scene_reset=scene_reset, profile_modules=profile_modules, job_name=job_name)
+        pipeline.run()
+    except Exception:
+        traceback.print_exc()
+        result = {"success": False, "error": traceback.format_exc()}
+    result["duration"] = time.time() - start
+    result["rss_mb"] = Utility.get_memory_usage()
+    return result
+
+
+def run_worker(address):
+    """ Connects to a pool_run.py dispatcher and runs the jobs received from there until the connection is closed.
+
+    Every line sent by the dispatcher is a json dict with "config", "args" and optionally "postprocessing_dir", "parsed_config", "scene_reset", "profile_modules" and "job_name", every answer is the result dict of run_job().
+    """
+    host, port = address.rsplit(":", 1)
+    connection = socket.create_connection((host, int(port)))
+    stream = connection.makefile("rw")
+    stream.write(json.dumps({"token": os.environ.get("BLENDER_WORKER_TOKEN", "")}) + "\n")
+    stream.flush()
+
+    for line in stream:
+        job = json.loads(line)
+        result = run_job(job["config"], job["args"], job.get("postprocessing_dir"), job.get("parsed_config"), job.get("scene_reset", scene_reset), job.get("profile_modules", profile_modules), job.get("job_name"))
+        stream.write(json.dumps(result) + "\n")
+        stream.flush()
+        # The scene might be left in an undefined state, so let the dispatcher start a fresh blender
+        if not result["success"]:
+            break
+    connection.close()
+
 
 config_path = argv[0]
-if batch_index_file == None:
-    pipeline = Pipeline(config_path, argv[1:], working_dir)
+if worker_address is not None:
+    run_worker(worker_address)
+elif job_specs_file is not None:
+    from src.utility.ConfigParser import ConfigParser
+    from src.utility.JobSpecs import read_job_specs, apply_job_spec
+    # The template is read only once, every job gets a copy with its overrides merged in
+    template = ConfigParser(silent=True).compile(Utility.resolve_path(config_path))
+
+    failed_jobs = []
+    for name, spec in read_job_specs(Utility.resolve_path(job_specs_file)).items():
+        config = apply_job_spec(template.fill(argv[1:]), spec)
+        if not run_job(config_path, argv[1:], parsed_config=config, scene_reset=scene_reset, profile_modules=profile_modules, job_name=name)["success"]:
+            failed_jobs.append(name)
+
+    if len(failed_jobs) > 0:
+        raise Exception("The following jobs failed:\n" + "\n".join(failed_jobs))
+elif batch_index_file == None:
+    pipeline = Pipeline(config_path, argv[1:], working_dir, postprocessing_dir=postprocessing_dir, parsed_config=parsed_config, profile_modules=profile_modules, job_name=job_name)
     pipeline.run()
 else:
     with open(Utility.resolve_path(batch_index_file), "r") as f:
         lines = f.readlines()
 
-        for line in lines:
-            args = line.split(" ")
-            pipeline = Pipeline(config_path, args, working_dir)
-            pipeline.run()
+    # Read the config only once, every batch entry just fills in its arguments
+    from src.utility.ConfigParser import ConfigParser
+    template = ConfigParser(silent=True).compile(Utility.resolve_path(config_path))
+
+    failed_lines = []
+    for line in lines:
+        args = line.split()
+        if len(args) == 0:
+            continue
+        if not run_job(config_path, args, parsed_config=template.fill(args), scene_reset=scene_reset, profile_modules=profile_modules)["success"]:
+            failed_lines.append(line.strip())
+
+    if len(failed_lines) > 0:
+        raise Exception("The following batch entries failed:\n" + "\n".join(failed_lines))
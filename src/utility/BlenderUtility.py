@@ -278,11 +278,13 @@ def load_image(file_path, num_channels=3):
     :return: The numpy array
     """
     # load image with blender function
-    img = bpy.data.images.load(file_path, check_existing=False)
+    image = bpy.data.images.load(file_path, check_existing=False)
     # convert image to proper size
-    size = img.size
-    channels = img.channels
-    img = np.array(img.pixels).reshape(size[1], size[0], channels)
+    size = image.size
+    channels = image.channels
+    img = np.array(image.pixels).reshape(size[1], size[0], channels)
+    # Otherwise every loaded frame stays in bpy.data.images (and in memory) until the blender process ends
+    bpy.data.images.remove(image)
     img = np.flip(img, axis=0)
     if file_path.endswith('.png') or file_path.endswith('.jpg'):
         # convert the 0 to 1 space to 0 ... 255 and save it as uint8
@@ -326,3 +328,52 @@ def duplicate_objects(objects):
     duplicates = bpy.context.selected_objects
     bpy.ops.object.select_all(action='DESELECT')
     return duplicates
+
+# The F-curves of these properties of objects are grouped like keyframe_insert() does
+OBJECT_TRANSFORM_PATHS = ["location", "rotation_euler", "rotation_quaternion", "rotation_axis_angle", "scale", "delta_location", "delta_rotation_euler", "delta_scale"]
+
+def insert_keyframes(datablock, data_path, values, frame_start=0):
+    """ Keys a property for many consecutive frames at once.
+
+    Has the same result as setting the property to values[i] and calling datablock.keyframe_insert(data_path, frame=frame_start + i)
+    for every i, but the F-curves are looked up only once and all keyframes are written with one foreach_set() per
+    component, which is much faster for long trajectories. The keyed frames should not have keyframes yet.
+
+    :param datablock: The datablock owning the property, e.g. an object or a camera.
+    :param data_path: The name of the property, e.g. "location".
+    :param values: An array with one value (scalar properties) or one vector (array properties) per frame.
+    :param frame_start: The frame of the first value.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    num_frames, num_components = values.shape
+
+    if datablock.animation_data is None:
+        datablock.animation_data_create()
+    if datablock.animation_data.action is None:
+        datablock.animation_data.action = bpy.data.actions.new(datablock.name + "Action")
+    action = datablock.animation_data.action
+    group = "Object Transforms" if isinstance(datablock, bpy.types.Object) and data_path in OBJECT_TRANSFORM_PATHS else ""
+
+    frames = np.arange(frame_start, frame_start + num_frames, dtype=np.float32)
+    for index in range(num_components):
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is None:
+            fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+        keyframe_points = fcurve.keyframe_points
+        num_existing = len(keyframe_points)
+        # foreach_set() writes all points, so the existing ones are written again
+        co = np.empty(2 * (num_existing + num_frames), dtype=np.float32)
+        if num_existing > 0:
+            keyframe_points.foreach_get("co", co[:2 * num_existing])
+        co[2 * num_existing::2] = frames
+        co[2 * num_existing + 1::2] = values[:, index]
+        keyframe_points.add(num_frames)
+        keyframe_points.foreach_set("co", co)
+        # Sorts the points and computes their handles
+        fcurve.update()
+
+    # keyframe_insert() keys the current value, so the property is left at the value of the last frame
+    last_value = values[-1].tolist()
+    setattr(datablock, data_path, last_value if num_components > 1 else last_value[0])
@@ -1,6 +1,5 @@
 import datetime
 import numpy as np
-from skimage import measure
 
 
 class CocoUtility:
@@ -183,6 +182,9 @@ def binary_mask_to_polygon(binary_mask, tolerance=0):
          :param binary_mask: a 2D binary numpy array where '1's represent the object
          :param tolerance: Maximum distance from original points of polygon to approximated polygonal chain. If tolerance is 0, the original coordinate array is returned.
         """
+        # skimage is slow to import and only needed for polygon annotations
+        from skimage import measure
+
         polygons = []
         # pad mask to close contours of shapes which start and end at an edge
         padded_binary_mask = np.pad(binary_mask, pad_width=1, mode='constant', constant_values=0)
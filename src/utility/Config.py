@@ -4,9 +4,77 @@
 from src.main.Provider import Provider
 
 class Config:
+    """ Read access to a (nested) configuration dict.
+
+    Parameter paths like "a/b/c" are split only once and the dicts along the path of a parameter are remembered, so
+    repeated lookups (e.g. inside sampling loops) only check that these dicts are still in place. As the data can be
+    modified from outside (e.g. a module replacing a sub dict), a remembered lookup is only used as long as every dict
+    along the path is still the same object. Typed values (int, float, vectors, ...) are cached as long as the raw
+    value is found in the same dict and is the same object. Values which are computed by a provider are never cached,
+    so providers still sample a fresh value on every access.
+    """
+
+    # The keys of every parameter path looked up so far, shared by all configs
+    _path_keys = {}
 
     def __init__(self, data):
         self.data = data
+        # The dicts along the path of the parameter (starting with data), per parameter path
+        self._blocks = {}
+        # The raw value and its converted version, per type and parameter path
+        self._converted = {}
+
+    @staticmethod
+    def _split_path(name):
+        """ Returns the keys of the given parameter path, e.q. "render/iterations" results in ["render", "iterations"]. """
+        keys = Config._path_keys.get(name)
+        if keys is None:
+            keys = name.split("/")
+            Config._path_keys[name] = keys
+        return keys
+
+    @staticmethod
+    def _walk(block, keys):
+        """ Follows the given keys (except the last one) through the nested dicts starting at the given block.
+
+        :param block: The dict to start at.
+        :param keys: The keys of the parameter path.
+        :return: The dict which should contain the parameter or None, if one of the intermediate blocks does not exist.
+        """
+        for key in keys[:-1]:
+            block = block.get(key)
+            if type(block) is not dict:
+                return None
+        return block
+
+    def _find_block(self, name):
+        """ Returns the dict which contains the parameter with the given name, together with the parameter's key.
+
+        :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations"]
+        :return: The dict and the key, the dict is None if the parameter does not exist.
+        """
+        keys = Config._split_path(name)
+        key = keys[-1]
+        blocks = self._blocks.get(name)
+        if blocks is not None and blocks[0] is self.data:
+            # Make sure none of the dicts along the path has been replaced since the last lookup
+            for i in range(1, len(blocks)):
+                if blocks[i - 1].get(keys[i - 1]) is not blocks[i]:
+                    break
+            else:
+                if key in blocks[-1]:
+                    return blocks[-1], key
+
+        blocks = [self.data]
+        for block_key in keys[:-1]:
+            block = blocks[-1].get(block_key)
+            if type(block) is not dict:
+                return None, key
+            blocks.append(block)
+        if key not in blocks[-1]:
+            return None, key
+        self._blocks[name] = blocks
+        return blocks[-1], key
 
     def has_param(self, name, block=None):
         """ Check if parameter is defined in config 
@@ -14,24 +82,35 @@ def has_param(self, name, block=None):
         :param block: A dict containing the configuration. If none, the whole data of this config object will be used.
         :return: True if parameter exists, False if not
         """
-
         if block is None:
-            block = self.data
+            return self._find_block(name)[0] is not None
+
+        keys = Config._split_path(name)
+        block = Config._walk(block, keys)
+        return block is not None and keys[-1] in block
+
+    def _value_of(self, block, key, allow_invoke_provider):
+        """ Returns the value of the parameter with the given key inside the given block, invoking providers if necessary.
+
+        :param block: The dict containing the parameter.
+        :param key: The key of the parameter.
+        :param allow_invoke_provider: If set to True, then a provider is automatically invoked if the parameter value is a dict.
+        :return: The value of the parameter.
+        """
+        # Check for whether a provider should be invoked
+        if allow_invoke_provider and type(block[key]) is dict:
+            block[key] = Utility.Utility.build_provider_based_on_config(block[key])
 
-        if "/" in name:
-            delimiter_pos = name.find("/")
-            block_name = name[:delimiter_pos]
-            if block_name in block and type(block[block_name]) is dict:
-                return self.has_param(name[delimiter_pos + 1:], block[block_name])
+        # If the parameter is set to a provider object, call the provider to return the parameter value
+        if isinstance(block[key], Provider):
+            return block[key].run()
         else:
-            return name in block
-            
-        return False
-            
+            return block[key]
+
     def _get_value(self, name, block=None, allow_invoke_provider=False):
         """ Returns the value of the parameter with the given name inside the given block.
 
-        Basically just a recursive dict lookup, making sure the parameter exists, otherwise an error is thrown.
+        Basically just a dict lookup, making sure the parameter exists, otherwise an error is thrown.
 
         :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations]
         :param block: A dict containing the configuration. If none, the whole data of this config object will be used.
@@ -39,29 +118,16 @@ def _get_value(self, name, block=None, allow_invoke_provider=False):
         :return: The value of the parameter.
         """
         if block is None:
-            block = self.data
-
-        if "/" in name:
-            delimiter_pos = name.find("/")
-            block_name = name[:delimiter_pos]
-            if block_name in block and type(block[block_name]) is dict:
-                return self._get_value(name[delimiter_pos + 1:], block[block_name], allow_invoke_provider)
-            else:
-                raise NotFoundError("No such configuration block '" + block_name + "'!")
+            block, key = self._find_block(name)
         else:
-            if name in block:
-
-                # Check for whether a provider should be invoked
-                if allow_invoke_provider and type(block[name]) is dict:
-                    block[name] = Utility.Utility.build_provider_based_on_config(block[name])
+            keys = Config._split_path(name)
+            block, key = Config._walk(block, keys), keys[-1]
+            if block is not None and key not in block:
+                block = None
 
-                # If the parameter is set to a provider object, call the provider to return the parameter value
-                if isinstance(block[name], Provider):
-                    return block[name].run()
-                else:
-                    return block[name]
-            else:
-                raise NotFoundError("No such configuration '" + name + "'!")
+        if block is None:
+            raise NotFoundError("No such configuration '" + name + "'!")
+        return self._value_of(block, key, allow_invoke_provider)
             
     def _get_value_with_fallback(self, name, fallback=None, allow_invoke_provider=False):
         """ Returns the value of the given parameter with the given name.
@@ -74,13 +140,46 @@ def _get_value_with_fallback(self, name, fallback=None, allow_invoke_provider=Fa
         :param allow_invoke_provider: If set to True, then a provider is automatically invoked if the parameter value is a dict.
         :return: The value of the parameter.
         """
-        try:
-            return self._get_value(name, None, allow_invoke_provider)
-        except NotFoundError:
+        block, key = self._find_block(name)
+        if block is None:
             if fallback is not None:
                 return fallback
-            else:
-                raise
+            raise NotFoundError("No such configuration '" + name + "'!")
+        return self._value_of(block, key, allow_invoke_provider)
+
+    def _get_converted_value(self, name, fallback, value_type, convert, *convert_args):
+        """ Returns the value of the given parameter after converting it with the given function.
+
+        The conversion of a static value is cached until the value or one of the dicts along its path is replaced in
+        the config. For providers, only the lookup is cached, they are still invoked on every call. Fallbacks are
+        converted on every call.
+
+        :param name: The name of the parameter. "/" can be used to represent nested parameters (e.q. "render/iterations" results in ["render"]["iterations]
+        :param fallback: The fallback value, returned (converted) if the parameter does not exist.
+        :param value_type: Identifies the conversion in the cache.
+        :param convert: The function converting the raw value.
+        :param convert_args: Further arguments of the conversion function.
+        :return: The converted value.
+        """
+        block, key = self._find_block(name)
+        if block is None:
+            if fallback is None:
+                raise NotFoundError("No such configuration '" + name + "'!")
+            return convert(fallback, *convert_args)
+
+        cache = self._converted.get(value_type)
+        if cache is None:
+            cache = self._converted[value_type] = {}
+        cached = cache.get(name)
+        if cached is not None and cached[0] is block and cached[1] is block[key]:
+            if cached[2] is Provider:
+                # Providers have to be invoked on every call
+                return convert(block[key].run(), *convert_args)
+            return cached[2]
+
+        converted = convert(self._value_of(block, key, True), *convert_args)
+        cache[name] = (block, block[key], Provider if isinstance(block[key], Provider) else converted)
+        return converted
 
     def get_raw_dict(self, name, fallback=None):
         """ Returns the complete dict stored at the given parameter path.
@@ -110,11 +209,7 @@ def get_int(self, name, fallback=None):
         :param fallback: The fallback value, returned if the parameter does not exist.
         :return: The integer value.
         """
-        value = self._get_value_with_fallback(name, fallback, True)
-        try:
-            return int(value)
-        except ValueError:
-            raise TypeError("Cannot convert '" + str(value) + "' to int!")
+        return self._get_converted_value(name, fallback, "int", Config._to_int)
 
     def get_bool(self, name, fallback=None):
         """ Returns the boolean value stored at the given parameter path.
@@ -125,11 +220,7 @@ def get_bool(self, name, fallback=None):
         :param fallback: The fallback value, returned if the parameter does not exist.
         :return: The boolean value.
         """
-        value = self._get_value_with_fallback(name, fallback, True)
-        try:
-            return bool(value)
-        except ValueError:
-            raise TypeError("Cannot convert '" + str(value) + "' to bool!")
+        return self._get_converted_value(name, fallback, "bool", Config._to_bool)
 
     def get_float(self, name, fallback=None):
         """ Returns the float value stored at the given parameter path.
@@ -140,11 +231,7 @@ def get_float(self, name, fallback=None):
         :param fallback: The fallback value, returned if the parameter does not exist.
         :return: The float value.
         """
-        value = self._get_value_with_fallback(name, fallback, True)
-        try:
-            return float(value)
-        except ValueError:
-            raise TypeError("Cannot convert '" + str(value) + "' to float!")
+        return self._get_converted_value(name, fallback, "float", Config._to_float)
 
     def get_string(self, name, fallback=None):
         """ Returns the string value stored at the given parameter path.
@@ -155,11 +242,7 @@ def get_string(self, name, fallback=None):
         :param fallback: The fallback value, returned if the parameter does not exist.
         :return: The string value.
         """
-        value = self._get_value_with_fallback(name, fallback, True)
-        try:
-            return str(value)
-        except ValueError:
-            raise TypeError("Cannot convert '" + str(value) + "' to string!")
+        return self._get_converted_value(name, fallback, "string", Config._to_string)
 
     def get_list(self, name, fallback=None):
         """ Returns the list stored at the given parameter path.
@@ -170,15 +253,7 @@ def get_list(self, name, fallback=None):
         :param fallback: The fallback value, returned if the parameter does not exist.
         :return: The list.
         """
-        value = self._get_value_with_fallback(name, fallback, True)
-
-        if isinstance(value, mathutils.Vector):
-            value = list(value)
-
-        if not isinstance(value, list):
-            raise TypeError("Cannot convert '" + str(value) + "' to list!")
-
-        return value
+        return self._get_converted_value(name, fallback, "list", Config._to_list)
 
     def get_vector(self, name, fallback=None, dimensions=None):
         """ Returns the vector stored at the given parameter path.
@@ -190,10 +265,9 @@ def get_vector(self, name, fallback=None, dimensions=None):
         :param dimensions: If not None, specifies the required number of dimensions. If the configured vector has not exactly this number of dimensions, an error is thrown.
         :return: The vector.
         """
-        value = self.get_list(name, fallback)
-
-        if dimensions is not None and len(value) != dimensions:
-            raise TypeError(str(value) + "' must have exactly " + str(dimensions) + " dimensions!")
+        # Only the validated components are cached, every call returns a new vector as callers might modify it
+        # The number of dimensions identifies the conversion in the cache
+        value = self._get_converted_value(name, fallback, dimensions, Config._to_vector_list, dimensions)
 
         try:
             value = mathutils.Vector(value)
@@ -290,6 +364,52 @@ def get_matrix_4x4(self, name, fallback=None):
         """
         return self.get_matrix(name, fallback, 4)
 
+    @staticmethod
+    def _to_int(value):
+        try:
+            return int(value)
+        except ValueError:
+            raise TypeError("Cannot convert '" + str(value) + "' to int!")
+
+    @staticmethod
+    def _to_bool(value):
+        try:
+            return bool(value)
+        except ValueError:
+            raise TypeError("Cannot convert '" + str(value) + "' to bool!")
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except ValueError:
+            raise TypeError("Cannot convert '" + str(value) + "' to float!")
+
+    @staticmethod
+    def _to_string(value):
+        try:
+            return str(value)
+        except ValueError:
+            raise TypeError("Cannot convert '" + str(value) + "' to string!")
+
+    @staticmethod
+    def _to_list(value):
+        if isinstance(value, mathutils.Vector):
+            value = list(value)
+
+        if not isinstance(value, list):
+            raise TypeError("Cannot convert '" + str(value) + "' to list!")
+
+        return value
+
+    @staticmethod
+    def _to_vector_list(value, dimensions):
+        value = Config._to_list(value)
+
+        if dimensions is not None and len(value) != dimensions:
+            raise TypeError(str(value) + "' must have exactly " + str(dimensions) + " dimensions!")
+
+        return value
 
 class NotFoundError(Exception):
     pass
@@ -1,18 +1,30 @@
 import yaml
 import re
 import os
+import copy
+import marshal
+import threading
+from collections import OrderedDict
 from enum import Enum
 try:
   basestring
 except NameError:
   basestring = str
 
+# The C implementation of the yaml loader is much faster, but it is only available if pyyaml was built with libyaml
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 class PlaceholderTypes(Enum):
     ARG = 1
     ENV = 2
 
 
 class ConfigParser:
+    # The most recently compiled templates, per config path
+    _templates = OrderedDict()
+    _templates_lock = threading.Lock()
+    max_cached_templates = 256
+
     def __init__(self, silent=False):
         """
         :param silent: If silent is True, then debug information is not printed
@@ -42,7 +54,7 @@ def parse(self, config_path, args, show_help=False, skip_arg_placeholders=False)
             self.log("Parsing config '" + config_path + "'", is_info=True)
         with open(config_path, "r") as f:
             # Read in dict
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=SafeLoader)
             self.args = args
 
             # Check if the config is up to date
@@ -63,6 +75,33 @@ def parse(self, config_path, args, show_help=False, skip_arg_placeholders=False)
             self.log("Successfully finished parsing ", is_info=True)
         return self.config
 
+    def compile(self, config_path):
+        """ Reads the yaml file at the given path and indexes its placeholders, s.t. it can be filled quickly with different arguments.
+
+        The templates of recently compiled files are cached, as long as the file is not modified.
+
+        :param config_path: The path to the yaml file.
+        :return: A ConfigTemplate, call fill() on it to get the configuration.
+        """
+        stat = os.stat(config_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with ConfigParser._templates_lock:
+            cached = ConfigParser._templates.get(config_path)
+            if cached is not None and cached[0] == stamp:
+                ConfigParser._templates.move_to_end(config_path)
+                return ConfigTemplate(self, cached[1])
+
+        with open(config_path, "r") as f:
+            self.config = yaml.load(f, Loader=SafeLoader)
+        self._check_version()
+        compiled = _CompiledConfig(self.config, self._parse_placeholders_in_block(self.config))
+
+        with ConfigParser._templates_lock:
+            ConfigParser._templates[config_path] = (stamp, compiled)
+            while len(ConfigParser._templates) > ConfigParser.max_cached_templates:
+                ConfigParser._templates.popitem(last=False)
+        return ConfigTemplate(self, compiled)
+
     def _check_version(self):
         """ Checks if the configuration file contain a valid version number and if its up to date. """
         exception_text = None
@@ -258,3 +297,82 @@ def log(self, message, is_info=False):
         # If silent is True, then debug information is not printed.
         if not is_info or not self.silent:
             print(message)
+
+
+class _CompiledConfig:
+    """ The parsed yaml of a config file together with the positions of its placeholders. """
+
+    def __init__(self, config, placeholders):
+        """
+        :param config: The parsed yaml.
+        :param placeholders: The placeholders found in the config, see ConfigParser._parse_placeholders_in_block().
+        """
+        try:
+            # Much faster to copy than a nested dict, works as long as the yaml only contains basic types
+            self.serialized = marshal.dumps(config)
+            self.config = None
+        except ValueError:
+            self.serialized = None
+            self.config = config
+        self.placeholders = placeholders
+
+    def copy_config(self):
+        """ Returns a new copy of the parsed yaml, which can be modified freely. """
+        if self.serialized is not None:
+            return marshal.loads(self.serialized)
+        return copy.deepcopy(self.config)
+
+
+class ConfigTemplate:
+    """ A config file that has been read and indexed once by ConfigParser.compile().
+
+    Every call of fill() returns a new configuration, only the strings containing placeholders are touched.
+    """
+
+    def __init__(self, parser, compiled):
+        """
+        :param parser: The ConfigParser used for logging.
+        :param compiled: The _CompiledConfig of the config file.
+        """
+        self.parser = parser
+        self.compiled = compiled
+
+    def fill(self, args, skip_arg_placeholders=False):
+        """ Returns the configuration with all placeholders replaced by the given arguments and the env variables.
+
+        Behaves like ConfigParser.parse(), i.e. the program is exited if a placeholder can not be filled.
+
+        :param args: A list with the arguments which should be used for replacing <args:i> templates inside the config.
+        :param skip_arg_placeholders: If true, disregards filling up non environment type arguments.
+        :return: The dict containing the configuration.
+        """
+        config = self.compiled.copy_config()
+        unfilled_placeholders = []
+        for placeholder in self.compiled.placeholders:
+            if placeholder["type"] == PlaceholderTypes.ARG:
+                if skip_arg_placeholders:
+                    continue
+                arg_index = int(placeholder["match"])
+                if arg_index >= len(args):
+                    unfilled_placeholders.append(placeholder)
+                    continue
+                old, new = "<args:" + str(arg_index) + ">", args[arg_index]
+            else:
+                if placeholder["match"] not in os.environ:
+                    unfilled_placeholders.append(placeholder)
+                    continue
+                old, new = "<env:" + placeholder["match"] + ">", os.environ[placeholder["match"]]
+
+            # Walk down the config dict along the given path
+            block = config
+            path = placeholder["path"]
+            for key in path[:-1]:
+                block = block[key]
+            block[path[-1]] = block[path[-1]].replace(old, new)
+
+        if len(unfilled_placeholders) > 0:
+            self.parser.config = config
+            self.parser.log("There was an error while parsing the config.\nThe following placeholders could not be filled:\n")
+            self.parser._print_placeholders(unfilled_placeholders, {PlaceholderTypes.ARG: "Missing arguments:", PlaceholderTypes.ENV: "Missing environment variables:"})
+            exit(0)
+        return config
@@ -1,7 +1,6 @@
 from src.utility.Config import Config
 from src.utility.Utility import Utility
 import json
-from copy import deepcopy
 
 class ItemCollection:
     """ Manages the reading and creation of multiple items (like light sources or cam poses) from config or file. """
@@ -45,10 +44,8 @@ def add_item(self, parameters):
 
         :param parameters: A dict specifying the parameters.
         """
-        # Start with the default parameters
-        data = deepcopy(self.default_item_parameters)
-        # Overwrite default parameter values with specific parameters for this item
-        data = Utility.merge_dicts(parameters, data)
+        # Start with the default parameters and overwrite them with the specific parameters for this item
+        data = Utility.merge_config_layers([self.default_item_parameters, parameters])
         # Create config object
         config = Config(data)
         # Call function to add new item
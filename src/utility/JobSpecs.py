@@ -0,0 +1,79 @@
+import json
+from collections import OrderedDict
+
+
+def merge_dicts(source, destination):
+    """ Recursively copies all key value pairs from source to destination (overwrites existing).
+
+    Same semantics as Utility.merge_dicts(), which can not be used outside of blender: dicts are merged, all other
+    values (also lists) are replaced.
+
+    :param source: The source dict.
+    :param destination: The destination dict.
+    :return: The modified destination dict.
+    """
+    for key, value in source.items():
+        if isinstance(value, dict):
+            node = destination.setdefault(key, {})
+            merge_dicts(value, node)
+        else:
+            destination[key] = value
+    return destination
+
+
+def read_job_specs(path):
+    """ Reads a JSONL file with one job per line, the parameters of every job are merged into the same yaml template.
+
+    Every line is a json dict with the name of the job ("name") and the overrides of the template, see apply_job_spec().
+
+    :param path: The path to the JSONL file.
+    :return: An OrderedDict mapping the job name to its overrides, in the order of the file.
+    """
+    specs = OrderedDict()
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if len(line.strip()) == 0:
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError:
+                # The last line might still be written by the generator
+                print("Warning: Skipping invalid line %d of %s" % (line_number, path))
+                continue
+            if not isinstance(spec, dict) or not isinstance(spec.get("name"), str) or spec["name"] == "":
+                raise Exception("Line %d of %s has no job name" % (line_number, path))
+            if spec["name"] in specs:
+                raise Exception("The job name %s is used twice in %s" % (spec["name"], path))
+            specs[spec["name"]] = spec
+    return specs
+
+
+def apply_job_spec(config, spec):
+    """ Merges the overrides of one job into the parsed template.
+
+    All entries of the spec except "name" and "modules" are merged into the root of the config (e.g. "global").
+    "modules" maps a module name to the overrides of its config, e.g.
+
+        {"name": "00001", "global": {"all": {"output_dir": "/out/00001"}},
+         "modules": {"composite.VOSTrajRunner": {"n_frames": 20, "object_runners": [...]}}}
+
+    The module has to appear exactly once in the template.
+
+    :param config: The parsed and filled template, it is modified in place.
+    :param spec: The overrides of the job as read by read_job_specs().
+    :return: The modified config.
+    """
+    for key, value in spec.items():
+        if key in ["name", "modules"]:
+            continue
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            merge_dicts(value, config[key])
+        else:
+            config[key] = value
+
+    for module_name, overrides in spec.get("modules", {}).items():
+        matches = [module_config for module_config in config["modules"] if isinstance(module_config, dict) and module_config.get("module") == module_name]
+        if len(matches) != 1:
+            raise Exception("The job %s overrides the module %s, which appears %d times in the template" % (spec["name"], module_name, len(matches)))
+        merge_dicts(overrides, matches[0].setdefault("config", {}))
+    return config
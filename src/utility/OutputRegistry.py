@@ -0,0 +1,101 @@
+import json
+
+import bpy
+
+
+class OutputRegistry:
+    """ Keeps track of the outputs (key, path pattern, version, stereo) registered by the modules of the current job.
+
+    Lookups by key or path are dict lookups. The registry is written to the scene's custom property "output" (the
+    former storage, read by external scripts) only after it changed, see persist_to_scene(), and can be exported as
+    manifest for downstream tools, see write_manifest().
+    """
+
+    def __init__(self):
+        self._outputs = []
+        self._by_key = {}
+        self._by_path = {}
+        self._persisted = True
+
+    def __len__(self):
+        return len(self._outputs)
+
+    def outputs(self):
+        """ Returns all registered outputs in the order they were registered.
+
+        :return: A list of dicts with "key", "path", "version" and "stereo".
+        """
+        return [dict(output) for output in self._outputs]
+
+    def add(self, output):
+        """ Registers the given output.
+
+        Registering the same key and path twice (e.g. multiple camera samplers) is ignored, while an entry having the
+        same key but not the same path or vice versa is ambiguous and raises an error.
+
+        :param output: A dict containing key and path of the new output type.
+        :return: True, if the output was added.
+        """
+        existing = self._by_key.get(output["key"], self._by_path.get(output["path"]))
+        if existing is not None:
+            if output["key"] == existing["key"] and output["path"] == existing["path"]:
+                print("Warning! Detected output entries with duplicate keys and paths")
+                return False
+            raise Exception("Can not have two output entries with the same key/path but not same path/key." +
+                            "Original entry's data: key:{} path:{}, Entry to be registered: key:{} path:{}"
+                            .format(existing["key"], existing["path"], output["key"], output["path"]))
+
+        output = dict(output)
+        self._outputs.append(output)
+        self._by_key[output["key"]] = output
+        self._by_path[output["path"]] = output
+        self._persisted = False
+        return True
+
+    def find(self, key):
+        """ Returns the output which was registered with the given key.
+
+        :param key: The output key to look for.
+        :return: A copy of the dict containing all information registered for that output. None, if there is no output with the given key.
+        """
+        output = self._by_key.get(key)
+        return dict(output) if output is not None else None
+
+    @staticmethod
+    def frame_path(output, frame, digits=None):
+        """ Returns the path of the file written for the given frame.
+
+        :param output: The output dict, its path is a pattern containing "%04d" if it has one file per frame.
+        :param frame: The frame number.
+        :param digits: If given, the frame number is padded to this many digits instead of the four used by blender.
+        :return: The path of the file.
+        """
+        path = output["path"]
+        if digits is not None:
+            path = path.replace("%04d", "%0" + str(digits) + "d")
+        return path % frame if "%" in path else path
+
+    def persist_to_scene(self):
+        """ Writes the registry to bpy.context.scene["output"], if it changed since the last call. """
+        if not self._persisted:
+            bpy.context.scene["output"] = self._outputs
+            self._persisted = True
+
+    def write_manifest(self, path, frame_start, frame_end):
+        """ Writes all registered outputs together with the files they consist of as json.
+
+        :param path: The path of the manifest file.
+        :param frame_start: The first frame of the scene.
+        :param frame_end: The frame after the last frame of the scene.
+        """
+        outputs = []
+        for output in self._outputs:
+            output = dict(output)
+            if "%" in output["path"]:
+                output["files"] = [OutputRegistry.frame_path(output, frame) for frame in range(frame_start, frame_end)]
+            else:
+                output["files"] = [output["path"]]
+            outputs.append(output)
+
+        with open(path, "w") as f:
+            json.dump({"frame_start": frame_start, "frame_end": frame_end, "outputs": outputs}, f, indent=2)
@@ -0,0 +1,69 @@
+import numpy as np
+
+# This file must not import bpy, as the pose table is also read by the CPU workers of pool_run.py which run outside of blender.
+
+POSE_TABLE_VERSION = "1.0.0"
+# The arrays of the table which have one row per frame, all others are the same for every frame
+PER_FRAME_ARRAYS = ["location", "rotation_euler", "scale", "cam2world"]
+
+
+def write_pose_table(path, frames, entity_names, entity_types, locations, rotation_eulers, scales, cam2world, cam_K, resolution, clip):
+    """ Writes the poses of all animated entities and of the camera of one video into a single npz file.
+
+    With e entities and n frames the file contains:
+
+    - frames (n): the frame numbers
+    - entity_names, entity_types (e): the blender names of the entities and whether they are an "object" or a "light"
+    - location, rotation_euler, scale (n x e x 3): the transformation of every entity per frame
+    - cam2world (n x 4 x 4): the camera extrinsics per frame
+    - cam_K (3 x 3), resolution (2), clip (2): the camera intrinsics, the same for all frames
+
+    Names are stored as bytes and all other values as float32, s.t. the file can be read without pickle and merged into hdf5 files.
+
+    :param path: The path of the npz file.
+    :param frames: The frame numbers.
+    :param entity_names: The names of the entities.
+    :param entity_types: The type of every entity.
+    :param locations: The locations (n x e x 3).
+    :param rotation_eulers: The XYZ euler angles (n x e x 3).
+    :param scales: The scales (n x e x 3).
+    :param cam2world: The cam to world transformation matrices (n x 4 x 4).
+    :param cam_K: The camera matrix K.
+    :param resolution: The image width and height in pixels.
+    :param clip: The near and far clipping distances.
+    """
+    np.savez_compressed(path,
+                        version=np.bytes_(POSE_TABLE_VERSION),
+                        frames=np.asarray(frames, dtype=np.int32),
+                        entity_names=np.array([name.encode("utf-8") for name in entity_names], dtype=np.bytes_),
+                        entity_types=np.array([entity_type.encode("utf-8") for entity_type in entity_types], dtype=np.bytes_),
+                        location=np.asarray(locations, dtype=np.float32),
+                        rotation_euler=np.asarray(rotation_eulers, dtype=np.float32),
+                        scale=np.asarray(scales, dtype=np.float32),
+                        cam2world=np.asarray(cam2world, dtype=np.float32),
+                        cam_K=np.asarray(cam_K, dtype=np.float32),
+                        resolution=np.asarray(resolution, dtype=np.int32),
+                        clip=np.asarray(clip, dtype=np.float32))
+
+
+def read_pose_table(path):
+    """ Reads a pose table written by write_pose_table().
+
+    :param path: The path of the npz file.
+    :return: A dict mapping the name of every array to its content.
+    """
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def pose_table_frame(table, frame):
+    """ Returns the poses of one frame.
+
+    :param table: The table as returned by read_pose_table().
+    :param frame: The frame number.
+    :return: A dict with the rows of the per frame arrays for the given frame and all other arrays except version and frames. Empty, if the table does not contain the frame.
+    """
+    rows = np.flatnonzero(table["frames"] == frame)
+    if len(rows) == 0:
+        return {}
+    return {name: data[rows[0]] if name in PER_FRAME_ARRAYS else data for name, data in table.items() if name not in ["version", "frames"]}
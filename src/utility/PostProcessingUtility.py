@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+
+import numpy as np
+from PIL import Image
+
+# This file must not import bpy, as it is also used by the CPU workers of pool_run.py which run outside of blender.
+
+
+def get_color_map(N=256):
+    """ Builds the DAVIS/PASCAL VOC palette.
+
+    :param N: The number of colors.
+    :return: An array of shape [N, 3] with the rgb colors of the palette.
+    """
+    def bitget(byteval, idx):
+        return ((byteval & (1 << idx)) != 0)
+
+    cmap = np.zeros((N, 3), dtype=np.uint8)
+    for i in range(N):
+        r = g = b = 0
+        c = i
+        for j in range(8):
+            r = r | (bitget(c, 0) << 7-j)
+            g = g | (bitget(c, 1) << 7-j)
+            b = b | (bitget(c, 2) << 7-j)
+            c = c >> 3
+
+        cmap[i] = np.array([r, g, b])
+
+    return cmap
+
+cache_color_map = get_color_map()
+def pal_color_map():
+    return cache_color_map
+
+
+def map_back_from_equally_spaced_equidistant_values(values, num_splits_per_dimension, space_size_per_dimension):
+    """ Maps the given values back to their original indices.
+
+    This function calculates for each given value the corresponding index in the list of values created by Utility.generate_equidistant_values().
+
+    :param values: An array of shape [M, N, 3];
+    :param num_splits_per_dimension: The number of splits per dimension that were made when building up the equidistant values.
+    :return: A 2-dim array of indices corresponding to the given values.
+    """
+    # Calc the side length of a block.
+    block_length = space_size_per_dimension // num_splits_per_dimension
+    # Subtract a half of a block from all values, s.t. now every value points to the lower corner of a block
+    values -= block_length // 2
+    # Calculate the block indices per dimension
+    values /= block_length
+    # Compute the global index of the block (corresponds to the three nested for loops inside generate_equidistant_values())
+    values = values[:, :, 0] * num_splits_per_dimension * num_splits_per_dimension + values[:, :, 1] * num_splits_per_dimension + values[:, :, 2]
+    # Round the values, s.t. derivations are put back to their closest index.
+    return np.round(values)
+
+
+def save_segmap_png(segmentation, num_splits_per_dimension, space_size_per_dimension, dtype, file_path):
+    """ Converts a rendered segmentation (colors) into instance indices and stores them as palette png.
+
+    :param segmentation: The rendered colors as float array of shape [H, W, 3].
+    :param num_splits_per_dimension: The number of splits per dimension used when coloring the objects.
+    :param space_size_per_dimension: The size of the color space per dimension used when coloring the objects.
+    :param dtype: The dtype the indices are stored with.
+    :param file_path: The path of the png file.
+    """
+    segmap = map_back_from_equally_spaced_equidistant_values(segmentation, num_splits_per_dimension, space_size_per_dimension)
+    segmap = segmap.astype(dtype)
+
+    seg = Image.fromarray(segmap, mode='P')
+    seg.putpalette(pal_color_map())
+    seg.save(file_path)
+
+
+def load_exr(file_path, num_channels=3):
+    """ Loads the given .exr file without blender.
+
+    Uses the OpenEXR package if it is installed, otherwise OpenCV (which has to be built with OpenEXR support).
+
+    :param file_path: The path of the .exr file.
+    :param num_channels: Number of channels to return.
+    :return: A float32 array of shape [H, W, num_channels] with the rows ordered top to bottom (like blender's load_image).
+    """
+    try:
+        import OpenEXR
+        import Imath
+    except ImportError:
+        OpenEXR = None
+
+    if OpenEXR is not None:
+        exr_file = OpenEXR.InputFile(file_path)
+        data_window = exr_file.header()["dataWindow"]
+        width, height = data_window.max.x - data_window.min.x + 1, data_window.max.y - data_window.min.y + 1
+        pixel_type = Imath.PixelType(Imath.PixelType.FLOAT)
+        channels = [np.frombuffer(exr_file.channel(channel, pixel_type), dtype=np.float32).reshape(height, width) for channel in "RGBA"[:num_channels]]
+        return np.stack(channels, axis=-1)
+
+    os.environ.setdefault("OPENCV_IO_ENABLE_OPENEXR", "1")
+    try:
+        import cv2
+    except ImportError:
+        raise Exception("Reading .exr files outside of blender requires the python package OpenEXR or opencv-python.")
+    img = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise Exception("Could not read " + file_path)
+    # OpenCV uses BGR(A)
+    img = img[:, :, [2, 1, 0] + ([3] if img.shape[2] > 3 else [])].astype(np.float32)
+    return img[:, :, :num_channels]
+
+
+def run_postprocessing(manifest_path):
+    """ Executes all tasks listed in the given post-processing manifest and removes its directory afterwards.
+
+    The manifest is a json lines file with one task per line, executed in the given order:
+
+     - {"type": "segmap", "source": <.exr>, "target": <.png>, "num_splits_per_dimension": .., "space_size_per_dimension": .., "dtype": ..}
+     - {"type": "copy", "source": <file>, "target": <file>}
+
+    :param manifest_path: The path of the manifest. Its directory has to contain nothing else than the job's intermediate files.
+    :return: The number of executed tasks.
+    """
+    with open(manifest_path, "r") as f:
+        tasks = [json.loads(line) for line in f if len(line.strip()) > 0]
+
+    for task in tasks:
+        if task["type"] == "segmap":
+            segmentation = load_exr(task["source"])
+            save_segmap_png(segmentation, task["num_splits_per_dimension"], task["space_size_per_dimension"], np.dtype(task["dtype"]), task["target"])
+        elif task["type"] == "copy":
+            shutil.copyfile(task["source"], task["target"])
+        else:
+            raise Exception("Unknown post-processing task: " + task["type"])
+
+    shutil.rmtree(os.path.dirname(manifest_path))
+    return len(tasks)
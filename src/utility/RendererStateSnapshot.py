@@ -0,0 +1,180 @@
+import bpy
+
+from src.utility.SceneSnapshot import SceneSnapshot
+
+
+class RendererStateSnapshot:
+    """ Remembers exactly the state a renderer changes, s.t. it can be restored directly afterwards.
+
+    This replaces the global undo (Utility.UndoAfterExecution) for renderers: instead of letting blender store a copy
+    of the whole project, only the following is recorded and restored:
+
+    - all settings of scene.render (incl. image_settings), scene.cycles, ats_settings, the scene itself, its view layers and the mist settings of the world
+    - the material slot assignments of all objects of the scene
+    - the input values of the world nodes, e.g. the background color
+    - the nodes and links of the compositor
+    - optionally the nodes and links of all materials used in the scene, if a renderer adds nodes to them (use_alpha)
+
+    Datablocks created in between (e.g. the segmentation materials) are removed on restore.
+    """
+
+    # The datablocks a renderer might create, which are removed again on restore
+    CREATED_COLLECTIONS = ["materials", "textures", "images", "node_groups"]
+
+    def __init__(self, material_node_trees=False):
+        """
+        :param material_node_trees: If True, also the nodes and links of all materials used in the scene are recorded.
+        """
+        scene = bpy.context.scene
+        # Compositing nodes can only be recorded, if the tree exists, it is created with its default nodes when use_nodes is set the first time
+        if scene.node_tree is None:
+            use_nodes = scene.use_nodes
+            scene.use_nodes = True
+            scene.use_nodes = use_nodes
+
+        self._properties = [(struct, self._record_properties(struct)) for struct in self._setting_structs(scene)]
+        self._material_slots = {obj.name: self._record_material_slots(obj) for obj in scene.objects if hasattr(obj.data, 'materials')}
+        self._world_values = self._record_node_values(scene.world.node_tree) if scene.world is not None and scene.world.node_tree is not None else None
+        self._compositor = self._record_node_tree(scene.node_tree)
+        self._materials = {}
+        if material_node_trees:
+            for obj in scene.objects:
+                for slot in getattr(obj, "material_slots", []):
+                    if slot.material is not None and slot.material.node_tree is not None:
+                        self._materials[slot.material.name] = self._record_node_tree(slot.material.node_tree)
+        self._datablocks = SceneSnapshot(self.CREATED_COLLECTIONS)
+
+    @staticmethod
+    def _setting_structs(scene):
+        """ Returns all structs holding settings which are changed by the renderers. """
+        structs = [scene, scene.render, scene.render.image_settings, scene.cycles]
+        if hasattr(scene, "ats_settings"):
+            structs.append(scene.ats_settings)
+        for view_layer in scene.view_layers:
+            structs.extend([view_layer, view_layer.cycles])
+        if scene.world is not None:
+            structs.append(scene.world.mist_settings)
+        return structs
+
+    @staticmethod
+    def _value_of(struct, identifier):
+        value = getattr(struct, identifier)
+        # Arrays (e.g. colors) are references into the struct, enum flags are already sets
+        if not isinstance(value, (str, set)) and hasattr(value, "__len__"):
+            value = tuple(value)
+        return value
+
+    @staticmethod
+    def _record_properties(struct):
+        """ Returns the values of all writable non pointer properties of the given struct. """
+        values = {}
+        for prop in struct.bl_rna.properties:
+            if prop.is_readonly or prop.type in ["POINTER", "COLLECTION"]:
+                continue
+            values[prop.identifier] = RendererStateSnapshot._value_of(struct, prop.identifier)
+        return values
+
+    @staticmethod
+    def _restore_properties(struct, values):
+        """ Sets all properties of the given struct, which changed, back to the recorded values.
+
+        :return: The identifiers of the properties which could not be restored.
+        """
+        failed = []
+        for identifier, value in values.items():
+            if RendererStateSnapshot._value_of(struct, identifier) != value:
+                try:
+                    setattr(struct, identifier, value)
+                except (AttributeError, TypeError, ValueError):
+                    failed.append(identifier)
+        return failed
+
+    @staticmethod
+    def _record_material_slots(obj):
+        return list(obj.data.materials), [(slot.link, slot.material) for slot in obj.material_slots]
+
+    @staticmethod
+    def _restore_material_slots(obj, record):
+        data_materials, slots = record
+        # Materials appended to objects without material
+        while len(obj.data.materials) > len(data_materials):
+            obj.data.materials.pop()
+        for i, material in enumerate(data_materials):
+            if obj.data.materials[i] != material:
+                obj.data.materials[i] = material
+        # Slots linked to the object instead of its data
+        for slot, (link, material) in zip(obj.material_slots, slots):
+            if slot.link != link:
+                slot.link = link
+            if link == "OBJECT" and slot.material != material:
+                slot.material = material
+
+    @staticmethod
+    def _record_node_values(tree):
+        """ Returns the default values of all node inputs of the given tree, e.g. the color of the world background. """
+        values = {}
+        for node in tree.nodes:
+            for socket in node.inputs:
+                if hasattr(socket, "default_value"):
+                    values[(node.name, socket.identifier)] = RendererStateSnapshot._value_of(socket, "default_value")
+        return values
+
+    @staticmethod
+    def _restore_node_values(tree, values):
+        for node in tree.nodes:
+            for socket in node.inputs:
+                value = values.get((node.name, socket.identifier))
+                if value is not None and RendererStateSnapshot._value_of(socket, "default_value") != value:
+                    socket.default_value = value
+
+    @staticmethod
+    def _link_key(link):
+        return link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier
+
+    @staticmethod
+    def _record_node_tree(tree):
+        """ Returns the names of all nodes and the sockets of all links of the given tree. """
+        return {node.name for node in tree.nodes}, {RendererStateSnapshot._link_key(link) for link in tree.links}
+
+    @staticmethod
+    def _restore_node_tree(tree, record):
+        """ Removes the nodes and links added to the given tree and adds the removed links again. """
+        node_names, link_keys = record
+        for node in [node for node in tree.nodes if node.name not in node_names]:
+            tree.nodes.remove(node)
+        existing_links = set()
+        for link in list(tree.links):
+            key = RendererStateSnapshot._link_key(link)
+            if key in link_keys:
+                existing_links.add(key)
+            else:
+                tree.links.remove(link)
+        for from_node, from_socket, to_node, to_socket in link_keys - existing_links:
+            if from_node in tree.nodes and to_node in tree.nodes:
+                outputs = [socket for socket in tree.nodes[from_node].outputs if socket.identifier == from_socket]
+                inputs = [socket for socket in tree.nodes[to_node].inputs if socket.identifier == to_socket]
+                if outputs and inputs:
+                    tree.links.new(outputs[0], inputs[0])
+
+    def restore(self):
+        """ Restores the recorded state and removes the datablocks created since the snapshot was taken. """
+        scene = bpy.context.scene
+        for name, record in self._material_slots.items():
+            if name in bpy.data.objects:
+                self._restore_material_slots(bpy.data.objects[name], record)
+        for name, record in self._materials.items():
+            if name in bpy.data.materials:
+                self._restore_node_tree(bpy.data.materials[name].node_tree, record)
+        if scene.node_tree is not None:
+            self._restore_node_tree(scene.node_tree, self._compositor)
+        if self._world_values is not None and scene.world is not None:
+            self._restore_node_values(scene.world.node_tree, self._world_values)
+
+        # Some settings can only be set after others, e.g. the color_depth depends on the file_format, so retry the ones which failed
+        failed = [(struct, {identifier: values[identifier] for identifier in self._restore_properties(struct, values)}) for struct, values in self._properties]
+        for struct, values in failed:
+            self._restore_properties(struct, values)
+
+        created = self._datablocks.created_datablocks()
+        if len(created) > 0:
+            bpy.data.batch_remove(created)
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Vectorized versions of the mathutils functions used to pose the camera, they compute the poses of all frames of a
+# trajectory at once. This file must not import bpy or mathutils, s.t. it can also be used outside of blender.
+
+# Same threshold as blender's mat3_normalized_to_eul(), which works in single precision
+_EULER_EPSILON = 16 * np.finfo(np.float32).eps
+
+
+def transform_points_to_blender_coord_frame(points, frame_of_points):
+    """ Transforms the given points into the blender coordinate frame, see Utility.transform_point_to_blender_coord_frame().
+
+    :param points: An array of points (n x 3).
+    :param frame_of_points: An array containing three elements, describing the axes of the coordinate frame the points are in. (Allowed values: "X", "Y", "Z", "-X", "-Y", "-Z")
+    :return: The converted points (n x 3).
+    """
+    assert len(frame_of_points) == 3, "The specified coordinate frame has more or less than tree axes: {}".format(frame_of_points)
+
+    indices, signs = [], []
+    for axis in frame_of_points:
+        axis = axis.upper()
+        if axis[-1:] not in ["X", "Y", "Z"]:
+            raise Exception("Invalid axis: " + axis)
+        indices.append("XYZ".index(axis[-1]))
+        signs.append(-1.0 if axis.startswith("-") else 1.0)
+
+    return np.asarray(points, dtype=np.float64)[:, indices] * np.array(signs)
+
+
+def track_quaternions(directions):
+    """ Returns the rotations which point the -Z axis along the given directions, keeping Y up.
+
+    Same as mathutils.Vector.to_track_quat('-Z', 'Y') (blender's vec_to_quat()) for every direction.
+
+    :param directions: An array of directions (n x 3), they do not have to be normalized.
+    :return: An array of quaternions (n x 4) in the order w, x, y, z.
+    """
+    directions = np.asarray(directions, dtype=np.float64)
+    length = np.linalg.norm(directions, axis=1)
+    # The Z axis is rotated onto the opposite direction
+    with np.errstate(invalid="ignore", divide="ignore"):
+        directions = -directions / length[:, None]
+    x, y, z = directions[:, 0], directions[:, 1], directions[:, 2]
+
+    # Rotate around the axis perpendicular to both
+    axis = np.stack([-y, x, np.zeros_like(x)], axis=1)
+    axis[np.abs(x) + np.abs(y) < 1e-4, 0] = 1.0
+    axis /= np.linalg.norm(axis, axis=1, keepdims=True)
+    half_angle = np.arccos(np.clip(z, -1.0, 1.0)) / 2
+    rotation = np.concatenate([np.cos(half_angle)[:, None], axis * np.sin(half_angle)[:, None]], axis=1)
+
+    # Then rotate around the direction, s.t. the Y axis points up
+    matrices = quaternions_to_matrices(rotation)
+    roll = -0.5 * np.arctan2(-matrices[:, 0, 2], -matrices[:, 1, 2])
+    roll_rotation = np.concatenate([np.cos(roll)[:, None], directions * np.sin(roll)[:, None]], axis=1)
+
+    quaternions = multiply_quaternions(roll_rotation, rotation)
+    # Like blender, a zero direction results in the identity rotation
+    quaternions[length == 0] = [1, 0, 0, 0]
+    return quaternions
+
+
+def multiply_quaternions(a, b):
+    """ Returns the products a @ b of the given quaternions (n x 4, in the order w, x, y, z). """
+    aw, ax, ay, az = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    bw, bx, by, bz = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack([aw * bw - ax * bx - ay * by - az * bz,
+                     aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by + ay * bw + az * bx - ax * bz,
+                     aw * bz + az * bw + ax * by - ay * bx], axis=1)
+
+
+def quaternions_to_matrices(quaternions):
+    """ Converts unit quaternions (n x 4, in the order w, x, y, z) to rotation matrices (n x 3 x 3). """
+    w, x, y, z = quaternions[:, 0], quaternions[:, 1], quaternions[:, 2], quaternions[:, 3]
+    return np.stack([np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+                     np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+                     np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1)], axis=1)
+
+
+def matrices_to_eulers(matrices):
+    """ Splits rotation matrices into XYZ euler angles, the same way as mathutils.Matrix.to_euler('XYZ').
+
+    Of the two possible solutions the one with the smaller sum of absolute angles is chosen, as blender does.
+
+    :param matrices: An array of rotation matrices (n x 3 x 3).
+    :return: An array of euler angles (n x 3).
+    """
+    m = matrices
+    cy = np.hypot(m[:, 0, 0], m[:, 1, 0])
+    first = np.stack([np.arctan2(m[:, 2, 1], m[:, 2, 2]), np.arctan2(-m[:, 2, 0], cy), np.arctan2(m[:, 1, 0], m[:, 0, 0])], axis=1)
+    second = np.stack([np.arctan2(-m[:, 2, 1], -m[:, 2, 2]), np.arctan2(-m[:, 2, 0], -cy), np.arctan2(-m[:, 1, 0], -m[:, 0, 0])], axis=1)
+    eulers = np.where((np.abs(first).sum(axis=1) > np.abs(second).sum(axis=1))[:, None], second, first)
+
+    # Gimbal lock: the rotation around Z is merged into the one around X
+    locked = cy <= _EULER_EPSILON
+    eulers[locked] = np.stack([np.arctan2(-m[locked, 1, 2], m[locked, 1, 1]), np.arctan2(-m[locked, 2, 0], cy[locked]), np.zeros(np.count_nonzero(locked))], axis=1)
+    return eulers
+
+
+def look_at_rotations(positions, look_ats):
+    """ Returns the rotations of cameras at the given positions looking at the given points, with Y up.
+
+    :param positions: The camera positions (n x 3).
+    :param look_ats: The points the cameras look at (n x 3).
+    :return: The rotation matrices (n x 3 x 3) and the XYZ euler angles (n x 3).
+    """
+    forward = np.asarray(look_ats, dtype=np.float64) - positions
+    matrices = quaternions_to_matrices(track_quaternions(forward))
+    return matrices, matrices_to_eulers(matrices)
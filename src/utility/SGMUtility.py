@@ -1,5 +1,4 @@
 
-import cv2
 import numpy as np
 from PIL import Image
 
@@ -32,6 +31,8 @@ def fill_in_fast(depth_map, max_depth=100.0, custom_kernel=None,
     Returns:
         depth_map: dense depth map
     """
+    # Imported here, as importing cv2 is slow and resize() does not need it
+    import cv2
 
     # Full kernels
     FULL_KERNEL_5 = np.ones((5, 5), np.uint8)
@@ -0,0 +1,86 @@
+import bpy
+
+
+class SceneSnapshot:
+    """ Remembers all datablocks of the current blend file, s.t. everything created afterwards can be removed again.
+
+    This is used to reset the scene between the jobs of a long running blender process (worker and batch mode):
+    the snapshot is taken once the scene is clean and restoring it removes all datablocks created since then with a
+    single call of bpy.data.batch_remove(). In contrast to removing all objects and then the orphan data, this also
+    covers node groups, collections, worlds, scenes and datablocks which still have users (e.g. a fake user or a
+    reference from a driver).
+
+    Changes made to the datablocks of the snapshot themselves (e.g. render settings or the nodes of the world) are not
+    reverted, modules have to set these on their own (main.Initializer, renderer.*). Only their names are restored,
+    custom properties added to the scenes and worlds of the snapshot are removed and scenes get their world back, if
+    it was replaced by a new one.
+
+    Datablocks are identified by their memory address, as blender 2.8x has no persistent id per datablock. The name is
+    not part of the identity, as a job might rename a datablock of the snapshot (e.g. the scene), which then must not
+    be removed.
+    """
+
+    # All collections of bpy.data which are restored, the ones that do not exist in the running blender version are skipped
+    COLLECTIONS = ["objects", "meshes", "materials", "textures", "images", "node_groups", "collections", "worlds", "scenes",
+                   "cameras", "lights", "lightprobes", "actions", "curves", "fonts", "lattices", "metaballs", "armatures",
+                   "particles", "grease_pencils", "speakers", "sounds", "movieclips", "masks", "linestyles", "palettes",
+                   "paint_curves", "brushes", "cache_files", "volumes"]
+
+    def __init__(self, collections=None):
+        """
+        :param collections: The names of the bpy.data collections to remember, per default all in COLLECTIONS.
+        """
+        if collections is None:
+            collections = self.COLLECTIONS
+        self._collections = [name for name in collections if hasattr(bpy.data, name)]
+        self._datablocks = {name: {block.as_pointer(): block.name for block in getattr(bpy.data, name)} for name in self._collections}
+        self._custom_properties = {(name, block.name): set(block.keys()) for name in ["scenes", "worlds"] for block in getattr(bpy.data, name)}
+        self._scene_worlds = {scene.name: scene.world.name for scene in bpy.data.scenes if scene.world is not None}
+
+    def created_datablocks(self):
+        """ Returns all datablocks which were created after the snapshot was taken.
+
+        :return: A list of datablocks.
+        """
+        created = []
+        for name in self._collections:
+            known = self._datablocks[name]
+            created.extend(block for block in getattr(bpy.data, name) if block.as_pointer() not in known)
+        return created
+
+    def count_datablocks(self):
+        """ Returns the number of datablocks per collection, e.g. to check that nothing accumulates across jobs.
+
+        :return: A dict mapping the collection name to the number of its datablocks.
+        """
+        return {name: len(getattr(bpy.data, name)) for name in self._collections}
+
+    def restore(self):
+        """ Removes all datablocks created since the snapshot and the custom properties added to its scenes and worlds.
+
+        :return: The number of removed datablocks.
+        """
+        created = self.created_datablocks()
+        if len(created) > 0:
+            bpy.data.batch_remove(created)
+
+        # After the new datablocks are gone, their names are free again
+        for name in self._collections:
+            known = self._datablocks[name]
+            for block in getattr(bpy.data, name):
+                if block.name != known[block.as_pointer()]:
+                    block.name = known[block.as_pointer()]
+
+        for name in ["scenes", "worlds"]:
+            for block in getattr(bpy.data, name):
+                known_properties = self._custom_properties.get((name, block.name), set())
+                for key in list(block.keys()):
+                    if key not in known_properties:
+                        del block[key]
+
+        # Modules expect the scene to have a world
+        for scene in bpy.data.scenes:
+            world_name = self._scene_worlds.get(scene.name)
+            if scene.world is None and world_name is not None and world_name in bpy.data.worlds:
+                scene.world = bpy.data.worlds[world_name]
+        return len(created)
@@ -1,15 +1,23 @@
 import os
+import sys
 import bpy
 import time
 import inspect
 import importlib
 from src.utility.Config import Config
+from src.utility.OutputRegistry import OutputRegistry
+from src.utility.RendererStateSnapshot import RendererStateSnapshot
+import src.utility.PostProcessingUtility as PostProcessingUtility
 from mathutils import Vector
-from copy import deepcopy
-import numpy as np
 
 class Utility:
     working_dir = ""
+    # The cost of the first import of every module loaded via import_module(): name -> {"time": seconds, "packages": [...]}
+    import_times = {}
+    # Sum of all times in import_times
+    total_import_time = 0.0
+    # The outputs registered by the modules of the current job, replaced by Pipeline for every job
+    output_registry = OutputRegistry()
 
     @staticmethod
     def initialize_modules(module_configs, global_config):
@@ -48,20 +56,17 @@ def initialize_modules(module_configs, global_config):
             model_type = module_config["module"].split(".")[0]
             base_config = global_config[model_type] if model_type in global_config else {}
 
-            # Initialize config with all_base_config
-            config = deepcopy(all_base_config)
-            # Overwrite with module type base config
-            Utility.merge_dicts(base_config, config)
-            # Check if there is a module specific config
-            if "config" in module_config:
-                # Overwrite with module specific config
-                Utility.merge_dicts(module_config["config"], config)
+            # Start with all_base_config, overwrite with the module type base config and then with the module specific config
+            config = Utility.merge_config_layers([all_base_config, base_config, module_config.get("config", {})])
 
             with Utility.BlockStopWatch("Initializing module " + module_config["module"]):
+                import_time_before = Utility.total_import_time
                 # Import file and extract class
-                module_class = getattr(importlib.import_module("src." + module_config["module"]), module_config["module"].split(".")[-1])
+                module_class = getattr(Utility.import_module("src." + module_config["module"]), module_config["module"].split(".")[-1])
                 # Create module
                 modules.append(module_class(Config(config)))
+                # Includes the imports of sub modules, which are initialized by the constructor of composite modules
+                modules[-1].import_time = Utility.total_import_time - import_time_before
 
         return modules
 
@@ -129,6 +134,38 @@ def get_temporary_directory(config_object):
 
         return temp_dir
     
+    @staticmethod
+    def count_datablocks():
+        """ Returns the number of datablocks in every collection of bpy.data (objects, meshes, images, ...).
+
+        :return: A dict mapping the name of the collection to its length.
+        """
+        counts = {}
+        for name in dir(bpy.data):
+            collection = getattr(bpy.data, name)
+            if isinstance(collection, bpy.types.bpy_prop_collection):
+                counts[name] = len(collection)
+        return counts
+
+    @staticmethod
+    def get_memory_usage():
+        """ Returns the resident memory of the current process.
+
+        Reads /proc/self/status if available, otherwise falls back to the peak memory reported by getrusage.
+
+        :return: The resident set size in MB.
+        """
+        if os.path.exists("/proc/self/status"):
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024.0
+
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is given in bytes on mac and in kilobytes on linux
+        return max_rss / (1024.0 * 1024.0) if sys.platform == "darwin" else max_rss / 1024.0
+
     @staticmethod
     def merge_dicts(source, destination):
         """ Recursively copies all key value pairs from src to dest (Overwrites existing)
@@ -147,6 +184,36 @@ def merge_dicts(source, destination):
 
         return destination
 
+    @staticmethod
+    def merge_config_layers(layers):
+        """ Merges the given config dicts into a new one, later layers overwrite earlier ones (see merge_dicts()).
+
+        All dicts are copied, also the ones inside of lists (e.g. the batches of RockEssentialsRockLoader), while all
+        other values (numbers, strings, lists without dicts) are shared with the layers. As Config only ever writes by
+        replacing a value inside a dict (e.g. a provider dict by the provider), writes to the result never reach the
+        layers, s.t. they can be reused without a deepcopy per module or item.
+
+        :param layers: A list of dicts, ordered from the lowest to the highest priority.
+        :return: The merged dict.
+        """
+        merged = {}
+        for layer in layers:
+            Utility.merge_dicts(layer, merged)
+        return Utility._copy_dicts_in_lists(merged)
+
+    @staticmethod
+    def _copy_dicts_in_lists(value):
+        """ Returns the given value with all dicts copied, also the ones nested in lists. Lists without dicts or lists are shared.
+
+        :param value: A config value.
+        :return: The copied value.
+        """
+        if isinstance(value, dict):
+            return {key: Utility._copy_dicts_in_lists(child) for key, child in value.items()}
+        if isinstance(value, list) and any(isinstance(child, (dict, list)) for child in value):
+            return [Utility._copy_dicts_in_lists(child) for child in value]
+        return value
+
     @staticmethod
     def hex_to_rgba(hex):
         """ Converts the given hex string to rgba color values.
@@ -238,17 +305,25 @@ def get_nodes_with_type(nodes, node_type):
     class BlockStopWatch:
         """ Calls a print statement to mark the start and end of this block and also measures execution time.
 
+        After the block, the measured wall and cpu time (in seconds) are available as wall_time and cpu_time.
+
         Usage: with BlockStopWatch('text'):
         """
         def __init__(self, block_name):
             self.block_name = block_name
+            self.wall_time = None
+            self.cpu_time = None
 
         def __enter__(self):
             print("#### Start - " + self.block_name + " ####")
             self.start = time.time()
+            self.cpu_start = time.process_time()
+            return self
 
         def __exit__(self, type, value, traceback):
-            print("#### Finished - " + self.block_name + " (took " + ("%.3f" % (time.time() - self.start)) + " seconds) ####")
+            self.wall_time = time.time() - self.start
+            self.cpu_time = time.process_time() - self.cpu_start
+            print("#### Finished - " + self.block_name + " (took " + ("%.3f" % self.wall_time) + " seconds) ####")
 
     class UndoAfterExecution:
         """ Reverts all changes done to the blender project inside this block.
@@ -271,6 +346,67 @@ def __exit__(self, type, value, traceback):
                 # The current state points to "after", now by calling undo we go back to "before"
                 bpy.ops.ed.undo()
 
+    class RestoreAfterExecution:
+        """ Reverts the changes a renderer does inside this block, see RendererStateSnapshot for what is restored.
+
+        Much cheaper than UndoAfterExecution, as only the affected settings, material slots and nodes are recorded
+        instead of the whole project.
+
+        Usage: with RestoreAfterExecution():
+        """
+        def __init__(self, material_node_trees=False, perform_restore=True):
+            """
+            :param material_node_trees: If True, also nodes added to the materials of the scene are removed again (e.g. by add_alpha_channel_to_textures).
+            :param perform_restore: If False, the changes are kept.
+            """
+            self._material_node_trees = material_node_trees
+            self._perform_restore = perform_restore
+            self._snapshot = None
+
+        def __enter__(self):
+            if self._perform_restore:
+                self._snapshot = RendererStateSnapshot(self._material_node_trees)
+
+        def __exit__(self, type, value, traceback):
+            if self._snapshot is not None:
+                self._snapshot.restore()
+                self._snapshot = None
+
+    @staticmethod
+    def import_module(name):
+        """ Imports the given python module and records the cost of its first import in import_times.
+
+        The measured time includes all modules imported by the given one at import time, the third party packages
+        which were loaded by the import are recorded as well.
+
+        :param name: The full name of the module, e.g. "src.object.ObjectTrajectoryRunner".
+        :return: The imported module.
+        """
+        if name in sys.modules:
+            return sys.modules[name]
+
+        loaded_before = set(sys.modules)
+        start = time.time()
+        module = importlib.import_module(name)
+        import_time = time.time() - start
+
+        packages = {loaded.split(".")[0] for loaded in sys.modules if loaded not in loaded_before}
+        Utility.import_times[name] = {"time": import_time, "packages": sorted(packages - {"src"})}
+        Utility.total_import_time += import_time
+        return module
+
+    @staticmethod
+    def format_import_report():
+        """ Formats the recorded import times as a table, most expensive import first.
+
+        :return: The report as multi-line string.
+        """
+        lines = ["%-45s %9s  %s" % ("Module", "Time [s]", "Newly loaded packages")]
+        for name, stats in sorted(Utility.import_times.items(), key=lambda item: -item[1]["time"]):
+            lines.append("%-45s %9.3f  %s" % (name, stats["time"], ", ".join(stats["packages"])))
+        lines.append("%-45s %9.3f" % ("Total", Utility.total_import_time))
+        return "\n".join(lines)
+
     @staticmethod
     def build_provider(name, parameters):
         """ Builds up providers like sampler or getter.
@@ -282,7 +418,7 @@ def build_provider(name, parameters):
         :return: The constructed provider.
         """
         # Import class from src.utility
-        module_class = getattr(importlib.import_module("src.provider." + name), name.split(".")[-1])
+        module_class = getattr(Utility.import_module("src.provider." + name), name.split(".")[-1])
         # Build configuration
         config = Config(parameters)
         # Construct provider
@@ -364,16 +500,8 @@ def map_back_from_equally_spaced_equidistant_values(values, num_splits_per_dimen
         :param num_splits_per_dimension: The number of splits per dimension that were made when building up the equidistant values.
         :return: A 2-dim array of indices corresponding to the given values.
         """
-        # Calc the side length of a block.
-        block_length = space_size_per_dimension // num_splits_per_dimension
-        # Subtract a half of a block from all values, s.t. now every value points to the lower corner of a block
-        values -= block_length // 2
-        # Calculate the block indices per dimension
-        values /= block_length
-        # Compute the global index of the block (corresponds to the three nested for loops inside generate_equidistant_values())
-        values = values[:, :, 0] * num_splits_per_dimension * num_splits_per_dimension + values[:, :, 1] * num_splits_per_dimension + values[:, :, 2]
-        # Round the values, s.t. derivations are put back to their closest index.
-        return np.round(values)
+        # Also used by the post-processing workers outside of blender, so the implementation lives in a bpy-free module
+        return PostProcessingUtility.map_back_from_equally_spaced_equidistant_values(values, num_splits_per_dimension, space_size_per_dimension)
 
     @staticmethod
     def import_objects(filepath, cached_objects=None, **kwargs):
@@ -6,6 +6,7 @@
 
 from src.utility.CocoUtility import CocoUtility
 from src.main.Module import Module
+from src.utility.OutputRegistry import OutputRegistry
 
 
 class CocoAnnotationsWriter(Module):
@@ -77,10 +78,10 @@ def run(self):
         new_coco_image_paths = []
         # for each rendered frame
         for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
-            segmentation_map_paths.append(segmentation_map_output["path"] % frame)
+            segmentation_map_paths.append(OutputRegistry.frame_path(segmentation_map_output, frame))
 
-            source_path = rgb_output["path"] % frame
-            target_path = os.path.join(self._coco_data_dir, os.path.basename(rgb_output["path"] % (frame + image_offset)))
+            source_path = OutputRegistry.frame_path(rgb_output, frame)
+            target_path = os.path.join(self._coco_data_dir, os.path.basename(OutputRegistry.frame_path(rgb_output, frame + image_offset)))
 
             shutil.copyfile(source_path, target_path)
             new_coco_image_paths.append(os.path.basename(target_path))
@@ -4,11 +4,12 @@
 import shutil
 
 import bpy
-import h5py
 import numpy as np
 
 from src.main.Module import Module
 from src.utility.Utility import Utility
+from src.utility.OutputRegistry import OutputRegistry
+from src.utility.PoseTable import read_pose_table, pose_table_frame
 from src.utility.BlenderUtility import load_image
 
 
@@ -39,6 +40,8 @@ def run(self):
         if self._avoid_rendering:
             print("Avoid rendering is on, no output produced!")
             return
+        # Imported here, s.t. jobs with avoid_rendering do not pay for loading h5py
+        import h5py
 
         if self.config.get_bool("append_to_existing_output", False):
             frame_offset = 0
@@ -51,6 +54,9 @@ def run(self):
         else:
             frame_offset = 0
 
+        # Pose tables contain all frames, so they are read only once
+        pose_tables = {}
+
         # Go through all frames
         for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
 
@@ -58,21 +64,25 @@ def run(self):
             hdf5_path = os.path.join(self._determine_output_dir(False), str(frame + frame_offset) + ".hdf5")
             with h5py.File(hdf5_path, "w") as f:
 
-                if 'output' not in bpy.context.scene:
+                if len(Utility.output_registry) == 0:
                     print("No output was designed in prior models!")
                     return
                 # Go through all the output types
                 print("Merging data for frame " + str(frame) + " into " + hdf5_path)
 
-                for output_type in bpy.context.scene["output"]:
+                for output_type in Utility.output_registry.outputs():
 
                     use_stereo = output_type["stereo"]
                     # Build path (path attribute is format string)
-                    file_path = output_type["path"]
-                    if '%' in file_path:
-                        file_path = file_path % frame
-
-                    if use_stereo:
+                    file_path = OutputRegistry.frame_path(output_type, frame)
+
+                    if output_type.get("pose_table", False):
+                        if file_path not in pose_tables:
+                            pose_tables[file_path] = read_pose_table(file_path)
+                        # Every array of the table is stored under its own key, e.g. pose_table_location
+                        for name, data in pose_table_frame(pose_tables[file_path], frame).items():
+                            self._write_to_hdf_file(f, output_type["key"] + "_" + name, data)
+                    elif use_stereo:
                         path_l, path_r = self._get_stereo_path_pair(file_path)
 
                         img_l = self._load_and_postprocess(path_l, output_type["key"])
@@ -7,6 +7,7 @@
 from PIL import Image
 
 from src.main.Module import Module
+from src.utility.OutputRegistry import OutputRegistry
 
 
 class RGBSegWriter(Module):
@@ -39,6 +40,18 @@ def __init__(self, config):
         print(self.ren_out_data_dir)
         print(self.seg_out_data_dir)
 
+    def _copy_file(self, source_path, target_path):
+        """ Copies the given file, or leaves that to the post-processing workers if post-processing is deferred.
+
+        :param source_path: The path of the file to copy.
+        :param target_path: The path of the copy.
+        """
+        if self._postprocessing_is_deferred():
+            # The source might not exist yet, e.g. the segmentation png is created by an earlier post-processing task
+            self._add_postprocessing_task({"type": "copy", "source": source_path, "target": target_path})
+        else:
+            shutil.copyfile(source_path, target_path)
+
     def run(self):
         if self._avoid_rendering:
             print("Avoid rendering is on, no output produced!")
@@ -68,18 +81,18 @@ def run(self):
             """
 
             # Segmentation
-            source_path = segmentation_map_output["path"] % frame
-            target_path = os.path.join(self.seg_out_data_dir, os.path.basename(segmentation_map_output["path"].replace('%04d','%05d') % (frame)))
+            source_path = OutputRegistry.frame_path(segmentation_map_output, frame)
+            target_path = os.path.join(self.seg_out_data_dir, os.path.basename(OutputRegistry.frame_path(segmentation_map_output, frame, digits=5)))
             print(frame, source_path, target_path)
 
-            shutil.copyfile(source_path, target_path)
-            segmentation_map_paths.append(segmentation_map_output["path"] % frame)
+            self._copy_file(source_path, target_path)
+            segmentation_map_paths.append(source_path)
 
             # RGB
-            source_path = rgb_output["path"] % frame
-            target_path = os.path.join(self.ren_out_data_dir, os.path.basename(rgb_output["path"].replace('%04d','%05d') % (frame)))
+            source_path = OutputRegistry.frame_path(rgb_output, frame)
+            target_path = os.path.join(self.ren_out_data_dir, os.path.basename(OutputRegistry.frame_path(rgb_output, frame, digits=5)))
             print(frame, source_path, target_path)
 
-            shutil.copyfile(source_path, target_path)
+            self._copy_file(source_path, target_path)
             new_out_paths.append(os.path.basename(target_path))
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The tests import the code as src.<package>.<module>, like pool_run.py and run.py do
+repo_root_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if repo_root_directory not in sys.path:
+    sys.path.append(repo_root_directory)
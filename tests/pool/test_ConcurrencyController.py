@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from src.pool.ConcurrencyController import ConcurrencyController
+from src.pool.DeviceScheduler import DeviceScheduler
+
+
+def metrics(load=1.0, free_ram_mb=16000, free_tmp_mb=8000, gpu_utilization=None):
+    return {"load": load, "free_ram_mb": free_ram_mb, "free_tmp_mb": free_tmp_mb, "gpu_utilization": gpu_utilization}
+
+
+@pytest.fixture
+def controller():
+    return ConcurrencyController(1, 4, min_free_ram_mb=4096, min_free_tmp_mb=2048, max_load=8, target_gpu_utilization=90)
+
+
+@pytest.mark.parametrize("state, expected", [
+    (metrics(free_ram_mb=1000), (1, "low ram")),
+    (metrics(free_tmp_mb=1000), (1, "low tmp space")),
+    (metrics(load=9), (1, "cpu overloaded")),
+    # Running out of memory is more important than an idle GPU
+    (metrics(free_ram_mb=1000, gpu_utilization=10), (1, "low ram")),
+    (metrics(gpu_utilization=50), (3, "gpu underutilized")),
+    (metrics(gpu_utilization=95), (2, "gpu busy")),
+    (metrics(load=2), (3, "cpu headroom")),
+    (metrics(load=7), (2, "steady")),
+    # Without /proc/meminfo the RAM is not checked
+    (metrics(free_ram_mb=None, load=2), (3, "cpu headroom")),
+])
+def test_decide(controller, state, expected):
+    assert controller.decide(2, state) == expected
+
+
+def test_decide_stays_within_the_bounds(controller):
+    assert controller.decide(1, metrics(free_ram_mb=1000)) == (1, "low ram (at bound)")
+    assert controller.decide(4, metrics(gpu_utilization=10)) == (4, "gpu underutilized (at bound)")
+
+
+class FixedController(ConcurrencyController):
+    """ Sees the same machine state in every step. """
+
+    def __init__(self, state, **kwargs):
+        ConcurrencyController.__init__(self, 1, 4, max_load=8, **kwargs)
+        self.state = state
+
+    def sample(self):
+        return dict(self.state)
+
+
+def test_step_updates_the_scheduler_and_logs(tmp_path):
+    log_path = str(tmp_path / "concurrency.jsonl")
+    scheduler = DeviceScheduler(["0", "1"], 2, lambda job, device, slot: True)
+    scheduler.set_limit(3)
+    controller = FixedController(metrics(free_tmp_mb=100), log_path=log_path)
+
+    assert controller.step(scheduler) == 2
+    assert scheduler.limit == 2
+    with open(log_path, "r") as f:
+        entries = [json.loads(line) for line in f]
+    assert len(entries) == 1
+    assert entries[0]["limit"] == 3 and entries[0]["new_limit"] == 2 and entries[0]["reason"] == "low tmp space"
+    assert entries[0]["free_tmp_mb"] == 100
+
+
+def test_step_does_not_raise_an_unused_limit():
+    scheduler = DeviceScheduler(["0", "1"], 2, lambda job, device, slot: True)
+    scheduler.set_limit(2)
+    controller = FixedController(metrics(gpu_utilization=10))
+
+    # No job is running, so a higher limit would not be tested by the next sample
+    assert controller.step(scheduler) == 2
+    assert scheduler.limit == 2
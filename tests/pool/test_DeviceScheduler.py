@@ -0,0 +1,120 @@
+import threading
+import time
+
+from src.pool.DeviceScheduler import DeviceScheduler
+
+
+class FakeJobs:
+    """ A job function for the scheduler, which records where every job was started and blocks until the job is released. """
+
+    def __init__(self):
+        self.started = {}
+        self._lock = threading.Lock()
+        self._release = {}
+
+    def __call__(self, job, device, slot):
+        with self._lock:
+            self.started[job] = (device, slot)
+            release = self._release.setdefault(job, threading.Event())
+        if not release.wait(timeout=10):
+            raise Exception("Job %s was never released" % job)
+        return job != "failing"
+
+    def release(self, job):
+        with self._lock:
+            self._release.setdefault(job, threading.Event()).set()
+
+    def wait_until_started(self, jobs, timeout=5):
+        end = time.time() + timeout
+        while time.time() < end:
+            with self._lock:
+                if all(job in self.started for job in jobs):
+                    return True
+            time.sleep(0.01)
+        return False
+
+
+def run_in_background(scheduler, jobs):
+    """ Consumes scheduler.run() in a thread, s.t. the test can release jobs while the scheduler is running. """
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(scheduler.run(jobs, refill_interval=0.05)))
+    thread.daemon = True
+    thread.start()
+    return thread, results
+
+
+def test_job_fits_on_free_device():
+    jobs = FakeJobs()
+    scheduler = DeviceScheduler(["0", "1"], 1, jobs)
+    thread, results = run_in_background(scheduler, ["a", "b"])
+
+    assert jobs.wait_until_started(["a", "b"])
+    # Both devices are free, so the jobs are spread over them instead of waiting for each other
+    assert sorted(jobs.started.values()) == [("0", 0), ("1", 0)]
+    jobs.release("a")
+    jobs.release("b")
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert sorted(results) == [("a", jobs.started["a"][0], True), ("b", jobs.started["b"][0], True)]
+    assert scheduler.remaining() == 0
+
+
+def test_job_waits_while_no_device_is_free():
+    jobs = FakeJobs()
+    scheduler = DeviceScheduler(["0"], 2, jobs)
+    thread, results = run_in_background(scheduler, ["a", "b", "c"])
+
+    assert jobs.wait_until_started(["a", "b"])
+    # All slots are taken, the third job stays in the queue instead of overbooking the device
+    time.sleep(0.2)
+    assert "c" not in jobs.started
+    assert scheduler.running() == 2
+    assert scheduler.remaining() == 3
+
+    for job in ["a", "b", "c"]:
+        jobs.release(job)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert len(results) == 3
+
+
+def test_released_device_starts_waiting_job():
+    jobs = FakeJobs()
+    scheduler = DeviceScheduler(["0", "1"], 1, jobs)
+    thread, results = run_in_background(scheduler, ["a", "b", "failing", "c"])
+
+    assert jobs.wait_until_started(["a", "b"])
+    freed_device, freed_slot = jobs.started["b"]
+    jobs.release("b")
+
+    # The slot of the finished job is handed to the next job in the queue
+    assert jobs.wait_until_started(["failing"])
+    assert jobs.started["failing"] == (freed_device, freed_slot)
+    assert "c" not in jobs.started
+
+    # A failed job releases its slot as well
+    jobs.release("failing")
+    assert jobs.wait_until_started(["c"])
+    assert jobs.started["c"] == (freed_device, freed_slot)
+
+    jobs.release("a")
+    jobs.release("c")
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert [job for job, _, _ in results[:2]] == ["b", "failing"]
+    assert ("failing", freed_device, False) in results
+    assert scheduler.stats[freed_device]["jobs"] == 3
+    assert scheduler.stats[freed_device]["failed"] == 1
+
+
+def test_eta_follows_the_limit():
+    scheduler = DeviceScheduler(["0", "1"], 2, lambda job, device, slot: True)
+    assert scheduler.eta() is None
+
+    scheduler._pending.extend(["a", "b", "c", "d"])
+    scheduler._recent_durations.append(10.0)
+    assert scheduler.eta() == 10.0
+    # With a lowered limit, the remaining jobs run one after another
+    scheduler.set_limit(1)
+    assert scheduler.eta() == 40.0
@@ -0,0 +1,107 @@
+import os
+import time
+
+from src.pool.JobClaims import JobClaims, in_shard
+
+
+def make_stale(claims, job):
+    """ Sets the heartbeat of the claim of the given job far into the past. """
+    claim_path = claims._path(job, ".claim")
+    old = time.time() - 10 * claims.timeout
+    os.utime(claim_path, (old, old))
+
+
+def read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def test_only_one_node_gets_the_claim(tmp_path):
+    a = JobClaims(str(tmp_path), "a", timeout=60)
+    b = JobClaims(str(tmp_path), "b", timeout=60)
+
+    assert a.try_claim("job.yaml") is True
+    assert b.try_claim("job.yaml") is JobClaims.BUSY
+    assert read(a._path("job.yaml", ".claim")).startswith("a ")
+
+
+def test_release_and_completion(tmp_path):
+    a = JobClaims(str(tmp_path), "a", timeout=60)
+    b = JobClaims(str(tmp_path), "b", timeout=60)
+
+    assert a.try_claim("job.yaml") is True
+    # Interrupted jobs are given back to the other nodes
+    a.release("job.yaml")
+    assert b.try_claim("job.yaml") is True
+    b.release("job.yaml", "done")
+
+    assert a.is_completed("job.yaml")
+    assert a.try_claim("job.yaml") is False
+    assert not os.path.exists(a._path("job.yaml", ".claim"))
+
+
+def test_stale_claim_is_stolen(tmp_path):
+    a = JobClaims(str(tmp_path), "a", timeout=60)
+    b = JobClaims(str(tmp_path), "b", timeout=60)
+    assert a.try_claim("job.yaml") is True
+
+    make_stale(a, "job.yaml")
+    assert b.try_claim("job.yaml") is True
+    assert read(b._path("job.yaml", ".claim")).startswith("b ")
+    # Only the new claim is left, the stolen file is removed
+    assert sorted(os.listdir(str(tmp_path))) == [".clock.b", "job.yaml.claim"]
+
+
+def test_every_claim_has_its_own_token(tmp_path):
+    a = JobClaims(str(tmp_path), "a", timeout=60)
+    assert a.try_claim("first.yaml") is True
+    assert a.try_claim("second.yaml") is True
+
+    assert read(a._path("first.yaml", ".claim")).split()[2] != read(a._path("second.yaml", ".claim")).split()[2]
+
+
+def test_claim_renewed_in_between_is_put_back(tmp_path, monkeypatch):
+    a = JobClaims(str(tmp_path), "a", timeout=60)
+    b = JobClaims(str(tmp_path), "b", timeout=60)
+    c = JobClaims(str(tmp_path), "c", timeout=60)
+    assert a.try_claim("job.yaml") is True
+    make_stale(a, "job.yaml")
+    claim_path = a._path("job.yaml", ".claim")
+    stale_mtime = os.stat(claim_path).st_mtime
+
+    rename = os.rename
+    def steal_first(source, destination):
+        """ Right before b renames the stale claim, c steals it and creates its own claim. """
+        monkeypatch.setattr(os, "rename", rename)
+        assert c.try_claim("job.yaml") is True
+        # A file server with coarse timestamps can give the new claim the same modification time
+        os.utime(claim_path, (stale_mtime, stale_mtime))
+        rename(source, destination)
+    monkeypatch.setattr(os, "rename", steal_first)
+
+    assert b.try_claim("job.yaml") is JobClaims.BUSY
+    # The claim of c has been put back, b has not removed it
+    assert read(claim_path).startswith("c ")
+    assert [name for name in os.listdir(str(tmp_path)) if ".stolen." in name] == []
+
+
+def test_heartbeat_keeps_the_claim_alive(tmp_path):
+    a = JobClaims(str(tmp_path), "a", timeout=60, heartbeat_interval=0.05)
+    b = JobClaims(str(tmp_path), "b", timeout=60)
+    assert a.try_claim("job.yaml") is True
+    make_stale(a, "job.yaml")
+
+    a.start_heartbeat()
+    try:
+        time.sleep(0.3)
+    finally:
+        a.stop_heartbeat()
+    assert b.try_claim("job.yaml") is JobClaims.BUSY
+
+
+def test_every_job_is_in_exactly_one_shard():
+    jobs = ["%05d.yaml" % i for i in range(200)]
+    shards = [[job for job in jobs if in_shard(job, i, 4)] for i in range(4)]
+
+    assert sorted(job for shard in shards for job in shard) == jobs
+    assert all(len(shard) > 0 for shard in shards)
@@ -0,0 +1,90 @@
+import json
+import os
+
+import numpy as np
+
+from src.pool.JobCostEstimator import JobCostEstimator
+
+
+def random_samples(coefficients, num_samples, seed=0):
+    """ Returns (features, duration) samples of jobs whose durations are exactly the given linear function. """
+    random = np.random.RandomState(seed)
+    features = np.concatenate([np.ones((num_samples, 1)), random.uniform(0, 100, (num_samples, len(coefficients) - 1))], axis=1)
+    return [(row.tolist(), float(row @ coefficients)) for row in features]
+
+
+def test_calibrate_without_samples_keeps_defaults():
+    estimator = JobCostEstimator()
+    estimator.calibrate([])
+
+    assert np.allclose(estimator.coefficients, JobCostEstimator.DEFAULT_COEFFICIENTS)
+    assert estimator.num_samples == 0
+
+
+def test_calibrate_recovers_exact_coefficients():
+    coefficients = np.array([5.0, 0.3, 1.5, 2.0, 0.02, 0.7])
+    estimator = JobCostEstimator(regularization=1e-9)
+    estimator.calibrate(random_samples(coefficients, 50))
+
+    assert np.allclose(estimator.coefficients, coefficients, atol=1e-6)
+    assert estimator.num_samples == 50
+
+
+def test_calibrate_matches_ridge_regression():
+    coefficients = np.array([5.0, 0.3, 1.5, 2.0, 0.02, 0.7])
+    samples = random_samples(coefficients, 8, seed=1)
+    estimator = JobCostEstimator(regularization=10.0)
+    estimator.calibrate(samples)
+
+    features = np.array([sample[0] for sample in samples])
+    durations = np.array([sample[1] for sample in samples])
+    n = len(JobCostEstimator.FEATURES)
+    # (X^T X + r I) w = X^T y + r w_0
+    expected = np.linalg.solve(features.T @ features + 10.0 * np.eye(n), features.T @ durations + 10.0 * np.array(JobCostEstimator.DEFAULT_COEFFICIENTS))
+    assert np.allclose(estimator.coefficients, expected)
+
+
+def test_estimate_is_at_least_one_second():
+    estimator = JobCostEstimator()
+    estimator.coefficients = [-10.0, 0, 0, 0, 0, 0]
+
+    assert estimator.estimate([1.0, 0, 0, 0, 0, 0]) == 1.0
+
+
+def test_job_features_and_model_stats_cache(tmp_path):
+    model_dir = tmp_path / "02691156" / "abc" / "models"
+    model_dir.mkdir(parents=True)
+    model_path = str(model_dir / "model_normalized.obj")
+    with open(model_path, "w") as f:
+        f.write("v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\nf 1 3 2\n")
+    with open(str(model_dir / "texture.png"), "wb") as f:
+        f.write(b"\0" * 1000)
+
+    config = {"modules": [
+        {"module": "composite.VOSTrajRunner", "config": {
+            "n_frames": 10,
+            "camera_runner": {"config": {"intrinsics": {"resolution_x": 1000, "resolution_y": 1000}}},
+            "object_runners": [{"config": {"path": model_path}}, {"config": {"path": model_path}}],
+            "light_runners": [{}, {}, {}]}},
+        {"module": "renderer.SimRgbRenderer", "config": {}},
+        {"module": "renderer.SegMapRenderer", "config": {"samples": 64}}
+    ]}
+    stats_path = str(tmp_path / "model_stats.json")
+    estimator = JobCostEstimator(stats_path)
+    features = estimator.job_features("unused.yaml", [], config)
+
+    # 1 megapixel with 64 samples in both renderers, two objects with two faces and 1000 bytes of textures each
+    assert features == [1.0, 10, 10 * 2.0, 10 * 4 / 1e6, 10 * 2000 / 1e6, 10 * 3]
+
+    estimator.save()
+    with open(stats_path, "r") as f:
+        cached = json.load(f)
+    assert cached[model_path + "|"]["faces"] == 2
+    assert cached[model_path + "|"]["texture_bytes"] == 1000
+
+    # A model is only read again once it changed
+    assert JobCostEstimator(stats_path).model_stats(model_path)["faces"] == 2
+    with open(model_path, "a") as f:
+        f.write("f 2 3 1\n")
+    os.utime(model_path, (cached[model_path + "|"]["mtime"] + 10, cached[model_path + "|"]["mtime"] + 10))
+    assert JobCostEstimator(stats_path).model_stats(model_path)["faces"] == 3
@@ -0,0 +1,64 @@
+from src.pool.JobLedger import JobLedger, count_output_frames
+
+
+def test_resume_skips_finished_and_requeues_interrupted(tmp_path):
+    path = str(tmp_path / "job_ledger.jsonl")
+    ledger = JobLedger(path)
+    ledger.record_start("finished.yaml", 0)
+    ledger.record_finish("finished.yaml", 0, 0, 12.0)
+    ledger.record_start("interrupted.yaml", 0)
+
+    # A new dispatcher reads the state back from the file
+    ledger = JobLedger(path)
+    assert ledger.is_finished("finished.yaml")
+    assert ledger.state("interrupted.yaml") == "start"
+    assert ledger.state("new.yaml") is None
+    assert ledger.pending_jobs(["finished.yaml", "interrupted.yaml", "new.yaml"], 3) == ["interrupted.yaml", "new.yaml"]
+
+
+def test_failed_jobs_are_retried_until_the_limit(tmp_path):
+    path = str(tmp_path / "job_ledger.jsonl")
+    ledger = JobLedger(path)
+    for attempt in range(2):
+        ledger.record_start("job.yaml", attempt)
+        ledger.record_fail("job.yaml", attempt, 1, 3.0)
+
+    ledger = JobLedger(path)
+    assert ledger.failures("job.yaml") == 2
+    assert ledger.pending_jobs(["job.yaml"], 3) == ["job.yaml"]
+    assert ledger.pending_jobs(["job.yaml"], 2) == []
+
+
+def test_finish_resets_the_failures(tmp_path):
+    ledger = JobLedger(str(tmp_path / "job_ledger.jsonl"))
+    ledger.record_fail("job.yaml", 0, 1, 3.0)
+    ledger.record_finish("job.yaml", 1, 0, 10.0, frames={"expected": 2, "rgb": 2, "seg": 2})
+
+    assert ledger.failures("job.yaml") == 0
+    assert ledger.jobs["job.yaml"]["last"]["frames"]["rgb"] == 2
+
+
+def test_cut_off_line_is_ignored(tmp_path):
+    path = str(tmp_path / "job_ledger.jsonl")
+    ledger = JobLedger(path)
+    ledger.record_finish("a.yaml", 0, 0, 1.0)
+    # The dispatcher crashed while writing the next line
+    with open(path, "a") as f:
+        f.write('{"job": "b.yaml", "event": "fin')
+
+    ledger = JobLedger(path)
+    assert ledger.is_finished("a.yaml")
+    assert ledger.state("b.yaml") is None
+
+
+def test_count_output_frames(tmp_path):
+    output_dir = str(tmp_path / "render" / "00001")
+    for folder, num_frames in [("JPEGImages", 3), ("Annotations", 2)]:
+        frame_dir = tmp_path / "render" / folder / "00001"
+        frame_dir.mkdir(parents=True)
+        for i in range(num_frames):
+            (frame_dir / ("%05d.png" % i)).write_bytes(b"")
+
+    config = {"global": {"all": {"output_dir": output_dir}}, "modules": [{"module": "composite.VOSTrajRunner", "config": {"n_frames": 3}}]}
+    assert count_output_frames("unused.yaml", [], config) == {"expected": 3, "rgb": 3, "seg": 2}
+    assert count_output_frames("unused.yaml", [], {"modules": []}) is None
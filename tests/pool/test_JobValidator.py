@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from src.pool.JobValidator import DirectoryIndex, validate_job, validate_jobs, format_validation_report
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CONFIG = """
+version: 2
+modules:
+  - module: main.Initializer
+  - module: composite.VOSTrajRunner
+    config:
+      n_frames: 20
+      camera_runner:
+        module: camera.CameraTrajectoryRunner
+        config:
+          intrinsics: {fov: 1}
+          cam_poses:
+            location_poly: [[0, 0, 5], [1, 0, 0]]
+            look_at_poly: [[0, 0, 0]]
+      object_runners:
+        - module: object.ObjectTrajectoryRunner
+          config:
+            path: "<args:0>/model.obj"
+            texture: "<args:1>/texture.jpg"
+            seed: 1
+            poses:
+              location_poly: [[0, 0, 0]]
+              rotation_poly: [[0, 0, 0]]
+              scale_poly: [[1, 1, 1]]
+      light_runners:
+        - module: lighting.LightTrajectoryRunner
+          config:
+            name: light
+            poses:
+              location_poly: [[0, 0, 3]]
+              rotation_poly: [[0, 0, 0]]
+"""
+
+
+@pytest.fixture
+def assets(tmp_path):
+    """ Creates a model and a texture and returns the arguments of the config. """
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "model.obj").write_text("")
+    (tmp_path / "textures").mkdir()
+    (tmp_path / "textures" / "texture.jpg").write_bytes(b"")
+    return [str(tmp_path / "models"), str(tmp_path / "textures")]
+
+
+def write_config(tmp_path, content=CONFIG, name="job.yaml"):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_directory_index(tmp_path):
+    (tmp_path / "a.obj").write_text("")
+    (tmp_path / "sub").mkdir()
+    index = DirectoryIndex()
+
+    assert index.exists(str(tmp_path / "a.obj"))
+    assert index.exists(str(tmp_path / "sub"))
+    assert index.exists(str(tmp_path / "sub" / ".." / "a.obj"))
+    assert not index.exists(str(tmp_path / "b.obj"))
+    assert not index.exists(str(tmp_path / "missing" / "a.obj"))
+    # The directory is only listed once, files created later are not seen
+    (tmp_path / "b.obj").write_text("")
+    assert not index.exists(str(tmp_path / "b.obj"))
+
+
+def test_valid_job(tmp_path, assets):
+    assert validate_job(write_config(tmp_path), assets, ROOT_DIR) == []
+
+
+def test_missing_assets(tmp_path, assets):
+    os.remove(os.path.join(assets[1], "texture.jpg"))
+    errors = validate_job(write_config(tmp_path), [assets[0] + "/missing", assets[1]], ROOT_DIR)
+
+    assert len(errors) == 2
+    assert all("object_runners/0 (object.ObjectTrajectoryRunner)" in error and "does not exist" in error for error in errors)
+
+
+def test_missing_keys_and_invalid_polynomials(tmp_path, assets):
+    content = CONFIG.replace("      n_frames: 20\n", "      n_frames: 1\n").replace("            seed: 1\n", "")
+    content = content.replace("look_at_poly: [[0, 0, 0]]", "look_at_poly: [[0, 0]]")
+    errors = validate_job(write_config(tmp_path, content), assets, ROOT_DIR)
+
+    assert sorted(error.split(": ", 1)[1] for error in errors) == [
+        "Missing seed",
+        "cam_poses/look_at_poly has to contain one [x, y, z] coefficient per degree",
+        "n_frames has to be an integer >= 2"
+    ]
+
+
+def test_unknown_module_and_unparseable_config(tmp_path, assets):
+    errors = validate_job(write_config(tmp_path, CONFIG.replace("main.Initializer", "main.Missing")), assets, ROOT_DIR)
+    assert errors == ["modules/0 (main.Missing): Module src.main.Missing does not exist"]
+
+    errors = validate_job(write_config(tmp_path, CONFIG), assets[:1], ROOT_DIR)
+    assert errors == ["Not all placeholders of the config could be filled"]
+
+    errors = validate_job(write_config(tmp_path, "version: 2\nmodules: [\n"), assets, ROOT_DIR)
+    assert len(errors) == 1 and errors[0].startswith("Could not parse the config")
+
+
+def test_validate_jobs_in_parallel(tmp_path, assets):
+    jobs = [("valid.yaml", write_config(tmp_path, name="valid.yaml"), None),
+            ("invalid.yaml", write_config(tmp_path, CONFIG.replace("name: light", "other: light"), "invalid.yaml"), None)]
+    invalid_jobs = validate_jobs(jobs, assets, ROOT_DIR, workers=2)
+
+    assert list(invalid_jobs.keys()) == ["invalid.yaml"]
+    assert invalid_jobs["invalid.yaml"] == ["modules/1 (composite.VOSTrajRunner)/light_runners/0 (lighting.LightTrajectoryRunner): Missing name"]
+    assert format_validation_report(invalid_jobs, 2).split("\n") == ["1 of 2 jobs are invalid", "invalid.yaml", "  " + invalid_jobs["invalid.yaml"][0]]
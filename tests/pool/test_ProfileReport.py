@@ -0,0 +1,56 @@
+import cProfile
+
+from src.pool.ProfileReport import collect_profiles, aggregate_profiles, format_profile_report
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def write_profile(path, n):
+    profile = cProfile.Profile()
+    profile.enable()
+    busy(n)
+    profile.disable()
+    profile.dump_stats(str(path))
+
+
+def test_collect_profiles(tmp_path):
+    job_dir = tmp_path / "00001" / "profiles"
+    job_dir.mkdir(parents=True)
+    # The job name itself can contain dots
+    for name in ["job.v2.0.SegMapPngRenderer.prof", "job.v2.1.RGBSegWriter.prof", "other.txt", "broken.prof"]:
+        (job_dir / name).write_bytes(b"")
+
+    profiles = collect_profiles(str(tmp_path))
+    assert sorted(profiles.keys()) == ["RGBSegWriter", "SegMapPngRenderer"]
+    assert profiles["RGBSegWriter"] == [str(job_dir / "job.v2.1.RGBSegWriter.prof")]
+    assert list(collect_profiles(str(tmp_path), "RGBSegWriter").keys()) == ["RGBSegWriter"]
+
+
+def test_aggregate_profiles(tmp_path):
+    write_profile(tmp_path / "a.0.RGBSegWriter.prof", 100000)
+    write_profile(tmp_path / "b.0.RGBSegWriter.prof", 100000)
+    summary = aggregate_profiles(collect_profiles(str(tmp_path)), top=3)
+
+    assert summary["profiles"] == 2
+    assert summary["modules"] == ["RGBSegWriter"]
+    assert len(summary["functions"]) == 3
+    # The calls of both profiles are merged and the most expensive function comes first
+    merged = aggregate_profiles(collect_profiles(str(tmp_path)), top=100)
+    single = aggregate_profiles({"RGBSegWriter": [str(tmp_path / "a.0.RGBSegWriter.prof")]}, top=100)
+    assert {entry["function"]: entry["calls"] for entry in merged["functions"]} == {entry["function"]: 2 * entry["calls"] for entry in single["functions"]}
+    assert summary["functions"][0]["tottime"] >= summary["functions"][1]["tottime"] >= summary["functions"][2]["tottime"]
+
+    by_cumtime = aggregate_profiles(collect_profiles(str(tmp_path)), top=10, sort="cumtime")
+    assert by_cumtime["functions"][0]["function"].endswith("(busy)")
+
+    lines = format_profile_report(summary).split("\n")
+    assert lines[0].startswith("2 profiles of RGBSegWriter")
+    assert len(lines) == 2 + 3
+
+
+def test_aggregate_without_profiles():
+    summary = aggregate_profiles({})
+
+    assert summary == {"profiles": 0, "modules": [], "total_time": 0.0, "functions": []}
@@ -0,0 +1,65 @@
+import json
+
+from src.pool.TimingReport import percentile, collect_timing_records, aggregate_timings, format_timing_report
+
+
+def record(module, wall_time, frames=10, **info):
+    return dict(info, module=module, wall_time=wall_time, cpu_time=wall_time / 2, frames=frames)
+
+
+def test_percentile():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([5, 1, 3, 2, 4], 0) == 1
+    assert percentile([5, 1, 3, 2, 4], 100) == 5
+    assert percentile([7], 95) == 7
+
+
+def test_collect_timing_records(tmp_path):
+    for name, records in [("00001", [record("Initializer", 1.0)]), ("00002", [])]:
+        job_dir = tmp_path / name
+        job_dir.mkdir()
+        (job_dir / "timings.jsonl").write_text("".join(json.dumps(entry) + "\n" for entry in records))
+    (tmp_path / "00003").mkdir()
+
+    assert collect_timing_records(str(tmp_path)) == [[record("Initializer", 1.0)]]
+
+
+def test_aggregate_timings():
+    jobs = [[record("Initializer", 1.0, 0), record("SimRgbRenderer", 6.0), record("RGBSegWriter", 3.0)],
+            [record("Initializer", 3.0, 0), record("SimRgbRenderer", 10.0, 20), record("RGBSegWriter", 7.0, 20)]]
+    summary = aggregate_timings(jobs)
+
+    assert summary["jobs"] == 2
+    assert summary["frames"] == 30
+    assert summary["frames_per_second"] == 30 / 30.0
+    # Only the renderers count as rendering
+    assert summary["non_render_share"] == 1 - 16 / 30.0
+    renderer = summary["modules"]["SimRgbRenderer"]
+    assert renderer["count"] == 2
+    assert renderer["p50"] == 6.0 and renderer["p95"] == 10.0 and renderer["cpu_p50"] == 3.0
+    assert renderer["total"] == 16.0
+    assert abs(sum(stats["share"] for stats in summary["modules"].values()) - 1) < 1e-9
+
+
+def test_aggregate_import_time_and_resources():
+    jobs = [[record("Initializer", 1.0, import_time=0.5, rss_growth_mb=10.0, datablock_growth={"images": 2, "meshes": 0})],
+            [record("Initializer", 1.0, import_time=1.5, rss_growth_mb=20.0, datablock_growth={"images": 1})],
+            # Older timing logs have none of these values
+            [record("Initializer", 1.0)]]
+    summary = aggregate_timings(jobs)
+
+    initializer = summary["modules"]["Initializer"]
+    assert summary["import_time_per_job"] == 2.0 / 3
+    assert initializer["import_p50"] == 0.5
+    assert initializer["rss_growth_p50"] == 10.0
+    assert initializer["datablock_growth"] == {"images": 1.0}
+
+
+def test_format_timing_report():
+    jobs = [[record("SimRgbRenderer", 6.0), record("Initializer", 1.0, datablock_growth={"images": 3})]]
+    lines = format_timing_report(aggregate_timings(jobs)).split("\n")
+
+    # Sorted by total time
+    assert lines[1].startswith("SimRgbRenderer") and lines[2].startswith("Initializer")
+    assert "1 jobs, 10 frames" in lines[3]
+    assert lines[-1] == "Datablocks added per run of Initializer: images +3.0"
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.pool.TrajectoryGenerator import ModelExtents, TrajectoryGenerator
+
+
+@pytest.fixture
+def models(tmp_path):
+    """ Creates three models with the radii 0.5, 1 and 2. """
+    paths = []
+    for i, radius in enumerate([0.5, 1.0, 2.0]):
+        path = tmp_path / ("model_%d.obj" % i)
+        path.write_text("v %f 0 0\nv 0 %f 0\nv 0 0 0\nf 1 2 3\n" % (radius, -radius))
+        paths.append(str(path))
+    return paths
+
+
+def generate(models, tmp_path, seed=0, num_candidates=16, num_videos=8):
+    generator = TrajectoryGenerator(models, ["/textures/a.jpg"], ModelExtents(), seed=seed, n_frames=20, num_candidates=num_candidates, score_frames=8)
+    return generator.generate(["%05d" % i for i in range(num_videos)], str(tmp_path / "out"))
+
+
+def test_model_extents(tmp_path, models):
+    cache_path = str(tmp_path / "model_extents.json")
+    extents = ModelExtents(cache_path)
+    assert [extents.radius(path) for path in models] == [0.5, 1.0, 2.0]
+    extents.save()
+
+    # A model is only read again once it changed
+    mtime = extents._radii[models[0]]["mtime"]
+    with open(models[0], "w") as f:
+        f.write("v 10 0 0\n")
+    os.utime(models[0], (mtime, mtime))
+    assert ModelExtents(cache_path).radius(models[0]) == 0.5
+    os.utime(models[0], (mtime + 10, mtime + 10))
+    assert ModelExtents(cache_path).radius(models[0]) == 10.0
+
+
+def test_same_seed_gives_the_same_videos(tmp_path, models):
+    specs, costs = generate(models, tmp_path, seed=3)
+    same_specs, same_costs = generate(models, tmp_path, seed=3)
+    other_specs, _ = generate(models, tmp_path, seed=4)
+
+    assert specs == same_specs
+    assert np.array_equal(costs, same_costs, equal_nan=True)
+    assert specs != other_specs
+
+
+def test_job_specs(tmp_path, models):
+    specs, costs = generate(models, tmp_path)
+
+    assert [spec["name"] for spec in specs] == ["%05d" % i for i in range(8)]
+    for spec, video_costs in zip(specs, costs):
+        assert spec["global"]["all"]["output_dir"] == str(tmp_path / "out" / spec["name"])
+        runner = spec["modules"]["composite.VOSTrajRunner"]
+        assert runner["n_frames"] == 20
+        assert np.array(runner["camera_runner"]["config"]["cam_poses"]["location_poly"]).shape == (4, 3)
+        assert 3 <= len(runner["object_runners"]) <= 5 and 1 <= len(runner["light_runners"]) <= 2
+        # One accepted cost per object of the video, nan for the unused slots
+        assert np.count_nonzero(~np.isnan(video_costs)) == len(runner["object_runners"])
+        for object_runner in runner["object_runners"]:
+            assert object_runner["config"]["path"] in models
+            assert object_runner["config"]["texture"] in ["", "/textures/a.jpg"]
+            for key in ["location_poly", "rotation_poly", "scale_poly"]:
+                assert np.array(object_runner["config"]["poses"][key]).shape == (4, 3)
+
+
+def test_overlap():
+    centers = np.array([[0, 0, 0], [1, 0, 0], [5, 0, 0]], dtype=np.float64)[None, :, None]
+    radii = np.ones((1, 3, 1))
+    placed_centers = np.zeros((1, 1, 1, 3))
+    placed_radii = np.ones((1, 1, 1))
+
+    overlap = TrajectoryGenerator._overlap(centers, radii, placed_centers, placed_radii)
+    assert np.allclose(overlap, [[1.0, 0.5, 0.0]])
+
+
+def test_more_candidates_do_not_increase_the_cost(tmp_path, models):
+    # With a single candidate, every object is accepted as sampled
+    _, random_costs = generate(models, tmp_path, num_candidates=1, num_videos=32)
+    _, costs = generate(models, tmp_path, num_candidates=32, num_videos=32)
+
+    assert np.nanmean(costs) < np.nanmean(random_costs)
@@ -0,0 +1,88 @@
+import pytest
+
+# Config converts vectors with mathutils and Utility imports bpy, so these tests need the python of blender
+pytest.importorskip("bpy")
+pytest.importorskip("mathutils")
+
+# Utility has to be imported before Config, as they import each other
+from src.utility.Utility import Utility
+from src.utility.Config import Config, NotFoundError
+from src.main.Provider import Provider
+
+
+class Counter(Provider):
+    """ A provider which returns a new value on every call. """
+
+    def __init__(self):
+        Provider.__init__(self, None)
+        self.calls = 0
+
+    def run(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_nested_lookup_and_fallback():
+    config = Config({"render": {"samples": "64", "denoise": {"enabled": True}}, "seed": 3})
+
+    assert config.get_int("render/samples") == 64
+    assert config.get_bool("render/denoise/enabled")
+    assert config.get_int("seed") == 3
+    assert config.get_float("render/missing", 0.5) == 0.5
+    assert config.has_param("render/denoise/enabled")
+    assert not config.has_param("render/missing/enabled")
+    with pytest.raises(NotFoundError):
+        config.get_int("missing")
+
+
+def test_replaced_value_is_converted_again():
+    config = Config({"render": {"samples": 64}})
+    assert config.get_int("render/samples") == 64
+
+    config.data["render"]["samples"] = 128
+    assert config.get_int("render/samples") == 128
+
+
+def test_replaced_sub_dict_invalidates_the_cache():
+    config = Config({"render": {"samples": 64, "denoise": True}})
+    assert config.get_int("render/samples") == 64
+    assert config.get_raw_value("render/denoise")
+
+    # A module replaces the whole block, the dict found by the former lookup still has the old values
+    config.data["render"] = {"samples": 16}
+    assert config.get_int("render/samples") == 16
+    assert not config.has_param("render/denoise")
+    assert config.get_raw_value("render/denoise", "fallback") == "fallback"
+
+    config.data = {"render": {"samples": 8}}
+    assert config.get_int("render/samples") == 8
+
+
+def test_removed_sub_dict_is_not_found():
+    config = Config({"render": {"samples": 64}})
+    assert config.get_int("render/samples") == 64
+
+    del config.data["render"]
+    assert config.get_int("render/samples", 1) == 1
+    with pytest.raises(NotFoundError):
+        config.get_int("render/samples")
+
+
+def test_provider_is_invoked_on_every_call():
+    counter = Counter()
+    config = Config({"sampler": {"value": counter}})
+
+    assert [config.get_int("sampler/value") for _ in range(3)] == [1, 2, 3]
+    assert config.get_raw_value("sampler/value") == 4
+    assert counter.calls == 4
+
+
+def test_vectors_are_not_shared():
+    config = Config({"location": [1, 2, 3]})
+    first = config.get_vector3d("location")
+    second = config.get_vector3d("location")
+
+    assert list(first) == list(second) == [1, 2, 3]
+    assert first is not second
+    with pytest.raises(TypeError):
+        config.get_vector2d("location")
@@ -0,0 +1,84 @@
+import pytest
+
+from src.utility.ConfigParser import ConfigParser
+
+CONFIG = """
+version: 2
+setup:
+  blender_install_path: "/home_local/<env:BLENDER_VOS_TEST_USER>/blender/"
+global:
+  all:
+    output_dir: "<args:2>/00001"
+modules:
+  - module: composite.VOSTrajRunner
+    config:
+      n_frames: 20
+      object_runners:
+        - config:
+            path: "<args:0>/02691156/model.obj"
+            texture: "<args:1>/<args:1>.jpg"
+            poses:
+              location_poly: [[0, 1, 2], [0.5, 0.5, 0.5]]
+  - module: renderer.SimRgbRenderer
+    config:
+      created: 2021-05-01
+"""
+
+
+def write_config(tmp_path, content=CONFIG, name="config.yaml"):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def env(monkeypatch):
+    monkeypatch.setenv("BLENDER_VOS_TEST_USER", "someone")
+
+
+def test_fill_is_the_same_as_parse(tmp_path):
+    path = write_config(tmp_path)
+    args = ["/models", "/textures", "/output"]
+
+    filled = ConfigParser(silent=True).compile(path).fill(args)
+    assert filled == ConfigParser(silent=True).parse(path, args)
+    assert filled["modules"][0]["config"]["object_runners"][0]["config"]["texture"] == "/textures//textures.jpg"
+    assert filled["setup"]["blender_install_path"] == "/home_local/someone/blender/"
+
+
+def test_fill_with_skipped_arguments_is_the_same_as_parse(tmp_path):
+    path = write_config(tmp_path)
+
+    filled = ConfigParser(silent=True).compile(path).fill([], skip_arg_placeholders=True)
+    assert filled == ConfigParser(silent=True).parse(path, [], skip_arg_placeholders=True)
+    assert filled["global"]["all"]["output_dir"] == "<args:2>/00001"
+
+
+# Configs with basic types only are copied via marshal, others (e.g. with dates) via deepcopy
+@pytest.mark.parametrize("content", [CONFIG, CONFIG.replace("      created: 2021-05-01\n", "")])
+def test_every_fill_returns_a_new_config(tmp_path, content):
+    template = ConfigParser(silent=True).compile(write_config(tmp_path, content))
+    first = template.fill(["a", "b", "c"])
+    first["modules"][0]["config"]["object_runners"][0]["config"]["poses"]["location_poly"][0][0] = 100
+
+    second = template.fill(["d", "e", "f"])
+    assert second["modules"][0]["config"]["object_runners"][0]["config"]["poses"]["location_poly"][0][0] == 0
+    assert second["global"]["all"]["output_dir"] == "f/00001"
+    assert first["global"]["all"]["output_dir"] == "c/00001"
+
+
+def test_modified_file_is_compiled_again(tmp_path):
+    path = write_config(tmp_path)
+    assert ConfigParser(silent=True).compile(path).fill(["a", "b", "c"])["modules"][0]["config"]["n_frames"] == 20
+
+    write_config(tmp_path, CONFIG.replace("n_frames: 20", "n_frames: 160"))
+    assert ConfigParser(silent=True).compile(path).fill(["a", "b", "c"])["modules"][0]["config"]["n_frames"] == 160
+
+
+def test_missing_argument_exits_like_parse(tmp_path):
+    path = write_config(tmp_path)
+
+    with pytest.raises(SystemExit):
+        ConfigParser(silent=True).parse(path, ["a"])
+    with pytest.raises(SystemExit):
+        ConfigParser(silent=True).compile(path).fill(["a"])
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from src.pool.JobValidator import validate_job
+from src.utility.ConfigParser import ConfigParser
+from src.utility.JobSpecs import read_job_specs, apply_job_spec
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+TEMPLATE = """
+version: 2
+global:
+  all:
+    output_dir: "<args:0>/template"
+  max_bounces: 3
+modules:
+  - module: main.Initializer
+    config:
+      global:
+        output_dir: "<args:0>"
+  - module: composite.VOSTrajRunner
+    config:
+      n_frames: 160
+      camera_runner:
+        module: camera.CameraTrajectoryRunner
+        config:
+          intrinsics: {fov: 1}
+          cam_poses:
+            location_poly: [[0, 0, 5]]
+            look_at_poly: [[0, 0, 0]]
+      object_runners: []
+      light_runners: []
+"""
+
+
+def write_template(tmp_path):
+    path = tmp_path / "template.yaml"
+    path.write_text(TEMPLATE)
+    return path
+
+
+def write_lines(tmp_path, lines):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def test_read_job_specs_keeps_the_order(tmp_path):
+    path = write_lines(tmp_path, [json.dumps({"name": "00002"}), "", json.dumps({"name": "00001", "global": {"max_bounces": 1}})])
+    specs = read_job_specs(path)
+
+    assert list(specs.keys()) == ["00002", "00001"]
+    assert specs["00001"]["global"] == {"max_bounces": 1}
+
+
+def test_read_job_specs_skips_a_line_that_is_still_written(tmp_path):
+    path = write_lines(tmp_path, [json.dumps({"name": "00001"}), '{"name": "000'])
+
+    assert list(read_job_specs(path).keys()) == ["00001"]
+
+
+@pytest.mark.parametrize("lines", [[json.dumps({"name": "00001"}), json.dumps({"name": "00001"})], [json.dumps({"global": {}})], [json.dumps({"name": ""})]])
+def test_read_job_specs_rejects_invalid_names(tmp_path, lines):
+    with pytest.raises(Exception):
+        read_job_specs(write_lines(tmp_path, lines))
+
+
+def test_apply_job_spec(tmp_path):
+    template = ConfigParser(silent=True).compile(str(write_template(tmp_path))).fill(["/out"])
+    spec = {"name": "00001", "global": {"all": {"output_dir": "/out/00001"}}, "setup": {"pip": []},
+            "modules": {"composite.VOSTrajRunner": {"n_frames": 20, "object_runners": [{"module": "object.ObjectTrajectoryRunner"}]}}}
+    config = apply_job_spec(template, spec)
+
+    # Dicts are merged, all other values are replaced
+    assert config["global"] == {"all": {"output_dir": "/out/00001"}, "max_bounces": 3}
+    assert config["setup"] == {"pip": []}
+    runner_config = config["modules"][1]["config"]
+    assert runner_config["n_frames"] == 20
+    assert runner_config["object_runners"] == [{"module": "object.ObjectTrajectoryRunner"}]
+    assert runner_config["camera_runner"]["config"]["intrinsics"] == {"fov": 1}
+    assert "name" not in config and config["modules"][0]["config"]["global"]["output_dir"] == "/out"
+
+
+def test_apply_job_spec_needs_the_module_once(tmp_path):
+    template = ConfigParser(silent=True).compile(str(write_template(tmp_path))).fill(["/out"])
+
+    with pytest.raises(Exception):
+        apply_job_spec(template, {"name": "00001", "modules": {"renderer.SegMapRenderer": {}}})
+
+
+def test_validate_job_specs_of_one_template(tmp_path):
+    template_path = str(write_template(tmp_path))
+
+    assert validate_job(template_path, ["/out"], ROOT_DIR, {"name": "00001", "modules": {"composite.VOSTrajRunner": {"n_frames": 20}}}) == []
+    # Every spec gets its own copy of the template, the overrides of one job do not leak into the next one
+    errors = validate_job(template_path, ["/out"], ROOT_DIR, {"name": "00002", "modules": {"composite.VOSTrajRunner": {"n_frames": 1}}})
+    assert errors == ["modules/1 (composite.VOSTrajRunner): n_frames has to be an integer >= 2"]
+    assert validate_job(template_path, ["/out"], ROOT_DIR, {"name": "00003"}) == []
+
+    errors = validate_job(template_path, ["/out"], ROOT_DIR, {"name": "00004", "modules": {"main.Missing": {}}})
+    assert len(errors) == 1 and errors[0].startswith("Could not apply the job spec")
+
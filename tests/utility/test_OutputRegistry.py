@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+# The registry is persisted into the blender scene, so these tests need the python of blender
+pytest.importorskip("bpy")
+
+from src.utility.OutputRegistry import OutputRegistry
+
+
+def output(key, path, version="2.0.0"):
+    return {"key": key, "path": path, "version": version, "stereo": False}
+
+
+def test_lookup_by_key():
+    registry = OutputRegistry()
+    assert registry.add(output("colors", "/out/rgb_%04d.png"))
+    assert registry.add(output("segmap", "/out/segmap_%04d.exr"))
+
+    assert len(registry) == 2
+    assert registry.find("segmap") == output("segmap", "/out/segmap_%04d.exr")
+    assert registry.find("normals") is None
+    assert [entry["key"] for entry in registry.outputs()] == ["colors", "segmap"]
+
+
+def test_returned_outputs_are_copies():
+    registry = OutputRegistry()
+    registry.add(output("colors", "/out/rgb_%04d.png"))
+
+    registry.find("colors")["path"] = "/other"
+    registry.outputs()[0]["key"] = "other"
+    assert registry.find("colors")["path"] == "/out/rgb_%04d.png"
+
+
+def test_duplicates():
+    registry = OutputRegistry()
+    registry.add(output("colors", "/out/rgb_%04d.png"))
+
+    # The same output registered twice (e.g. by two camera samplers) is ignored
+    assert not registry.add(output("colors", "/out/rgb_%04d.png"))
+    assert len(registry) == 1
+    with pytest.raises(Exception):
+        registry.add(output("colors", "/out/other_%04d.png"))
+    with pytest.raises(Exception):
+        registry.add(output("other", "/out/rgb_%04d.png"))
+
+
+def test_frame_path():
+    assert OutputRegistry.frame_path(output("colors", "/out/rgb_%04d.png"), 7) == "/out/rgb_0007.png"
+    assert OutputRegistry.frame_path(output("colors", "/out/rgb_%04d.png"), 7, 5) == "/out/rgb_00007.png"
+    assert OutputRegistry.frame_path(output("poses", "/out/poses.npz"), 7) == "/out/poses.npz"
+
+
+def test_write_manifest(tmp_path):
+    registry = OutputRegistry()
+    registry.add(output("colors", "/out/rgb_%04d.png"))
+    registry.add(output("poses", "/out/poses.npz", "1.0.0"))
+    path = str(tmp_path / "manifest.json")
+    registry.write_manifest(path, 0, 2)
+
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    assert manifest["frame_start"] == 0 and manifest["frame_end"] == 2
+    assert manifest["outputs"][0] == dict(output("colors", "/out/rgb_%04d.png"), files=["/out/rgb_0000.png", "/out/rgb_0001.png"])
+    assert manifest["outputs"][1]["files"] == ["/out/poses.npz"]
+    # The registry itself is not changed by the export
+    assert "files" not in registry.find("colors")
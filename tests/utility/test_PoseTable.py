@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.utility.PoseTable import POSE_TABLE_VERSION, PER_FRAME_ARRAYS, write_pose_table, read_pose_table, pose_table_frame
+
+
+def write_table(path, frames=(3, 4, 5)):
+    random = np.random.RandomState(0)
+    n = len(frames)
+    cam2world = np.tile(np.eye(4), (n, 1, 1))
+    cam2world[:, :3, 3] = random.normal(size=(n, 3))
+    write_pose_table(path, frames, ["Cube", "Lämpchen"], ["object", "light"],
+                     random.normal(size=(n, 2, 3)), random.normal(size=(n, 2, 3)), random.uniform(0.5, 2, (n, 2, 3)),
+                     cam2world, [[500, 0, 320], [0, 500, 240], [0, 0, 1]], [640, 480], [0.1, 100])
+    return random
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "poses.npz")
+    write_table(path)
+    table = read_pose_table(path)
+
+    assert table["version"] == np.bytes_(POSE_TABLE_VERSION)
+    assert table["frames"].tolist() == [3, 4, 5]
+    assert table["frames"].dtype == np.int32
+    assert [name.decode("utf-8") for name in table["entity_names"]] == ["Cube", "Lämpchen"]
+    assert table["entity_types"].tolist() == [b"object", b"light"]
+    for name in PER_FRAME_ARRAYS + ["cam_K", "clip"]:
+        assert table[name].dtype == np.float32
+    assert table["location"].shape == (3, 2, 3)
+    assert table["cam2world"].shape == (3, 4, 4)
+    assert table["resolution"].tolist() == [640, 480]
+    assert np.allclose(table["cam_K"], [[500, 0, 320], [0, 500, 240], [0, 0, 1]])
+
+
+def test_values_are_kept_in_single_precision(tmp_path):
+    path = str(tmp_path / "poses.npz")
+    random = np.random.RandomState(0)
+    locations = random.normal(size=(3, 2, 3))
+    write_pose_table(path, [0, 1, 2], ["a", "b"], ["object", "object"], locations, locations, locations,
+                     np.tile(np.eye(4), (3, 1, 1)), np.eye(3), [1, 1], [0.1, 10])
+
+    assert np.array_equal(read_pose_table(path)["location"], locations.astype(np.float32))
+
+
+def test_table_can_be_read_without_pickle(tmp_path):
+    path = str(tmp_path / "poses.npz")
+    write_table(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        assert sorted(data.files) == sorted(["version", "frames", "entity_names", "entity_types", "cam_K", "resolution", "clip"] + PER_FRAME_ARRAYS)
+
+
+def test_frame(tmp_path):
+    path = str(tmp_path / "poses.npz")
+    write_table(path)
+    table = read_pose_table(path)
+    poses = pose_table_frame(table, 4)
+
+    assert sorted(poses) == sorted(["entity_names", "entity_types", "cam_K", "resolution", "clip"] + PER_FRAME_ARRAYS)
+    for name in PER_FRAME_ARRAYS:
+        assert np.array_equal(poses[name], table[name][1])
+    assert np.array_equal(poses["cam_K"], table["cam_K"])
+    assert pose_table_frame(table, 6) == {}
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.utility.RotationUtility import transform_points_to_blender_coord_frame, track_quaternions, quaternions_to_matrices, matrices_to_eulers, look_at_rotations
+
+
+def random_look_ats(n=500, seed=0):
+    random = np.random.RandomState(seed)
+    return random.uniform(-5, 5, (n, 3)), random.uniform(-1, 1, (n, 3))
+
+
+def look_at_per_frame(position, look_at):
+    """ The usual per frame look-at: -Z towards the target, X horizontal and Y up. """
+    forward = look_at - position
+    forward = forward / np.linalg.norm(forward)
+    right = np.cross(forward, [0.0, 0.0, 1.0])
+    right = right / np.linalg.norm(right)
+    up = np.cross(right, forward)
+    return np.stack([right, up, -forward], axis=1)
+
+
+def euler_to_matrix(euler):
+    """ The rotation matrix of XYZ euler angles, as mathutils.Euler(euler, 'XYZ').to_matrix(). """
+    x, y, z = euler
+    rx = np.array([[1, 0, 0], [0, np.cos(x), -np.sin(x)], [0, np.sin(x), np.cos(x)]])
+    ry = np.array([[np.cos(y), 0, np.sin(y)], [0, 1, 0], [-np.sin(y), 0, np.cos(y)]])
+    rz = np.array([[np.cos(z), -np.sin(z), 0], [np.sin(z), np.cos(z), 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def test_transform_points_to_blender_coord_frame():
+    points = np.array([[1, 2, 3], [4, 5, 6]])
+
+    assert np.array_equal(transform_points_to_blender_coord_frame(points, ["X", "-Z", "Y"]), [[1, -3, 2], [4, -6, 5]])
+    assert np.array_equal(transform_points_to_blender_coord_frame(points, ["x", "y", "z"]), points)
+    with pytest.raises(Exception):
+        transform_points_to_blender_coord_frame(points, ["X", "Y", "W"])
+
+
+def test_look_at_matches_the_per_frame_computation():
+    positions, look_ats = random_look_ats()
+    matrices, eulers = look_at_rotations(positions, look_ats)
+
+    expected = np.stack([look_at_per_frame(position, look_at) for position, look_at in zip(positions, look_ats)])
+    assert np.allclose(matrices, expected, atol=1e-9)
+    assert np.allclose(np.stack([euler_to_matrix(euler) for euler in eulers]), matrices, atol=1e-9)
+
+
+def test_straight_up_and_down():
+    positions = np.zeros((3, 3))
+    matrices, eulers = look_at_rotations(positions, [[0, 0, 1], [0, 0, -1], [0, 0, 0]])
+
+    # -Z points along the direction, a zero direction gives the identity as in blender
+    assert np.allclose(-matrices[0][:, 2], [0, 0, 1])
+    assert np.allclose(-matrices[1][:, 2], [0, 0, -1])
+    assert np.allclose(matrices[2], np.eye(3))
+    assert np.allclose(np.stack([euler_to_matrix(euler) for euler in eulers]), matrices, atol=1e-9)
+
+
+def test_quaternions_are_normalized():
+    directions = np.random.RandomState(1).normal(size=(100, 3))
+    quaternions = track_quaternions(directions)
+
+    assert np.allclose(np.linalg.norm(quaternions, axis=1), 1)
+    matrices = quaternions_to_matrices(quaternions)
+    assert np.allclose(matrices @ matrices.transpose(0, 2, 1), np.eye(3), atol=1e-9)
+
+
+def test_eulers_prefer_the_smaller_angles():
+    eulers = np.array([[0.1, 0.2, 0.3], [np.pi - 0.1, 0.5, -0.2], [0.3, np.pi / 2, 0.0]])
+    matrices = np.stack([euler_to_matrix(euler) for euler in eulers])
+    result = matrices_to_eulers(matrices)
+
+    assert np.allclose(np.stack([euler_to_matrix(euler) for euler in result]), matrices, atol=1e-6)
+    assert np.allclose(result[0], eulers[0])
+    assert np.all(np.abs(result).sum(axis=1) <= np.abs(eulers).sum(axis=1) + 1e-9)
+
+
+def test_look_at_matches_mathutils():
+    """ Compares against the former per frame computation of the CameraTrajectoryRunner, see scripts/check_look_at_poses.py. """
+    mathutils = pytest.importorskip("mathutils")
+    if not hasattr(mathutils.Vector, "to_track_quat"):
+        pytest.skip("mathutils of blender is required")
+    positions, look_ats = random_look_ats(100)
+    matrices, eulers = look_at_rotations(positions, look_ats)
+
+    for position, look_at, matrix, euler in zip(positions, look_ats, matrices, eulers):
+        forward = mathutils.Vector(look_at) - mathutils.Vector(position)
+        forward.normalize()
+        expected = mathutils.Euler(forward.to_track_quat('-Z', 'Y').to_euler(), 'XYZ').to_matrix().normalized()
+        # mathutils works in single precision
+        assert np.allclose(matrix, np.array(expected), atol=1e-5)
+        assert np.allclose(euler_to_matrix(euler), euler_to_matrix(expected.to_euler('XYZ')), atol=1e-5)
@@ -0,0 +1,48 @@
+import copy
+
+import pytest
+
+# Utility imports bpy and mathutils, so these tests need the python of blender
+pytest.importorskip("bpy")
+pytest.importorskip("mathutils")
+
+from src.utility.Utility import Utility
+
+
+def layers():
+    base = {"output_dir": "/out", "render": {"samples": 64, "denoise": True}, "location": [0, 0, 1],
+            "batches": [{"amount": 2, "physics": {"mass": 1}}, {"amount": 3}]}
+    module = {"render": {"samples": 16}, "seed": 1}
+    return [base, module]
+
+
+def test_later_layers_overwrite_earlier_ones():
+    merged = Utility.merge_config_layers(layers())
+
+    assert merged == {"output_dir": "/out", "render": {"samples": 16, "denoise": True}, "location": [0, 0, 1],
+                      "batches": [{"amount": 2, "physics": {"mass": 1}}, {"amount": 3}], "seed": 1}
+
+
+def test_result_does_not_alias_the_layers():
+    original = layers()
+    unchanged = copy.deepcopy(original)
+    merged = Utility.merge_config_layers(original)
+
+    # Config replaces values inside dicts, e.g. a provider dict by the provider it builds
+    merged["render"]["samples"] = "provider"
+    merged["batches"][0]["amount"] = "provider"
+    merged["batches"][0]["physics"]["mass"] = "provider"
+    merged["batches"].append({"amount": 4})
+    assert original == unchanged
+
+    # Merging the same layers again gives the same result as before
+    assert Utility.merge_config_layers(original) == Utility.merge_config_layers(unchanged)
+
+
+def test_lists_without_dicts_are_shared():
+    original = layers()
+    merged = Utility.merge_config_layers(original)
+
+    assert merged["location"] is original[0]["location"]
+    assert merged["batches"] is not original[0]["batches"]
+    assert merged["batches"][1] is not original[0]["batches"][1]